@@ -0,0 +1,170 @@
+"""
+Headless batch question answering: runs every question against every video of a collection and streams
+the answers to a JSONL file. Interrupted runs resume where they stopped.
+
+Usage:
+    python batch_qa.py --collection-id c-123 --questions questions.txt --output answers.jsonl --workers 8
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from db.database_operations import DEFAULT_SEARCH_BACKEND, LOCAL_BACKEND, SEARCH_BACKENDS, chat_with_video, repository
+from llm.advanced_language_model import generate_answer_from_context
+from utils.helpers import percentile, setup_logging
+from utils.rate_limit import TokenBucket
+
+
+DEFAULT_BATCH_WORKERS = int(os.getenv("VIDEOLENS_BATCH_WORKERS", "8"))
+VIDEODB_RPS = float(os.getenv("VIDEOLENS_VIDEODB_RPS", "10"))
+GEMINI_RPS = float(os.getenv("VIDEOLENS_GEMINI_RPS", "1"))
+
+
+def load_completed(output_path: str) -> Set[Tuple[str, str]]:
+    """
+    Returns the (video_id, question) pairs already answered successfully in an earlier run.
+
+    Args:
+        output_path (str): JSONL file written by `run_batch`.
+    """
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A line cut short by an interruption; the pair is simply answered again
+                continue
+            if record.get("status") == "ok":
+                completed.add((record["video_id"], record["question"]))
+    return completed
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def _answer_one(collection: object, video_id: str, video_name: str, question: str, search_backend: str,
+                videodb_limiter: TokenBucket, gemini_limiter: TokenBucket,
+                answer_fn: Callable[[str, str], str]) -> Dict[str, object]:
+    started = time.perf_counter()
+    record = {"video_id": video_id, "video_name": video_name, "question": question}
+    try:
+        # The local index answers searches in-process, so only remote searches count against the VideoDB limit
+        if search_backend != LOCAL_BACKEND:
+            videodb_limiter.acquire()
+        context, details = chat_with_video(collection, video_id, question, search_backend=search_backend)
+        if not context:
+            raise RuntimeError("search returned no context")
+        gemini_limiter.acquire()
+        record.update(status="ok", answer=answer_fn(question, context), segments=details.get("segments", []))
+    except Exception as error:
+        record.update(status="error", error=str(error))
+        logging.error(f"Batch question failed. fn=_answer_one, video_id={video_id}, error={error}")
+    record["latency_seconds"] = round(time.perf_counter() - started, 4)
+    return record
+
+
+def run_batch(collection: object, videos: Dict[str, str], questions: List[str], output_path: str,
+              max_workers: int = DEFAULT_BATCH_WORKERS, videodb_rps: float = VIDEODB_RPS, gemini_rps: float = GEMINI_RPS,
+              search_backend: str = DEFAULT_SEARCH_BACKEND,
+              answer_fn: Callable[[str, str], str] = generate_answer_from_context,
+              on_result: Optional[Callable[[Dict[str, object]], None]] = None) -> Dict[str, object]:
+    """
+    Answers every question against every video with bounded concurrency and per-provider rate limits.
+
+    Results are appended to `output_path` as they complete. Pairs already answered successfully in that
+    file are skipped, so rerunning the same command resumes an interrupted run.
+
+    Args:
+        collection (object): The video collection object.
+        videos (Dict[str, str]): Video IDs mapped to their names. Keyed by ID, since names need not be unique.
+        questions (List[str]): The questions to ask.
+        output_path (str): JSONL file results are appended to.
+        max_workers (int): Maximum number of (video, question) pairs in flight.
+        videodb_rps (float): Maximum VideoDB searches per second. 0 disables the limit. Not applied to the local backend.
+        gemini_rps (float): Maximum Gemini requests per second. 0 disables the limit.
+        search_backend (str): Search backend passed to `chat_with_video`.
+        answer_fn (Callable[[str, str], str]): Turns (question, context) into an answer.
+        on_result (Optional[Callable[[Dict[str, object]], None]]): Called with each record as it is written.
+
+    Returns:
+        Dict[str, object]: Run summary with counts, questions per second and p50/p95 latency.
+    """
+    completed = load_completed(output_path)
+    pairs = [(video_id, name, question) for video_id, name in videos.items() for question in questions
+             if (video_id, question) not in completed]
+    videodb_limiter, gemini_limiter = TokenBucket(videodb_rps), TokenBucket(gemini_rps)
+    latencies, errors = [], 0
+    started = time.perf_counter()
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output_path, "a", encoding="utf-8") as output, \
+            ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="batch-qa") as executor:
+        if output.tell() > 0 and not _ends_with_newline(output_path):
+            output.write("\n")
+        futures = [executor.submit(_answer_one, collection, video_id, name, question, search_backend,
+                                   videodb_limiter, gemini_limiter, answer_fn)
+                   for video_id, name, question in pairs]
+        for future in as_completed(futures):
+            record = future.result()
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+            latencies.append(record["latency_seconds"])
+            errors += record["status"] != "ok"
+            if on_result is not None:
+                on_result(record)
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "pairs_total": len(videos) * len(questions),
+        "pairs_skipped": len(videos) * len(questions) - len(pairs),
+        "pairs_run": len(pairs),
+        "errors": errors,
+        "wall_seconds": round(elapsed, 3),
+        "questions_per_second": round(len(pairs) / elapsed, 3) if elapsed > 0 else 0.0,
+        "latency_p50_seconds": round(percentile(latencies, 50), 4),
+        "latency_p95_seconds": round(percentile(latencies, 95), 4),
+    }
+    logging.info(f"Batch run finished. fn=run_batch, summary={summary}")
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collection-id", required=True, help="ID of the VideoDB collection to query.")
+    parser.add_argument("--questions", required=True, help="Text file with one question per line.")
+    parser.add_argument("--output", required=True, help="JSONL file results are appended to.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_BATCH_WORKERS)
+    parser.add_argument("--videodb-rps", type=float, default=VIDEODB_RPS)
+    parser.add_argument("--gemini-rps", type=float, default=GEMINI_RPS)
+    parser.add_argument("--search-backend", default=DEFAULT_SEARCH_BACKEND, choices=SEARCH_BACKENDS)
+    args = parser.parse_args()
+
+    setup_logging("logs/batch_qa_logs.log")
+    with open(args.questions, encoding="utf-8") as f:
+        questions = [line.strip() for line in f if line.strip()]
+    collection = repository.get_collection(args.collection_id)
+    videos = {}
+    for video in collection.get_videos():
+        repository.remember(collection, video)
+        videos[video.id] = video.name
+
+    summary = run_batch(collection, videos, questions, args.output, max_workers=args.workers,
+                        videodb_rps=args.videodb_rps, gemini_rps=args.gemini_rps, search_backend=args.search_backend,
+                        on_result=lambda record: print(f"[{record['status']}] {record['video_name']}: {record['question']}"))
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Measures the cold import cost of the app's service modules with `python -X importtime`, so a change that
+pulls a heavy SDK back onto the import path shows up as a regression.
+
+Run from the repository root:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --save benchmarks/import_time_baseline.json
+    python -m benchmarks.import_time --compare benchmarks/import_time_baseline.json --tolerance 1.5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+
+DEFAULT_MODULES = ["db.database_operations", "llm.advanced_language_model"]
+# Modules that must stay off the import path; they are loaded on first use instead
+DEFERRED_MODULES = ["videodb", "google.generativeai", "dotenv"]
+
+
+def measure(modules: List[str]) -> Tuple[float, Dict[str, float]]:
+    """
+    Imports `modules` in a fresh interpreter and returns the total import time and the cumulative time
+    of each module and its direct imports, both in milliseconds.
+    """
+    code = "; ".join(f"import {module}" for module in modules)
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                               cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+
+    packages: Dict[str, float] = {}
+    total = 0.0
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name_field = line[len("import time:"):].split("|", 2)
+        name = name_field.strip()
+        depth = (len(name_field) - len(name_field.lstrip()) - 1) // 2
+        if depth == 0 and name in modules:
+            total += int(cumulative) / 1000
+        if depth <= 1 or name in DEFERRED_MODULES:
+            packages[name] = int(cumulative) / 1000
+    return total, packages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--save", help="Write the measurement to this JSON file.")
+    parser.add_argument("--compare", help="Fail if slower than this saved measurement times --tolerance.")
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    args = parser.parse_args()
+
+    total, packages = measure(args.modules)
+    print(f"import {' '.join(args.modules)}: {total:.1f} ms")
+    for name, elapsed in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {elapsed:8.1f} ms  {name}")
+
+    eager = [name for name in DEFERRED_MODULES if name in packages]
+    if eager:
+        print(f"REGRESSION: deferred SDKs imported eagerly: {', '.join(eager)}")
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"modules": args.modules, "total_ms": total}, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["total_ms"]
+        print(f"baseline: {baseline:.1f} ms, limit: {baseline * args.tolerance:.1f} ms")
+        if total > baseline * args.tolerance:
+            print("REGRESSION: import time above baseline tolerance")
+            sys.exit(1)
+    if eager:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
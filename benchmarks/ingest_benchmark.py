@@ -0,0 +1,47 @@
+"""
+Compares sequential ingest (the previous upload-all-then-index-all loop) with the
+concurrent pipeline in db/ingest.py, using the in-memory fake VideoDB backend with injected latency.
+
+Run from the repository root:
+    python -m benchmarks.ingest_benchmark --videos 30 --workers 8
+"""
+import argparse
+import time
+
+from db.fake_backend import FakeConnection
+from db.ingest import ingest_videos
+
+
+def run_sequential(collection, urls) -> float:
+    started = time.perf_counter()
+    for url in urls:
+        collection.upload(url=url)
+    for video in collection.get_videos():
+        video.index_spoken_words()
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--upload-latency", type=float, default=0.05)
+    parser.add_argument("--index-latency", type=float, default=0.08)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    args = parser.parse_args()
+
+    urls = [f"https://www.youtube.com/watch?v=fake{number}" for number in range(args.videos)]
+    make_collection = lambda: FakeConnection(latency=0.01, jitter=args.jitter, upload_weight=args.upload_latency / 0.01,
+                                             index_weight=args.index_latency / 0.01, words_per_video=10).create_collection("benchmark")
+
+    sequential = run_sequential(make_collection(), urls)
+    report = ingest_videos(make_collection(), urls, max_workers=args.workers)
+
+    print(f"videos={args.videos} workers={args.workers}")
+    print(f"sequential: {sequential:.3f}s")
+    print(f"pipelined:  {report.wall_seconds:.3f}s ({len(report.succeeded)} ok, {len(report.failed)} failed)")
+    print(f"speedup:    {sequential / report.wall_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
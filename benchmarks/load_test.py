@@ -0,0 +1,228 @@
+"""
+Load test of the full question answering flow with N concurrent sessions, against the in-memory fake
+VideoDB backend and a fake Gemini model.
+
+Every session saves its own library through add_videos_to_index, then repeatedly asks a question
+(chat_with_video -> generate_answer_from_context), searches for clips (watch_shorts) and reads a
+transcript (transcribe_video). Both fakes sleep for a configurable latency with uniform jitter and fail
+with a configurable probability, so retries and the circuit breaker take part as they would in production.
+
+The report lists throughput and latency percentiles per action. --save writes it as JSON, and --baseline
+compares the run with a saved report and exits with status 1 when an action got slower, failed more
+often or the throughput dropped by more than --tolerance.
+
+Run from the repository root:
+    python -m benchmarks.load_test --sessions 20 --iterations 5 --save baseline.json
+    python -m benchmarks.load_test --sessions 20 --iterations 5 --baseline baseline.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+# Keep the caches of the run out of the working directory; must happen before the db modules are imported
+os.environ.setdefault("VIDEOLENS_CACHE_DIR", tempfile.mkdtemp(prefix="videolens-load-"))
+
+from db import database_operations
+from db.fake_backend import FakeBackendError, FakeConnection
+from db.video_repository import FAKE_BACKEND_NAME, VideoRepository
+from llm import advanced_language_model
+from utils.helpers import percentile
+
+
+QUESTIONS = ["What is the main topic?", "How does the cache work?", "Which database is used for search?",
+             "What are the latency numbers?", "Who is the speaker?", "What does the index contain?"]
+TOPICS = ["vector database", "search latency", "python example", "network cache"]
+ACTIONS = ("ingest", "chat", "shorts", "transcript")
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    """
+    Stand-in for a Gemini GenerativeModel: sleeps like a model call and fails like an overloaded one.
+    """
+
+    def __init__(self, latency: float, jitter: float, error_rate: float, seed: int):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            failed = self._random.random() < self.error_rate
+        time.sleep(delay)
+        if failed:
+            raise FakeBackendError("Injected model failure", status_code=503)
+        text = f"An answer grounded in {len(prompt)} characters of context."
+        return iter([FakeResponse(text)]) if stream else FakeResponse(text)
+
+
+class FakeGenAI:
+    """
+    Replaces the configured google.generativeai module, handing out one shared FakeModel.
+    """
+
+    def __init__(self, model: FakeModel):
+        self.model = model
+
+    def GenerativeModel(self, *args, **kwargs) -> FakeModel:
+        return self.model
+
+
+def run_session(session: int, args: argparse.Namespace, samples: Dict[str, List[float]], errors: Dict[str, int],
+                lock: threading.Lock) -> None:
+    generator = random.Random(session)
+
+    def measure(action: str, function) -> object:
+        # A None result or an exception counts as a failed action
+        started = time.perf_counter()
+        try:
+            result = function()
+        except Exception:
+            result = None
+        elapsed = time.perf_counter() - started
+        with lock:
+            samples[action].append(elapsed)
+            errors[action] += int(result is None)
+        return result
+
+    def chat(collection: object, video_id: str) -> object:
+        question = generator.choice(QUESTIONS)
+        context, _details = database_operations.chat_with_video(collection, video_id, question)
+        if not context:
+            return None
+        return advanced_language_model.generate_answer_from_context(question, context)
+
+    urls = [f"https://www.youtube.com/watch?v=load{session}x{number}" for number in range(args.videos)]
+    # add_videos_to_index returns (None, None) when no video could be saved
+    video_dict, collection = measure("ingest", lambda: database_operations.add_videos_to_index(f"load-{session}", urls)) or (None, None)
+    if not video_dict:
+        return
+    video_ids = list(video_dict.values())
+    for _ in range(args.iterations):
+        video_id = generator.choice(video_ids)
+        measure("chat", lambda: chat(collection, video_id))
+        measure("shorts", lambda: database_operations.watch_shorts(collection, video_id, generator.choice(TOPICS)))
+        measure("transcript", lambda: database_operations.transcribe_video(collection, video_id))
+        if args.think_ms:
+            time.sleep(generator.uniform(0, 2 * args.think_ms) / 1000)
+
+
+def summarize(samples: Dict[str, List[float]], errors: Dict[str, int], wall_seconds: float) -> Dict[str, object]:
+    operations = {}
+    for action in ACTIONS:
+        values = samples[action]
+        operations[action] = {
+            "count": len(values),
+            "errors": errors[action],
+            "error_rate": round(errors[action] / len(values), 4) if values else 0.0,
+            "throughput": round(len(values) / wall_seconds, 2) if wall_seconds else 0.0,
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+        }
+    total = sum(len(values) for values in samples.values())
+    return {"wall_seconds": round(wall_seconds, 3), "throughput": round(total / wall_seconds, 2) if wall_seconds else 0.0,
+            "operations": operations}
+
+
+def compare(report: Dict[str, object], baseline: Dict[str, object], tolerance: float) -> List[str]:
+    """
+    Returns one line per regression of `report` against `baseline`.
+    """
+    regressions = []
+    if report["throughput"] < baseline["throughput"] * (1 - tolerance):
+        regressions.append(f"throughput {baseline['throughput']} -> {report['throughput']} actions/s")
+    for action, current in report["operations"].items():
+        previous = baseline["operations"].get(action)
+        if not previous or not current["count"]:
+            continue
+        # p99 is reported but not compared; with a few hundred samples it mostly reflects retry jitter
+        for key in ("p50_ms", "p95_ms"):
+            if current[key] > previous[key] * (1 + tolerance):
+                regressions.append(f"{action} {key} {previous[key]} -> {current[key]}")
+        if current["error_rate"] > previous["error_rate"] + tolerance / 10:
+            regressions.append(f"{action} error_rate {previous['error_rate']} -> {current['error_rate']}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent user sessions")
+    parser.add_argument("--iterations", type=int, default=5, help="Chat / clip / transcript rounds per session")
+    parser.add_argument("--videos", type=int, default=3, help="Videos in the library of each session")
+    parser.add_argument("--latency-ms", type=float, default=20, help="Mean latency of a fake VideoDB call")
+    parser.add_argument("--jitter-ms", type=float, default=10, help="Uniform jitter around the VideoDB latency")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Probability that a VideoDB call fails")
+    parser.add_argument("--llm-latency-ms", type=float, default=200, help="Mean latency of a fake Gemini call")
+    parser.add_argument("--llm-jitter-ms", type=float, default=100, help="Uniform jitter around the Gemini latency")
+    parser.add_argument("--llm-error-rate", type=float, default=0.02, help="Probability that a Gemini call fails")
+    parser.add_argument("--think-ms", type=float, default=0, help="Mean pause of a session between rounds")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--save", help="Write the report to this JSON file")
+    parser.add_argument("--baseline", help="Compare with a report saved by an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown before a regression is reported")
+    args = parser.parse_args()
+
+    # Retry warnings, and Streamlit's warnings about add_videos_to_index running outside an app, would drown the report
+    logging.disable(logging.WARNING)
+    connection = FakeConnection(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000, error_rate=args.error_rate, seed=args.seed)
+    model = FakeModel(args.llm_latency_ms / 1000, args.llm_jitter_ms / 1000, args.llm_error_rate, args.seed)
+    database_operations.repository = VideoRepository(FAKE_BACKEND_NAME, connection=connection)
+    advanced_language_model._genai = FakeGenAI(model)
+
+    samples: Dict[str, List[float]] = {action: [] for action in ACTIONS}
+    errors: Dict[str, int] = {action: 0 for action in ACTIONS}
+    lock = threading.Lock()
+    started = time.perf_counter()
+    # chat_with_video also prints failures; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=args.sessions) as executor:
+        list(executor.map(lambda session: run_session(session, args, samples, errors, lock), range(args.sessions)))
+    report = summarize(samples, errors, time.perf_counter() - started)
+    report["config"] = {key: value for key, value in vars(args).items() if key not in ("save", "baseline")}
+    report["backend_calls"] = connection.calls
+    report["llm_calls"] = model.calls
+
+    print(f"sessions={args.sessions} iterations={args.iterations} wall={report['wall_seconds']:.2f}s "
+          f"throughput={report['throughput']:.1f} actions/s backend_calls={connection.calls} llm_calls={model.calls}")
+    for action, values in report["operations"].items():
+        print(f"{action:<10} count={values['count']:<5} errors={values['errors']:<4} {values['throughput']:>7.1f}/s "
+              f"p50={values['p50_ms']:>8.1f}ms p95={values['p95_ms']:>8.1f}ms p99={values['p99_ms']:>8.1f}ms")
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Report saved to {args.save}")
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline.get("config") != report["config"]:
+            print("Warning: the baseline was recorded with different settings.")
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regression against {args.baseline} (tolerance {args.tolerance:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
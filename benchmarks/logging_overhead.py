@@ -0,0 +1,70 @@
+"""
+Per-call cost of logging on the request thread: the synchronous file handler the app used before,
+the background writer with JSON lines, and the background writer with INFO sampling.
+
+Each mode logs the same messages as the hot paths of db/database_operations.py from several threads
+and reports the mean and p99 time spent inside logging.info on the calling thread, and how long the
+background writer needed to drain its queue afterwards.
+
+Run from the repository root:
+    python -m benchmarks.logging_overhead --calls 20000 --threads 4
+"""
+import argparse
+import importlib
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from utils import helpers
+from utils.helpers import percentile
+
+
+QUERY = "How does the transcript cache decide when an entry has expired and needs to be fetched again from the backend?"
+
+
+def log_calls(calls: int) -> List[float]:
+    samples = []
+    for number in range(calls):
+        started = time.perf_counter()
+        logging.info(f"Search on videodb is successful. fn=chat_with_video. video_id=m-{number % 50:04d}, query={QUERY}, shots=5, segments=3")
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def run_mode(name: str, directory: str, args: argparse.Namespace, mode: str, log_format: str, sample: float) -> None:
+    os.environ["VIDEOLENS_LOG_FORMAT"] = log_format
+    os.environ["VIDEOLENS_LOG_INFO_SAMPLE"] = str(sample)
+    os.environ["VIDEOLENS_LOG_QUEUE_SIZE"] = str(args.calls * args.threads)
+    # The settings are read at import time
+    importlib.reload(helpers)
+    log_file = os.path.join(directory, f"{name}.log")
+    helpers.setup_logging(log_file, mode=mode)
+
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        samples = [sample for batch in executor.map(log_calls, [args.calls] * args.threads) for sample in batch]
+    drained = time.perf_counter()
+    helpers.stop_logging()
+    drain_seconds = time.perf_counter() - drained
+    print(f"{name:<16} calls={len(samples)} mean={sum(samples) / len(samples) * 1e6:7.1f}us "
+          f"p99={percentile(samples, 99) * 1e6:7.1f}us drain={drain_seconds * 1000:7.1f}ms "
+          f"file={os.path.getsize(log_file) / 1024:8.0f}KB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20000, help="logging.info calls per thread")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--sample", type=float, default=0.1, help="INFO sampling rate of the last mode")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        run_mode("sync text", directory, args, "sync", "text", 1.0)
+        run_mode("async json", directory, args, "async", "json", 1.0)
+        run_mode(f"async json {args.sample:g}", directory, args, "async", "json", args.sample)
+
+
+if __name__ == "__main__":
+    main()
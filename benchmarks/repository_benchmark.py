@@ -0,0 +1,48 @@
+"""
+Counts backend round trips per interactive action (chat search, clip search, transcript) when video
+handles come from VideoRepository, against the in-memory fake backend.
+
+Run from the repository root:
+    python -m benchmarks.repository_benchmark --latency-ms 20
+"""
+import argparse
+import os
+import tempfile
+import time
+
+# Keep the caches of the run out of the working directory; must happen before the db modules are imported
+os.environ.setdefault("VIDEOLENS_CACHE_DIR", tempfile.mkdtemp(prefix="videolens-repository-"))
+
+from db import database_operations
+from db.fake_backend import FakeConnection
+from db.video_repository import FAKE_BACKEND_NAME, VideoRepository
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    connection = FakeConnection(latency=args.latency_ms / 1000)
+    database_operations.repository = VideoRepository(FAKE_BACKEND_NAME, connection=connection)
+    database_operations.transcript_cache.clear()
+    collection = connection.create_collection("benchmark")
+    video = collection.upload(url="https://www.youtube.com/watch?v=repository")
+    video.index_spoken_words()
+
+    actions = {
+        "chat": lambda: database_operations.chat_with_video(collection, video.id, "search latency cache"),
+        "shorts": lambda: database_operations.watch_shorts(collection, video.id, "vector database"),
+        "transcript": lambda: database_operations.transcribe_video(collection, video.id),
+    }
+    for name, action in actions.items():
+        for round_number in range(args.rounds):
+            calls, started = connection.calls, time.perf_counter()
+            action()
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f"{name:<10} round={round_number} backend_calls={connection.calls - calls} time={elapsed:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
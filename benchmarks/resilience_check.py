@@ -0,0 +1,81 @@
+"""
+Exercises the retry / circuit breaker layer against the in-memory fake backend with injected failures.
+
+Phase 1 runs chat searches while a fraction of backend calls fail with a transient status and reports
+how many still succeed thanks to retries. Phase 2 simulates an outage: the breaker opens and later calls
+fail fast instead of waiting on the provider. Phase 3 lifts the outage, lets a single trial call through
+the half-open breaker and runs the load again once it has closed.
+
+Run from the repository root:
+    python -m benchmarks.resilience_check --error-rate 0.3 --latency-ms 10
+"""
+import argparse
+import contextlib
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from db import database_operations
+from db.fake_backend import FakeConnection
+from db.video_repository import FAKE_BACKEND_NAME, VideoRepository
+from utils import resilience
+from utils.metrics import metrics
+
+
+def run_phase(name: str, collection: object, video_id: str, requests: int, workers: int) -> None:
+    def one(_: int) -> bool:
+        context, _details = database_operations.chat_with_video(collection, video_id, "search latency cache")
+        return bool(context)
+
+    started = time.perf_counter()
+    # chat_with_video also prints failures; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=workers) as executor:
+        succeeded = sum(executor.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+    counters = metrics.snapshot()
+    search = counters.get("videodb.search", {})
+    provider = counters.get("videodb", {})
+    print(f"{name:<9} ok={succeeded}/{requests} time={elapsed:.2f}s retries={search.get('retries', 0)} "
+          f"exhausted={search.get('retries_exhausted', 0)} rejected_by_breaker={provider.get('breaker_rejections', 0)} "
+          f"breaker={resilience.endpoint('videodb.search').breaker.state}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--error-rate", type=float, default=0.3)
+    parser.add_argument("--latency-ms", type=float, default=10)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--reset-seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    connection = FakeConnection(latency=args.latency_ms / 1000, seed=7)
+    database_operations.repository = VideoRepository(FAKE_BACKEND_NAME, connection=connection)
+    collection = connection.create_collection("resilience")
+    video = collection.upload(url="https://www.youtube.com/watch?v=resilience")
+    video.index_spoken_words()
+    database_operations.repository.remember(collection, video)
+
+    search = resilience.endpoint("videodb.search")
+    search.base_delay, search.max_delay = 0.02, 0.2
+    search.breaker.reset_seconds = args.reset_seconds
+
+    metrics.reset()
+    connection.error_rate = args.error_rate
+    run_phase("flaky", collection, video.id, args.requests, args.workers)
+
+    metrics.reset()
+    connection.error_rate = 1.0
+    run_phase("outage", collection, video.id, args.requests, args.workers)
+
+    metrics.reset()
+    connection.error_rate = 0.0
+    time.sleep(args.reset_seconds)
+    # While half-open the breaker admits a single trial call; concurrent callers keep failing fast until it succeeds
+    run_phase("trial", collection, video.id, 1, 1)
+    metrics.reset()
+    run_phase("recovered", collection, video.id, args.requests, args.workers)
+
+
+if __name__ == "__main__":
+    main()
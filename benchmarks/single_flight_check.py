@@ -0,0 +1,111 @@
+"""
+Checks that concurrent identical requests are coalesced: N sessions asking the same thing at the same
+moment must cause exactly one backend or Gemini call, while N different requests still cause N calls.
+Every coalesced caller must also get the same streamed answer, and a failing call must fail for all of them.
+
+Uses the in-memory fake backend and the fake Gemini model of the load test, both slow enough for the
+requests to overlap. Exits with status 1 if a count is off.
+
+Run from the repository root:
+    python -m benchmarks.single_flight_check --sessions 16 --latency-ms 100
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+# Keep the caches of the run out of the working directory; must happen before the db modules are imported
+os.environ.setdefault("VIDEOLENS_CACHE_DIR", tempfile.mkdtemp(prefix="videolens-single-flight-"))
+
+from benchmarks.load_test import FakeGenAI, FakeModel
+from db import database_operations
+from db.fake_backend import FakeConnection
+from db.video_repository import FAKE_BACKEND_NAME, VideoRepository
+from llm import advanced_language_model
+from utils.single_flight import single_flight
+
+
+def simultaneously(sessions: int, request: Callable[[int], object]) -> List[object]:
+    """
+    Runs `request(session)` in `sessions` threads released at the same instant.
+    """
+    barrier = threading.Barrier(sessions)
+
+    def one(session: int) -> object:
+        barrier.wait()
+        return request(session)
+
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        return list(executor.map(one, range(sessions)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    args = parser.parse_args()
+
+    connection = FakeConnection(latency=args.latency_ms / 1000, seed=7)
+    model = FakeModel(args.latency_ms / 1000, 0.0, 0.0, seed=7)
+    database_operations.repository = VideoRepository(FAKE_BACKEND_NAME, connection=connection)
+    advanced_language_model._genai = FakeGenAI(model)
+    collection = connection.create_collection("single-flight")
+    video = collection.upload(url="https://www.youtube.com/watch?v=singleflight")
+    video.index_spoken_words()
+
+    def backend_calls(request: Callable[[int], object]) -> int:
+        before = connection.calls
+        simultaneously(args.sessions, request)
+        return connection.calls - before
+
+    def model_calls(request: Callable[[int], object]) -> int:
+        before = model.calls
+        simultaneously(args.sessions, request)
+        return model.calls - before
+
+    def streamed_answer(_: int) -> str:
+        return "".join(advanced_language_model.generate_answer_stream("What is shared?", "context"))
+
+    def shared_failures(_: int) -> int:
+        def fail() -> None:
+            time.sleep(args.latency_ms / 1000)
+            raise RuntimeError("injected failure")
+
+        try:
+            single_flight.call("check.failure", "same", fail)
+        except RuntimeError:
+            return 1
+        return 0
+
+    checks = [
+        ("video lookup", 1, lambda: backend_calls(lambda _: database_operations.repository.get_video(collection, video.id))),
+        ("chat search", 1, lambda: backend_calls(lambda _: database_operations.chat_with_video(collection, video.id, "search latency cache"))),
+        ("transcript", 1, lambda: backend_calls(lambda _: database_operations.transcribe_video(collection, video.id))),
+        ("different searches", args.sessions,
+         lambda: backend_calls(lambda session: database_operations.chat_with_video(collection, video.id, f"cache {session}"))),
+        ("gemini answer", 1, lambda: model_calls(lambda _: advanced_language_model.generate_answer_from_context("What is cached?", "context"))),
+        ("gemini stream", 1, lambda: model_calls(lambda _: "".join(advanced_language_model.generate_answer_stream("What is cached?", "context")))),
+        ("different prompts", args.sessions,
+         lambda: model_calls(lambda session: advanced_language_model.generate_answer_from_context(f"Question {session}?", "context"))),
+        ("same streamed answer", 1, lambda: len(set(simultaneously(args.sessions, streamed_answer)))),
+        ("failure shared", args.sessions, lambda: sum(simultaneously(args.sessions, shared_failures))),
+    ]
+    failed = False
+    # chat_with_video also prints failures; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = [(name, expected, check()) for name, expected, check in checks]
+    for name, expected, actual in results:
+        failed = failed or actual != expected
+        print(f"{name:<20} sessions={args.sessions} actual={actual} expected={expected} {'ok' if actual == expected else 'FAILED'}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
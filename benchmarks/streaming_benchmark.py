@@ -0,0 +1,73 @@
+"""
+Measures time-to-first-chunk vs. time-to-full-answer of generate_answer_stream, using a fake
+model that yields chunks with a fixed delay between them.
+
+Exits with status 1 if the model was not asked to stream, if the first chunk took longer than two chunk
+delays, or if the chunks did not arrive complete and in order.
+
+Run from the repository root:
+    python -m benchmarks.streaming_benchmark --chunks 20 --delay 0.05
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("GEMINI_PRO_KEY", "offline-benchmark")
+
+from llm.advanced_language_model import generate_answer_stream
+
+
+class FakeChunk:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeStreamingModel:
+    def __init__(self, chunks: int, delay: float):
+        self.chunks = chunks
+        self.delay = delay
+        self.streamed = False
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        self.streamed = stream
+        for number in range(self.chunks):
+            time.sleep(self.delay)
+            yield FakeChunk(f"chunk-{number} ")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    model = FakeStreamingModel(args.chunks, args.delay)
+    started = time.perf_counter()
+    first_chunk, parts = None, []
+    for part in generate_answer_stream("What is this video about?", "some context", model=model):
+        if first_chunk is None:
+            first_chunk = time.perf_counter() - started
+        parts.append(part)
+    total = time.perf_counter() - started
+
+    print(f"chunks={len(parts)} delay={args.delay}s")
+    print(f"time to first chunk: {first_chunk:.3f}s")
+    print(f"time to full answer: {total:.3f}s")
+
+    checks = [
+        ("streamed response requested", True, model.streamed),
+        # The first chunk must not wait for the rest of the answer
+        ("first chunk within two delays", True, first_chunk is not None and first_chunk <= 2 * args.delay),
+        ("chunks complete and in order", [f"chunk-{number} " for number in range(args.chunks)], parts),
+    ]
+    failed = False
+    for name, expected, actual in checks:
+        failed = failed or actual != expected
+        print(f"{name:<30} {'ok' if actual == expected else f'FAILED expected={expected} actual={actual}'}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Map-reduce summarization latency against transcript length, with a fake LLM that sleeps per call.
+
+With enough workers the wall time follows the depth of the reduce tree rather than the number of chunks.
+The last run summarizes the second half of the longest transcript again and shows how many calls are
+served from the chunk summary cache.
+
+Run from the repository root:
+    python -m benchmarks.summarizer_benchmark --delay 0.05 --workers 16
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from db.transcript_cache import TranscriptCache
+from llm.summarizer import Summarizer
+
+
+def fake_transcript(words: int, seed: int = 7) -> list:
+    generator = random.Random(seed)
+    vocabulary = "video data model search python network cache latency index summary topic speaker example".split()
+    segments, position = [], 0
+    while position < words:
+        sentence = " ".join(generator.choice(vocabulary) for _ in range(generator.randint(8, 20))) + "."
+        length = len(sentence.split())
+        segments.append({"start": position / 2.5, "end": (position + length) / 2.5, "text": sentence})
+        position += length
+    return segments
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delay", type=float, default=0.05, help="Seconds per fake LLM call")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--fan-in", type=int, default=4)
+    parser.add_argument("--chunk-tokens", type=int, default=2000)
+    args = parser.parse_args()
+
+    def fake_llm(prompt: str) -> str:
+        time.sleep(args.delay)
+        return f"summary of {len(prompt)} characters"
+
+    with tempfile.TemporaryDirectory() as directory:
+        summarizer = Summarizer(generate=fake_llm, cache=TranscriptCache(os.path.join(directory, "summaries.db")),
+                                chunk_tokens=args.chunk_tokens, fan_in=args.fan_in, max_workers=args.workers)
+        segments = []
+        for words in (5_000, 20_000, 80_000):
+            segments = fake_transcript(words)
+            result = summarizer.summarize(segments)
+            print(f"words={words:<6} chunks={result.chunks:<4} levels={result.levels} llm_calls={result.llm_calls:<4} "
+                  f"cached={result.cached_calls:<4} time={result.seconds:.2f}s")
+        result = summarizer.summarize(segments[len(segments) // 2:])
+        print(f"second half again: chunks={result.chunks} llm_calls={result.llm_calls} cached={result.cached_calls} time={result.seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Checks the paged transcript of the Get Transcript page against a word-level transcript, the way VideoDB
+returns it: words must be grouped into lines, a two-word phrase must be found, a timestamp must land on
+the page holding it, and transcripts that already come as sentences must keep their lines.
+
+Uses the in-memory fake backend. Exits with status 1 if a check fails.
+
+Run from the repository root:
+    python -m benchmarks.transcript_pages_check --words 1500
+"""
+import argparse
+import sys
+
+from db.fake_backend import FakeConnection
+from db.transcript_pages import TRANSCRIPT_LINE_WORDS, PagedTranscript
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=1500, help="words in the fake video's transcript")
+    args = parser.parse_args()
+
+    connection = FakeConnection(words_per_video=args.words, seed=7)
+    video = connection.create_collection("transcript-pages").upload(url="https://www.youtube.com/watch?v=pages")
+    words = video.get_transcript()
+    transcript = PagedTranscript(words)
+
+    # Two adjacent words inside the first line
+    phrase = f"{words[10]['text']} {words[11]['text']}"
+    hits = transcript.search(phrase)
+    target = words[args.words // 2]["start"]
+    sentences = [{"start": 0.0, "end": 2.0, "text": "The cache keeps transcripts."},
+                 {"start": 2.0, "end": 4.5, "text": "Searches never call the backend!"}]
+
+    checks = [
+        ("word segments grouped into lines", -(-args.words // TRANSCRIPT_LINE_WORDS), len(transcript)),
+        ("two-word phrase found", True, any(phrase in hit.text for hit in hits)),
+        ("jump lands on the line playing", True, transcript.line(transcript.position_at(target)).start <= target
+         <= transcript.line(transcript.position_at(target)).end),
+        ("sentences kept as lines", [s["text"] for s in sentences], [line.text for line in PagedTranscript(sentences).page(1)]),
+    ]
+    failed = False
+    for name, expected, actual in checks:
+        failed = failed or actual != expected
+        print(f"{name:<34} expected={expected} actual={actual} {'ok' if actual == expected else 'FAILED'}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+
+from db.transcript_cache import CACHE_DIR
+from utils.metrics import metrics
+
+
+DEFAULT_TTL_SECONDS = float(os.getenv("VIDEOLENS_ARTIFACT_TTL", str(7 * 24 * 3600)))
+DEFAULT_MAX_BYTES = int(float(os.getenv("VIDEOLENS_ARTIFACT_CACHE_MB", "512")) * 1024 * 1024)
+DOWNLOAD_TIMEOUT_SECONDS = float(os.getenv("VIDEOLENS_ARTIFACT_DOWNLOAD_TIMEOUT", "10"))
+
+SUBTITLES = "subtitles"
+THUMBNAIL = "thumbnail"
+CLIP = "clip"
+
+
+@dataclass
+class Artifact:
+    """
+    A derived artifact of a video: the URL the backend rendered it to and, for images, a local copy of its bytes.
+    """
+    url: str
+    path: Optional[str] = None
+
+    @property
+    def location(self) -> str:
+        """
+        The local file if the bytes were downloaded, otherwise the remote URL.
+        """
+        return self.path or self.url
+
+
+def params_key(params: Optional[Dict[str, Any]]) -> str:
+    """
+    Canonical form of the render parameters, so equal parameters in any order map to the same record.
+    """
+    return json.dumps(params or {}, sort_keys=True, separators=(",", ":"))
+
+
+class ArtifactStore:
+    """
+    Records of server-side renders (subtitled streams, thumbnails, compiled clips) keyed by (video_id, kind, parameters).
+
+    Records live in a SQLite file and downloaded bytes in a content-addressed directory next to it, so
+    every Streamlit session and worker process on the machine reuses a render instead of requesting it
+    again. Records expire after a TTL, and the least recently used blobs are evicted once the directory
+    grows past its size budget.
+    """
+
+    def __init__(self, path: str = os.path.join(CACHE_DIR, "artifacts.db"), blob_dir: str = os.path.join(CACHE_DIR, "artifacts"),
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            path (str): Location of the SQLite file. Its directory is created if missing.
+            blob_dir (str): Directory holding downloaded bytes, one file per SHA-256 digest.
+            ttl_seconds (float): Age after which a record is treated as missing.
+            max_bytes (int): Total blob size above which least recently used blobs are evicted.
+        """
+        for directory in (os.path.dirname(path), blob_dir):
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory, exist_ok=True)
+        self.blob_dir = blob_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS artifacts ("
+            " video_id TEXT NOT NULL, kind TEXT NOT NULL, params TEXT NOT NULL, url TEXT NOT NULL,"
+            " digest TEXT, size INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL, accessed_at REAL NOT NULL,"
+            " PRIMARY KEY (video_id, kind, params))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS artifacts_accessed ON artifacts (accessed_at)")
+
+    def get(self, video_id: str, kind: str, params: Optional[Dict[str, Any]] = None) -> Optional[Artifact]:
+        """
+        Returns the recorded artifact, or None if it is missing, expired or its downloaded bytes are gone.
+        """
+        key = (video_id, kind, params_key(params))
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, digest, created_at FROM artifacts WHERE video_id = ? AND kind = ? AND params = ?", key
+            ).fetchone()
+            if row is not None:
+                url, digest, created_at = row
+                path = self._blob_path(digest) if digest else None
+                if now - created_at > self.ttl_seconds or (path is not None and not os.path.exists(path)):
+                    self._db.execute("DELETE FROM artifacts WHERE video_id = ? AND kind = ? AND params = ?", key)
+                    self._remove_unreferenced([digest])
+                    row = None
+                else:
+                    self._db.execute(
+                        "UPDATE artifacts SET accessed_at = ? WHERE video_id = ? AND kind = ? AND params = ?", (now, *key)
+                    )
+        metrics.record_cache("artifact_store", row is not None)
+        return Artifact(url, path) if row is not None else None
+
+    def put(self, video_id: str, kind: str, url: str, params: Optional[Dict[str, Any]] = None, data: Optional[bytes] = None) -> Artifact:
+        """
+        Records an artifact and, if `data` is given, stores its bytes under their SHA-256 digest.
+
+        Returns:
+            Artifact: The recorded artifact.
+        """
+        digest = path = None
+        if data is not None:
+            digest = hashlib.sha256(data).hexdigest()
+            path = self._blob_path(digest)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(temporary, "wb") as f:
+                    f.write(data)
+                os.replace(temporary, path)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO artifacts (video_id, kind, params, url, digest, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (video_id, kind, params_key(params), url, digest, len(data) if data is not None else 0, now, now)
+            )
+            self._evict(now)
+        return Artifact(url, path)
+
+    def invalidate(self, video_ids: Iterable[str]) -> None:
+        """
+        Drops every artifact of the given videos, including blobs no other record points to.
+        """
+        video_ids = list(video_ids)
+        with self._lock:
+            digests = [row[0] for video_id in video_ids for row in self._db.execute(
+                "SELECT digest FROM artifacts WHERE video_id = ? AND digest IS NOT NULL", (video_id,)).fetchall()]
+            self._db.executemany("DELETE FROM artifacts WHERE video_id = ?", [(video_id,) for video_id in video_ids])
+            self._remove_unreferenced(digests)
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def _remove_unreferenced(self, digests: Iterable[Optional[str]]) -> None:
+        for digest in set(digests):
+            if not digest:
+                continue
+            if self._db.execute("SELECT 1 FROM artifacts WHERE digest = ? LIMIT 1", (digest,)).fetchone() is None:
+                try:
+                    os.remove(self._blob_path(digest))
+                except FileNotFoundError:
+                    pass
+
+    def _evict(self, now: float) -> None:
+        expired = [row[0] for row in self._db.execute(
+            "SELECT digest FROM artifacts WHERE created_at < ?", (now - self.ttl_seconds,)).fetchall()]
+        self._db.execute("DELETE FROM artifacts WHERE created_at < ?", (now - self.ttl_seconds,))
+        self._remove_unreferenced(expired)
+        # Records sharing a blob count it once
+        blobs = self._db.execute(
+            "SELECT digest, MAX(size), MAX(accessed_at) FROM artifacts WHERE digest IS NOT NULL"
+            " GROUP BY digest ORDER BY MAX(accessed_at)").fetchall()
+        total = sum(size for _, size, _ in blobs)
+        evicted = 0
+        for digest, size, _ in blobs:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM artifacts WHERE digest = ?", (digest,))
+            self._remove_unreferenced([digest])
+            total -= size
+            evicted += 1
+        if evicted:
+            logging.info(f"Evicted {evicted} artifact blobs. fn=ArtifactStore._evict")
+
+
+def download(url: str, timeout: float = DOWNLOAD_TIMEOUT_SECONDS) -> Optional[bytes]:
+    """
+    Fetches the bytes behind an artifact URL. Returns None if the URL cannot be downloaded, in which case
+    callers keep serving the remote URL.
+    """
+    try:
+        import requests
+
+        response = requests.get(url, timeout=timeout)
+        response.raise_for_status()
+        return response.content
+    except Exception as e:
+        logging.warning(f"Artifact download failed, keeping the remote URL. fn=download, url={url}, error={e}")
+        return None
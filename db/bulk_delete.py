@@ -0,0 +1,95 @@
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from utils.resilience import resilient_call
+
+
+DEFAULT_DELETE_WORKERS = int(os.getenv("VIDEOLENS_DELETE_WORKERS", "8"))
+
+
+@dataclass
+class DeleteOutcome:
+    """
+    Result of deleting a single video.
+    """
+    video_id: str
+    video_name: Optional[str] = None
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class DeleteReport:
+    """
+    Aggregated result of a bulk delete.
+    """
+    outcomes: List[DeleteOutcome] = field(default_factory=list)
+    wall_seconds: float = 0.0
+
+    @property
+    def succeeded(self) -> List[DeleteOutcome]:
+        return [outcome for outcome in self.outcomes if outcome.ok]
+
+    @property
+    def failed(self) -> List[DeleteOutcome]:
+        return [outcome for outcome in self.outcomes if not outcome.ok]
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "deleted": [outcome.video_id for outcome in self.succeeded],
+            "failed": {outcome.video_id: outcome.error for outcome in self.failed},
+            "wall_seconds": round(self.wall_seconds, 3),
+        }
+
+
+def _delete_one(collection: object, video_id: str, video_name: Optional[str]) -> DeleteOutcome:
+    outcome = DeleteOutcome(video_id=video_id, video_name=video_name)
+    started = time.perf_counter()
+    try:
+        resilient_call("videodb.delete_video", collection.delete_video, video_id)
+    except Exception as error:
+        outcome.error = str(error)
+        logging.error(f"Error deleting video {video_id}. fn=_delete_one, error={error}")
+    outcome.seconds = time.perf_counter() - started
+    return outcome
+
+
+def delete_videos(collection: object, videos: Dict[str, Optional[str]], max_workers: int = DEFAULT_DELETE_WORKERS,
+                  on_progress: Optional[Callable[[DeleteOutcome, int, int], None]] = None) -> DeleteReport:
+    """
+    Deletes videos by ID with bounded concurrency. A failed deletion is recorded and does not stop the others.
+
+    Args:
+        collection (object): The video collection object.
+        videos (Dict[str, Optional[str]]): Video IDs to delete, mapped to their names for reporting.
+        max_workers (int): Maximum number of deletions in flight at the same time.
+        on_progress (Optional[Callable[[DeleteOutcome, int, int], None]]): Called with (outcome, done, total)
+            each time a deletion finishes, on the calling thread.
+
+    Returns:
+        DeleteReport: Per-video outcomes in input order and the total wall-clock time.
+    """
+    report = DeleteReport()
+    started = time.perf_counter()
+    outcomes: Dict[int, DeleteOutcome] = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="delete") as executor:
+        futures = {executor.submit(_delete_one, collection, video_id, name): position
+                   for position, (video_id, name) in enumerate(videos.items())}
+        for done, future in enumerate(as_completed(futures), start=1):
+            outcome = future.result()
+            outcomes[futures[future]] = outcome
+            if on_progress is not None:
+                on_progress(outcome, done, len(videos))
+
+    report.outcomes = [outcomes[position] for position in sorted(outcomes)]
+    report.wall_seconds = time.perf_counter() - started
+    logging.info(f"Deleted {len(report.succeeded)}/{len(videos)} videos in {report.wall_seconds:.2f}s. fn=delete_videos")
+    return report
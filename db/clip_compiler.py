@@ -0,0 +1,87 @@
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, List, Tuple
+
+
+# Shots separated by at most this many seconds are played as one continuous clip
+CLIP_MERGE_GAP_SECONDS = float(os.getenv("VIDEOLENS_CLIP_MERGE_GAP", "3.0"))
+# Upper bound of the total length of a compiled clip
+CLIP_MAX_SECONDS = float(os.getenv("VIDEOLENS_CLIP_MAX_SECONDS", "120"))
+
+_WORD = re.compile(r"\w+")
+
+
+@dataclass
+class ClipSegment:
+    start: float
+    end: float
+    score: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class CompiledClip:
+    """
+    One stream covering the best matching parts of a video, in timeline order.
+    """
+    stream_url: str
+    timeline: List[Tuple[float, float]] = field(default_factory=list)
+    cached: bool = False
+
+    @property
+    def duration(self) -> float:
+        return sum(end - start for start, end in self.timeline)
+
+
+def normalize_topic(topic: str) -> str:
+    """
+    Reduces a search topic to lowercase words, so differences in case, spacing and punctuation share one clip.
+    """
+    return " ".join(_WORD.findall(topic.lower()))
+
+
+def merge_segments(shots: List[Any], merge_gap: float = CLIP_MERGE_GAP_SECONDS) -> List[ClipSegment]:
+    """
+    Merges overlapping or nearby shots with a sort-and-sweep pass and returns the segments in timeline order.
+    A merged segment keeps the best score of its shots.
+    """
+    segments: List[ClipSegment] = []
+    for shot in sorted(shots, key=lambda shot: float(shot.start or 0.0)):
+        start, end, score = float(shot.start or 0.0), float(shot.end or 0.0), float(shot.search_score or 0.0)
+        if end <= start:
+            continue
+        if segments and start <= segments[-1].end + merge_gap:
+            last = segments[-1]
+            last.end, last.score = max(last.end, end), max(last.score, score)
+        else:
+            segments.append(ClipSegment(start, end, score))
+    return segments
+
+
+def compile_timeline(shots: List[Any], max_seconds: float = CLIP_MAX_SECONDS,
+                     merge_gap: float = CLIP_MERGE_GAP_SECONDS) -> List[Tuple[float, float]]:
+    """
+    Turns search hits into the timeline of a single stream.
+
+    Hits are merged where they overlap or nearly touch, then the best scoring segments are kept until
+    `max_seconds` is spent; the segment that does not fit is cut short. The timeline is returned in order.
+
+    Args:
+        shots (List[Any]): Search hits exposing start, end and search_score.
+        max_seconds (float): Maximum total length of the timeline.
+        merge_gap (float): Hits separated by at most this many seconds are merged.
+
+    Returns:
+        List[Tuple[float, float]]: (start, end) pairs in seconds, sorted and non-overlapping.
+    """
+    chosen, remaining = [], max_seconds
+    for segment in sorted(merge_segments(shots, merge_gap), key=lambda segment: -segment.score):
+        if remaining <= 0:
+            break
+        chosen.append((segment.start, segment.start + min(segment.duration, remaining)))
+        remaining -= segment.duration
+    return sorted(chosen)
@@ -1,67 +1,180 @@
 import os
 import streamlit as st
-from dotenv import load_dotenv
-from videodb import connect, SearchType, play_stream
-from typing import List, Tuple, Dict, Optional
-import streamlit as st
-from dotenv import load_dotenv
-import os
+from typing import Callable, Iterator, List, Tuple, Dict, Optional
 import logging
+import heapq
+from dataclasses import dataclass
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from db.video_repository import VideoRepository
+from db.ingest import DEFAULT_INGEST_WORKERS, IngestOutcome, IngestReport, ingest_videos
+from db.ingest_manifest import IngestManifest, canonical_url
+from db.bulk_delete import DEFAULT_DELETE_WORKERS, DeleteOutcome, DeleteReport, delete_videos
+from db.transcript_cache import TranscriptCache, TRANSCRIPT, SEGMENTS, METADATA
+from db.artifact_store import ArtifactStore, CLIP, SUBTITLES, THUMBNAIL
+from db.clip_compiler import CLIP_MAX_SECONDS, CompiledClip, compile_timeline, normalize_topic
+from db.local_search import LocalHit, LocalSearchIndex, get_local_index
+from db.transcript_pages import PagedTranscript, PagedTranscriptCache
+from utils.metrics import metrics, timed, track
+from utils.resilience import resilient_call
+from utils.single_flight import single_flight
+from llm.context_builder import CONTEXT_MAX_SHOTS, CONTEXT_TOKEN_BUDGET, build_context
+
+
+# The backend connection is opened lazily on first use and video handles are cached per collection
+repository = VideoRepository()
+
+VIDEODB_BACKEND = "videodb"
+LOCAL_BACKEND = "local"
+SEARCH_BACKENDS = (VIDEODB_BACKEND, LOCAL_BACKEND)
+
+
+def _configured_search_backend() -> str:
+    """
+    Reads VIDEOLENS_SEARCH_BACKEND, falling back to videodb with a warning if the value is not a known backend.
+    """
+    value = os.getenv("VIDEOLENS_SEARCH_BACKEND", VIDEODB_BACKEND).strip().lower()
+    if value not in SEARCH_BACKENDS:
+        logging.warning(f"Unknown search backend '{value}', using '{VIDEODB_BACKEND}'. Expected one of {list(SEARCH_BACKENDS)}. fn=_configured_search_backend")
+        return VIDEODB_BACKEND
+    return value
+
+
+DEFAULT_SEARCH_BACKEND = _configured_search_backend()
+SEARCH_DEADLINE_SECONDS = float(os.getenv("VIDEOLENS_SEARCH_DEADLINE", "5"))
+# Videos searched in parallel by one collection-wide search
+SEARCH_WORKERS = int(os.getenv("VIDEOLENS_SEARCH_WORKERS", "16"))
+# Build the local transcript index while ingesting, so the "local" backend is ready on first use
+LOCAL_INDEX_ON_INGEST = os.getenv("VIDEOLENS_LOCAL_INDEX_ON_INGEST", "false").lower() == "true"
+COLLECTION_PAGE_SIZE = int(os.getenv("VIDEOLENS_COLLECTION_PAGE_SIZE", "50"))
+
+# Transcripts, transcript segments and video metadata are cached on disk across reruns and sessions
+transcript_cache = TranscriptCache()
+# Subtitled streams, thumbnails and clips are rendered once per video and parameters and reused by every session
+artifact_store = ArtifactStore()
+# Array-backed, indexed transcripts for the paged transcript viewer, built from the cached segments
+paged_transcripts = PagedTranscriptCache()
+# Which URLs each collection already holds, so saving a library again only uploads new ones
+ingest_manifest = IngestManifest()
+
+
+def _shared_call(operation: str, key: object, function: Callable, *args, **kwargs) -> object:
+    """
+    Makes a resilient backend call, joining an identical call (same operation and key) already in flight
+    from another session instead of sending it again.
+    """
+    return single_flight.call(operation, key, resilient_call, operation, function, *args, **kwargs)
 
 
-# Load environment variables
-try:
-    load_dotenv(override=True)
-    videodb_api_key = os.getenv("VIDEODB_KEY")
-    
-    if videodb_api_key:    
-        # Establish a connection to the video database
-        connection = connect(api_key=videodb_api_key)
-        logging.info("API key configured successfully.")
-    else:
-        logging.error("VIDEODB_KEY is not set in the environment variables.")
-        # Raise an exception to halt execution
-        raise RuntimeError("API key configuration failed.")
-    
-except Exception as e:
-    logging.error(f"Error loading environment variables or configuring API key. error={e}")
-    raise  # Re-raise the exception to halt execution
+def _open_collection(collection_name: str) -> object:
+    """
+    Reopens the collection saved under this name, or creates it if it is unknown or gone from the backend.
+    """
+    collection_id = ingest_manifest.collection_id(repository.backend, collection_name)
+    if collection_id is not None:
+        try:
+            return repository.get_collection(collection_id)
+        except Exception as e:
+            logging.warning(f"Saved collection is unavailable, creating a new one. fn=_open_collection, collection_id={collection_id}, error={e}")
+            ingest_manifest.forget_collection(collection_id)
+    collection = repository.create_collection(collection_name)
+    ingest_manifest.set_collection(repository.backend, collection_name, collection.id)
+    return collection
+
+
+def ingest_collection(collection_name: str, youtube_urls: List[str], max_workers: int = DEFAULT_INGEST_WORKERS,
+                      on_progress: Optional[Callable[[IngestOutcome, int, int], None]] = None) -> Tuple[IngestReport, object]:
+    """
+    Opens the collection and uploads and indexes the videos into it, without touching the UI.
 
+    A collection saved before under the same name is reopened. URLs already uploaded and indexed into it
+    (compared in canonical form) are reused without any backend call, and videos whose indexing did not
+    finish are indexed without being uploaded again.
 
+    Args:
+        collection_name (str): The name of the collection to open or create.
+        youtube_urls (List[str]): List of YouTube URLs to upload.
+        max_workers (int): Maximum number of videos uploaded and indexed at the same time.
+        on_progress (Optional[Callable[[IngestOutcome, int, int], None]]): Called with (outcome, done, total) as videos finish.
 
-def add_videos_to_index(collection_name: str, youtube_urls: List[str]) -> Tuple[Optional[Dict[str, str]], Optional[object]]:
+    Returns:
+        Tuple[IngestReport, object]: The per-URL ingest report and the collection.
+    """
+    collection = _open_collection(collection_name)
+    known = ingest_manifest.entries(collection.id)
+    reused, pending, uploaded, seen = [], [], {}, set()
+    for url in youtube_urls:
+        key = canonical_url(url)
+        if key in seen:
+            continue
+        seen.add(key)
+        entry = known.get(key)
+        if entry is not None and entry.indexed:
+            reused.append(IngestOutcome(url=url, video_id=entry.video_id, video_name=entry.video_name, reused=True))
+            continue
+        pending.append(url)
+        if entry is not None:
+            uploaded[url] = entry.video_id
+
+    def on_uploaded(url: str, video: object) -> None:
+        ingest_manifest.record(collection.id, url, video.id, video.name, indexed=False)
+
+    def on_indexed(video: object) -> None:
+        ingest_manifest.mark_indexed(collection.id, video.id)
+        repository.remember(collection, video)
+        if LOCAL_INDEX_ON_INGEST:
+            index_video_locally(collection, video, save=False)
+
+    try:
+        report = ingest_videos(collection, pending, max_workers=max_workers, on_progress=on_progress,
+                               on_indexed=on_indexed, on_uploaded=on_uploaded, uploaded=uploaded)
+    finally:
+        if LOCAL_INDEX_ON_INGEST:
+            # Written once for the whole batch instead of once per video
+            get_local_index(collection.id).flush()
+    report.outcomes = reused + report.outcomes
+    logging.info(f"Reused {len(reused)}, indexed {len(uploaded)} and uploaded {len(pending) - len(uploaded)} videos. fn=ingest_collection, collection={collection_name}")
+    return report, collection
+
+
+@timed("db.add_videos_to_index")
+def add_videos_to_index(collection_name: str, youtube_urls: List[str], max_workers: int = DEFAULT_INGEST_WORKERS) -> Tuple[Optional[Dict[str, str]], Optional[object]]:
     """
     Uploads videos to the database, indexes their spoken words, and returns a dictionary of video names to their IDs and the collection.
+    Videos are processed concurrently and each one is indexed as soon as its own upload finishes. A failed URL is reported
+    and skipped instead of discarding the whole batch.
 
     Args:
         collection_name (str): The name of the collection to create.
         youtube_urls (List[str]): List of YouTube URLs to upload.
+        max_workers (int): Maximum number of videos uploaded and indexed at the same time.
  
     Returns:
-        Tuple[Optional[Dict[str, str]], Optional[object]]: A dictionary mapping video names to their IDs and the created collection. Returns (None, None) on failure.
+        Tuple[Optional[Dict[str, str]], Optional[object]]: A dictionary mapping video names to their IDs and the created collection. Returns (None, None) if no video could be ingested.
     """
     try:
-        video_dict = {}
-        collection = connection.create_collection(name=collection_name, description=collection_name)
-        
-        with st.spinner('Uploading Videos...'):
-            for url in youtube_urls:
-                try:
-                    video = collection.upload(url=url)
-                    video_dict[video.name] = video.id
-                    logging.info(f"Video: {video.name} ({url}) uploaded successfully. fn=add_videos_to_index")
-                except Exception as error:
-                    st.write(f"Failed to upload and index {url}. Error: {error}")
-                    logging.error(f"Error uploading and indexing video at URL {url}. fn=add_videos_to_index, error={error}")
-                    return None, None
-        
-        with st.spinner('Indexing spoken words...'):
-            for video in collection.get_videos():
-                video.index_spoken_words()
-                    
-        st.success(f"All videos in collection '{collection_name}' uploaded and indexed successfully.")
-        logging.info(f"All videos in collection '{collection_name}' uploaded and indexed successfully. fn=add_videos_to_index")
-        return video_dict, collection
+        progress_bar = st.progress(0.0, text="Uploading and indexing videos...")
+
+        def report_progress(outcome: IngestOutcome, done: int, total: int) -> None:
+            if outcome.ok:
+                st.write(f"Uploaded and indexed {outcome.video_name} ({outcome.url}).")
+            else:
+                st.write(f"Failed to upload and index {outcome.url}. Error: {outcome.error}")
+            progress_bar.progress(done / total, text=f"Processed {done} of {total} videos")
+
+        report, collection = ingest_collection(collection_name, youtube_urls, max_workers=max_workers, on_progress=report_progress)
+        progress_bar.empty()
+
+        if not report.succeeded:
+            logging.error(f"No videos could be uploaded and indexed. fn=add_videos_to_index, collection={collection_name}")
+            return None, None
+
+        if report.failed:
+            st.warning(f"{len(report.failed)} of {len(youtube_urls)} videos could not be uploaded and were skipped.")
+        else:
+            st.success(f"All videos in collection '{collection_name}' uploaded and indexed successfully.")
+        logging.info(f"{len(report.succeeded)} of {len(youtube_urls)} videos in collection '{collection_name}' uploaded and indexed in {report.wall_seconds:.2f}s. fn=add_videos_to_index")
+        return report.video_dict(), collection
     
     except Exception as e:
         logging.error(f"Error uploading and indexing videos. fn=add_videos_to_index, error={e}")
@@ -70,29 +183,45 @@ def add_videos_to_index(collection_name: str, youtube_urls: List[str]) -> Tuple[
 
 
 
-def chat_with_video(collection: object, video_id: str, query: str) -> Tuple[str, Dict[str, str]]:
+@timed("db.chat_with_video", payload_size=lambda result: len(result[0]))
+def chat_with_video(collection: object, video_id: str, query: str, search_backend: str = DEFAULT_SEARCH_BACKEND,
+                    top_k: int = CONTEXT_MAX_SHOTS, token_budget: int = CONTEXT_TOKEN_BUDGET) -> Tuple[str, Dict[str, object]]:
     """
-    Searches for related content within a specific video in the collection based on a query.
+    Searches for related content within a specific video in the collection based on a query and assembles
+    the best matching segments into a prompt context of bounded size.
 
     Args:
         collection (object): The video collection object.
         video_id (str): The ID of the video to search in.
         query (str): The search query.
+        search_backend (str): "videodb" for the remote search, "local" for the in-process transcript index.
+        top_k (int): Number of top-scoring shots considered for the context.
+        token_budget (int): Maximum estimated tokens of the returned context.
 
     Returns:
-        Tuple[str, Dict[str, str]]: The first result text and metadata. Returns empty string and dictionary on failure.
+        Tuple[str, Dict[str, object]]: The context text and metadata, including the chosen segments and their timestamps. On failure or when nothing matches, an empty string and a dictionary holding only the `error`.
     """
     try:
-        video = collection.get_video(video_id)
-        search_results = video.search(query=query)
-        first_result = search_results.get_shots()[0]
-        logging.info(f"Search on videodb is successful. fn=chat_with_video. video_id={video_id}, query={query}")
-        return first_result.text, {"video_title": first_result.video_title, "text": first_result.text}
+        if search_backend == LOCAL_BACKEND:
+            shots = _local_index_for(collection, video_id).search(query, video_id=video_id, top_k=top_k)
+        else:
+            video = repository.get_video(collection, video_id)
+            with track("videodb.search"):
+                search_results = _shared_call("videodb.search", (video_id, query), video.search, query=query)
+            shots = search_results.get_shots()
+        if not shots:
+            logging.info(f"Search on {search_backend} found no matching segments. fn=chat_with_video. video_id={video_id}, query={query}")
+            return "", {"error": "No part of the video matches the question."}
+        first_result = shots[0]
+        context, segments = build_context(shots, token_budget=token_budget, max_shots=top_k)
+        logging.info(f"Search on {search_backend} is successful. fn=chat_with_video. video_id={video_id}, query={query}, shots={len(shots)}, segments={len(segments)}")
+        return context, {"video_title": first_result.video_title, "text": context, "segments": segments}
     except Exception as error:
         print(f"Search failed for query '{query}'. Error: {error}")
         logging.error(f"Search failed for query '{query}'. Error: {error}")
-        return "", {}
+        return "", {"error": str(error)}
 
+@timed("db.stream_video")
 def stream_video(collection: object, video_id: str) -> None:
     """
     Streams the video by generating a stream and playing it.
@@ -102,7 +231,7 @@ def stream_video(collection: object, video_id: str) -> None:
         video_id (str): The ID of the video to stream.
     """
     try:
-        video = collection.get_video(video_id)
+        video = repository.get_video(collection, video_id)
         video.generate_stream()
         video.play()
         logging.info(f"Video streaming successful. fn=stream_video, video_id={video_id}")
@@ -111,7 +240,28 @@ def stream_video(collection: object, video_id: str) -> None:
         raise e
 
 
-def watch_shorts(collection: object, video_id: str, topic: str) -> object:
+class LocalSearchResult:
+    """
+    Search result built from the local transcript index. Exposes the same `shots` / `play()` surface as a VideoDB SearchResult.
+    """
+
+    def __init__(self, collection: object, video_id: str, shots: List[LocalHit]):
+        self.collection = collection
+        self.video_id = video_id
+        self.shots = shots
+
+    def get_shots(self) -> List[LocalHit]:
+        return self.shots
+
+    def play(self) -> str:
+        timeline = compile_timeline(self.shots)
+        stream_url = repository.get_video(self.collection, self.video_id).generate_stream(timeline=timeline)
+        return repository.play_stream(stream_url)
+
+
+@timed("db.watch_shorts")
+def watch_shorts(collection: object, video_id: str, topic: str, search_backend: str = DEFAULT_SEARCH_BACKEND,
+                 top_k: int = 5) -> object:
     """
     Searches for specific topics in the video and returns the result.
 
@@ -119,23 +269,209 @@ def watch_shorts(collection: object, video_id: str, topic: str) -> object:
         collection (object): The video collection object.
         video_id (str): The ID of the video to search in.
         topic (str): The topic to search for in the video.
+        search_backend (str): "videodb" for the remote search, "local" for the in-process transcript index.
+        top_k (int): Number of passages kept by the local backend.
 
     Returns:
         object: The search result.
     """
     try:
-        video = collection.get_video(video_id)
-        result = video.search(query=topic)
-        logging.info(f"Short videos search on videodb is successful. fn=watch_shorts. video_id={video_id}, topic={topic}")
+        if search_backend == LOCAL_BACKEND:
+            hits = _local_index_for(collection, video_id).search(topic, video_id=video_id, top_k=top_k)
+            result = LocalSearchResult(collection, video_id, hits)
+        else:
+            video = repository.get_video(collection, video_id)
+            with track("videodb.search"):
+                result = _shared_call("videodb.search", (video_id, topic), video.search, query=topic)
+        logging.info(f"Short videos search on {search_backend} is successful. fn=watch_shorts. video_id={video_id}, topic={topic}")
         return result
     except Exception as e:
-        logging.error(f"Short videos search on videodb is failed. fn=watch_shorts. video_id={video_id}, topic={topic}. error={e}")
+        logging.error(f"Short videos search on {search_backend} is failed. fn=watch_shorts. video_id={video_id}, topic={topic}. error={e}")
+        raise e
+
+
+def _local_index_for(collection: object, video_id: str) -> LocalSearchIndex:
+    """
+    Returns the local index of the collection, indexing the video first if it has not been indexed yet.
+    """
+    index = get_local_index(collection.id)
+    if not index.has_video(video_id):
+        metadata = transcript_cache.get(video_id, METADATA)
+        if metadata is None:
+            video = repository.get_video(collection, video_id)
+            metadata = {"id": video.id, "name": video.name, "length": video.length}
+            transcript_cache.put(video_id, METADATA, metadata)
+        index.add_video(video_id, metadata["name"], get_transcript_segments(collection, video_id))
+    return index
+
+
+def index_video_locally(collection: object, video: object, save: bool = True) -> None:
+    """
+    Adds a freshly indexed video to the local transcript index of its collection. Used as an ingest hook.
+
+    Args:
+        collection (object): The video collection object.
+        video (object): The uploaded video.
+        save (bool): Write the index to disk now. Batch ingests pass False and flush the index once at the end.
+    """
+    segments = [{"start": segment.get("start"), "end": segment.get("end"), "text": segment.get("text")}
+                for segment in video.get_transcript()]
+    transcript_cache.put(video.id, SEGMENTS, segments)
+    transcript_cache.put(video.id, METADATA, {"id": video.id, "name": video.name, "length": video.length})
+    get_local_index(collection.id).add_video(video.id, video.name, segments, save=save)
+
+@timed("db.compile_clip")
+def compile_clip(collection: object, video_id: str, topic: str, search_backend: str = DEFAULT_SEARCH_BACKEND,
+                 max_seconds: float = CLIP_MAX_SECONDS) -> Optional[CompiledClip]:
+    """
+    Searches the video for a topic and compiles the matching shots into one stream. Overlapping and nearby
+    shots are merged and the total length is capped. The stream URL is cached per video and normalized
+    topic, so repeated searches for the same topic play without a search or render call.
+
+    Args:
+        collection (object): The video collection object.
+        video_id (str): The ID of the video to search in.
+        topic (str): The topic to search for in the video.
+        search_backend (str): "videodb" for the remote search, "local" for the in-process transcript index.
+        max_seconds (float): Maximum total length of the clip.
+
+    Returns:
+        Optional[CompiledClip]: The stream and its timeline, or None if nothing in the video matches the topic.
+    """
+    try:
+        params = {"topic": normalize_topic(topic), "backend": search_backend, "max_seconds": max_seconds}
+        artifact = artifact_store.get(video_id, CLIP, params)
+        if artifact is not None:
+            clip = CompiledClip(artifact.url, cached=True)
+        else:
+            timeline = compile_timeline(watch_shorts(collection, video_id, topic, search_backend=search_backend).get_shots(), max_seconds)
+            if not timeline:
+                logging.info(f"No shots to compile. fn=compile_clip, video_id={video_id}, topic={topic}")
+                return None
+            video = repository.get_video(collection, video_id)
+            with track("videodb.generate_stream"):
+                stream_url = _shared_call("videodb.generate_stream", (video_id, tuple(timeline)), video.generate_stream, timeline=timeline)
+            artifact_store.put(video_id, CLIP, stream_url, params)
+            clip = CompiledClip(stream_url, timeline)
+        logging.info(f"Clip compiled successfully. fn=compile_clip, video_id={video_id}, topic={topic}, cached={clip.cached}, segments={len(clip.timeline)}")
+        return clip
+    except Exception as e:
+        logging.error(f"Clip compilation failed. fn=compile_clip, video_id={video_id}, topic={topic}. error={e}")
+        raise e
+
+
+@timed("db.search_collection", payload_size=lambda result: len(result[0]))
+def search_collection(collection: object, query: str, top_k: int = 10, deadline_seconds: float = SEARCH_DEADLINE_SECONDS,
+                      search_backend: str = DEFAULT_SEARCH_BACKEND, video_ids: Optional[List[str]] = None) -> Tuple[List[object], Dict[str, object]]:
+    """
+    Searches every video of the collection and returns one ranked list of shots.
+
+    The collection-level search endpoint is tried first. If it is unavailable, every video is searched in
+    parallel and whatever finished before the deadline is merged with a heap-based top-k, so one slow
+    video cannot hold up the whole result. Every step, including listing the videos for the fan-out, runs
+    under the same deadline. Each search gets its own thread pool, so calls still running when it returns
+    finish in the background without holding up the workers of later searches.
+
+    Args:
+        collection (object): The video collection object.
+        query (str): The search query.
+        top_k (int): Number of shots to return.
+        deadline_seconds (float): Time budget of the whole search. Slower videos are left out of the result.
+        search_backend (str): "videodb" for the remote search, "local" for the in-process transcript index.
+        video_ids (Optional[List[str]]): Videos to search when fanning out. Defaults to every video in the collection.
+
+    Returns:
+        Tuple[List[object], Dict[str, object]]: Shots ranked by score, and details listing timed out and failed videos.
+    """
+    details = {"strategy": search_backend, "timed_out": [], "failed": [], "partial": False}
+    try:
+        if search_backend == LOCAL_BACKEND:
+            shots = get_local_index(collection.id).search(query, top_k=top_k)
+            logging.info(f"Collection search on local index is successful. fn=search_collection, query={query}")
+            return shots, details
+
+        deadline = time.monotonic() + deadline_seconds
+        executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="search")
+        try:
+            return _search_before_deadline(executor, collection, query, top_k, deadline, video_ids, details)
+        finally:
+            # Queued work is dropped; calls already running end on their own without blocking this search
+            executor.shutdown(wait=False, cancel_futures=True)
+    except Exception as e:
+        logging.error(f"Collection search failed. fn=search_collection, query={query}. error={e}")
         raise e
 
 
+def _search_before_deadline(executor: ThreadPoolExecutor, collection: object, query: str, top_k: int, deadline: float,
+                            video_ids: Optional[List[str]], details: Dict[str, object]) -> Tuple[List[object], Dict[str, object]]:
+    if video_ids is None:
+        future = executor.submit(resilient_call, "videodb.search", collection.search, query=query, deadline=deadline)
+        try:
+            shots = heapq.nlargest(top_k, future.result(timeout=max(0.0, deadline - time.monotonic())).get_shots(), key=_shot_score)
+            details["strategy"] = "collection"
+            logging.info(f"Collection search on videodb is successful. fn=search_collection, query={query}")
+            return shots, details
+        except Exception as e:
+            logging.warning(f"Collection-level search unavailable, searching videos individually. fn=search_collection, error={e}")
+        # Without retries: a retry after a failure would rarely fit in what is left of the deadline
+        listing = executor.submit(resilient_call, "videodb.get_videos", collection.get_videos, idempotent=False, deadline=deadline)
+        try:
+            video_ids = [video.id for video in listing.result(timeout=max(0.0, deadline - time.monotonic()))]
+        except FutureTimeoutError:
+            details.update(strategy="fan-out", partial=True, error="Listing the videos took longer than the search deadline.")
+            logging.warning(f"Listing videos for the fan-out search timed out. fn=search_collection, query={query}")
+            return [], details
+
+    details["strategy"] = "fan-out"
+    futures = {executor.submit(_search_one_video, collection, video_id, query, deadline): video_id for video_id in video_ids}
+    done, pending = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+    for future in pending:
+        future.cancel()
+        details["timed_out"].append(futures[future])
+    shots = []
+    for future in done:
+        try:
+            shots.extend(future.result())
+        except TimeoutError:
+            details["timed_out"].append(futures[future])
+        except Exception as e:
+            details["failed"].append(futures[future])
+            logging.warning(f"Video search failed. fn=search_collection, video_id={futures[future]}, error={e}")
+    details["partial"] = bool(details["timed_out"] or details["failed"])
+    logging.info(f"Fan-out search over {len(video_ids)} videos is successful. fn=search_collection, query={query}, timed_out={len(details['timed_out'])}, failed={len(details['failed'])}")
+    return heapq.nlargest(top_k, shots, key=_shot_score), details
+
+
+def _search_one_video(collection: object, video_id: str, query: str, deadline: Optional[float] = None) -> List[object]:
+    # Work that could only start after the deadline is skipped; see Endpoint.call
+    if deadline is not None and time.monotonic() >= deadline:
+        raise TimeoutError(f"Search deadline passed before video {video_id} was searched.")
+    video = repository.get_video(collection, video_id)
+    with track("videodb.search"):
+        return _shared_call("videodb.search", (video_id, query), video.search, query=query, deadline=deadline).get_shots()
+
+
+def _shot_score(shot: object) -> float:
+    return float(shot.search_score or 0.0)
+
+
+@timed("db.play_shot")
+def play_shot(collection: object, shot: object) -> object:
+    """
+    Generates a stream of a single shot and plays it.
+
+    Args:
+        collection (object): The video collection object.
+        shot (object): A VideoDB shot or a local search hit.
+    """
+    stream_url = repository.get_video(collection, shot.video_id).generate_stream(timeline=[(shot.start, shot.end)])
+    return repository.play_stream(stream_url)
+
+
+@timed("db.transcribe_video", payload_size=len)
 def transcribe_video(collection: object, video_id: str) -> str:
     """
-    Transcribes the video and returns the text of the spoken content.
+    Transcribes the video and returns the text of the spoken content. Served from the local transcript cache when possible.
 
     Args:
         collection (object): The video collection object.
@@ -145,8 +481,16 @@ def transcribe_video(collection: object, video_id: str) -> str:
         str: The transcript text of the video.
     """
     try:
-        video = collection.get_video(video_id)
-        text = video.get_transcript_text()
+        text = transcript_cache.get(video_id, TRANSCRIPT)
+        metrics.record_cache("transcript_cache", text is not None)
+        if text is not None:
+            logging.info(f"Video transcript served from cache. fn=transcribe_video, video_id={video_id}")
+            return text
+        video = repository.get_video(collection, video_id)
+        with track("videodb.transcript"):
+            text = _shared_call("videodb.transcript", (video_id, TRANSCRIPT), video.get_transcript_text)
+        transcript_cache.put(video_id, TRANSCRIPT, text)
+        transcript_cache.put(video_id, METADATA, {"id": video.id, "name": video.name, "length": video.length})
         logging.info(f"Video transcription successful. fn=transcribe_video, video_id={video_id}")
         return text
     except Exception as e:
@@ -154,45 +498,140 @@ def transcribe_video(collection: object, video_id: str) -> str:
         raise e
 
 
-def add_subtitles(collection: object, video_id: str) -> None:
+@timed("db.get_transcript_segments", payload_size=len)
+def get_transcript_segments(collection: object, video_id: str) -> List[Dict[str, object]]:
+    """
+    Returns the timestamped transcript segments of the video. Served from the local transcript cache when possible.
+
+    Args:
+        collection (object): The video collection object.
+        video_id (str): The ID of the video.
+
+    Returns:
+        List[Dict[str, object]]: Segments with "start", "end" and "text" keys.
+    """
+    try:
+        segments = transcript_cache.get(video_id, SEGMENTS)
+        metrics.record_cache("transcript_cache", segments is not None)
+        if segments is not None:
+            logging.info(f"Transcript segments served from cache. fn=get_transcript_segments, video_id={video_id}")
+            return segments
+        video = repository.get_video(collection, video_id)
+        with track("videodb.transcript"):
+            transcript = _shared_call("videodb.transcript", (video_id, SEGMENTS), video.get_transcript)
+        segments = [{"start": segment.get("start"), "end": segment.get("end"), "text": segment.get("text")}
+                    for segment in transcript]
+        transcript_cache.put(video_id, SEGMENTS, segments)
+        logging.info(f"Transcript segments fetched successfully. fn=get_transcript_segments, video_id={video_id}")
+        return segments
+    except Exception as e:
+        logging.error(f"Transcript segments retrieval failed. fn=get_transcript_segments, video_id={video_id}. error={e}")
+        raise e
+
+
+@timed("db.get_paged_transcript")
+def get_paged_transcript(collection: object, video_id: str) -> PagedTranscript:
+    """
+    Returns the transcript of the video in its paged, searchable form. Built once per process from the
+    cached transcript segments, so paging, searching and jumping never call the backend.
+
+    Args:
+        collection (object): The video collection object.
+        video_id (str): The ID of the video.
+
+    Returns:
+        PagedTranscript: The transcript segments with their inverted index.
+    """
+    try:
+        transcript = paged_transcripts.get(video_id, lambda: get_transcript_segments(collection, video_id))
+        logging.info(f"Paged transcript ready. fn=get_paged_transcript, video_id={video_id}, segments={len(transcript)}")
+        return transcript
+    except Exception as e:
+        logging.error(f"Paged transcript failed. fn=get_paged_transcript, video_id={video_id}. error={e}")
+        raise e
+
+
+@timed("db.add_subtitles")
+def add_subtitles(collection: object, video_id: str, play: bool = True) -> str:
     """
-    Adds subtitles to the video and plays the new stream.
+    Adds subtitles to the video and plays the new stream. The subtitled stream is rendered once per video
+    and reused from the artifact store afterwards.
 
     Args:
         collection (object): The video collection object.
         video_id (str): The ID of the video to add subtitles to.
+        play (bool): Open the new stream in the browser. Background jobs pass False and hand the URL to the UI.
+
+    Returns:
+        str: The URL of the subtitled stream.
     """
     try:
-        video = collection.get_video(video_id)
-        new_stream = video.add_subtitle()
-        play_stream(new_stream)
-        logging.info(f"Video with subtitles streaming successful. fn=add_subtitles, video_id={video_id}")
+        artifact = artifact_store.get(video_id, SUBTITLES)
+        if artifact is not None:
+            new_stream = artifact.url
+        else:
+            video = repository.get_video(collection, video_id)
+            with track("videodb.add_subtitle"):
+                new_stream = _shared_call("videodb.add_subtitle", video_id, video.add_subtitle)
+            artifact_store.put(video_id, SUBTITLES, new_stream)
+        if play:
+            repository.play_stream(new_stream)
+        logging.info(f"Video with subtitles streaming successful. fn=add_subtitles, video_id={video_id}, cached={artifact is not None}")
+        return new_stream
     except Exception as e:
         logging.error(f"Video with subtitles streaming failed. fn=add_subtitles, video_id={video_id}. error={e}")
         raise e
 
 
 
-def thumbnail(collection: object, video_id: str) -> object:
+def cached_subtitles(video_id: str) -> Optional[str]:
+    """
+    Returns the subtitled stream URL of the video if it was rendered before, without any backend call.
+    """
+    artifact = artifact_store.get(video_id, SUBTITLES)
+    return artifact.url if artifact is not None else None
+
+
+def cached_thumbnail(video_id: str, at_seconds: Optional[float] = None) -> Optional[str]:
+    """
+    Returns the stored thumbnail of the video if it was generated before, without any backend call.
+    """
+    artifact = artifact_store.get(video_id, THUMBNAIL, {"time": at_seconds})
+    return artifact.location if artifact is not None else None
+
+
+@timed("db.thumbnail")
+def thumbnail(collection: object, video_id: str, at_seconds: Optional[float] = None) -> object:
     """
-    Generates a thumbnail for the video.
+    Generates a thumbnail for the video. The image is downloaded into the local artifact store on first use,
+    so later requests for the same video and time are served from disk.
 
     Args:
         collection (object): The video collection object.
         video_id (str): The ID of the video to generate a thumbnail for.
+        at_seconds (Optional[float]): Position of the frame in seconds. None lets the backend choose.
 
     Returns:
-        object: The generated thumbnail.
+        object: The path of the cached thumbnail image, or its URL if it could not be downloaded.
     """
     try:
-        video = collection.get_video(video_id)
-        thumbnail = video.generate_thumbnail()
+        params = {"time": at_seconds}
+        artifact = artifact_store.get(video_id, THUMBNAIL, params)
+        if artifact is None:
+            video = repository.get_video(collection, video_id)
+            with track("videodb.generate_thumbnail"):
+                kwargs = {"time": at_seconds} if at_seconds is not None else {}
+                image = _shared_call("videodb.generate_thumbnail", (video_id, at_seconds), video.generate_thumbnail, **kwargs)
+            url = image if isinstance(image, str) else getattr(image, "url", str(image))
+            data = repository.download(url)
+            artifact = artifact_store.put(video_id, THUMBNAIL, url, params, data=data)
         logging.info(f"Thumbnail generation successful. fn=thumbnail, video_id={video_id}")
-        return thumbnail
+        return artifact.location
     except Exception as e:
         logging.error(f"Thumbnail generation failed. fn=thumbnail, video_id={video_id}. error={e}")
         
 
+@timed("db.delete_video_from_index")
 def delete_video_from_index(collection: object, video_id: str) -> None:
     """
     Deletes a specific video from the index.
@@ -202,8 +641,14 @@ def delete_video_from_index(collection: object, video_id: str) -> None:
         video_id (str): The ID of the video to delete.
     """
     try:
-        video = collection.get_video(video_id)
+        video = repository.get_video(collection, video_id)
         video.delete()
+        repository.forget(collection, video_id)
+        transcript_cache.invalidate([video_id])
+        paged_transcripts.invalidate([video_id])
+        artifact_store.invalidate([video_id])
+        ingest_manifest.remove_videos(collection.id, [video_id])
+        get_local_index(collection.id).remove_videos([video_id])
         logging.info(f"Video deletion successful. fn=delete_video_from_index, video_id={video_id}")
     except Exception as e:
         logging.error(f"Video deletion failed. fn=delete_video_from_index, video_id={video_id}. error={e}")
@@ -211,37 +656,95 @@ def delete_video_from_index(collection: object, video_id: str) -> None:
 
 
 
-def delete_all_videos_from_index(collection: object) -> None:
+@timed("db.delete_all_videos_from_index")
+def delete_all_videos_from_index(collection: object, max_workers: int = DEFAULT_DELETE_WORKERS,
+                                 on_progress: Optional[Callable[[DeleteOutcome, int, int], None]] = None) -> DeleteReport:
     """
-    Deletes all videos from the collection index.
+    Deletes all videos from the collection index, several at a time.
 
     Args:
         collection (object): The video collection object.
+        max_workers (int): Maximum number of deletions in flight at the same time.
+        on_progress (Optional[Callable[[DeleteOutcome, int, int], None]]): Called with (outcome, done, total) as deletions finish.
+
+    Returns:
+        DeleteReport: Which videos were deleted and which failed, with their errors.
     """
     try:
-        for video in collection.get_videos():
-            video.delete()
-        logging.info(f"All videos deletion successful. fn=delete_all_videos_from_index")
+        videos = {record.id: record.name for page in iter_collection(collection) for record in page}
+        report = delete_videos(collection, videos, max_workers=max_workers, on_progress=on_progress)
+        deleted_ids = [outcome.video_id for outcome in report.succeeded]
+        for video_id in deleted_ids:
+            repository.forget(collection, video_id)
+        transcript_cache.invalidate(deleted_ids)
+        paged_transcripts.invalidate(deleted_ids)
+        artifact_store.invalidate(deleted_ids)
+        ingest_manifest.remove_videos(collection.id, deleted_ids)
+        get_local_index(collection.id).remove_videos(deleted_ids)
+        if report.failed:
+            logging.warning(f"{len(report.failed)} of {len(videos)} videos could not be deleted. fn=delete_all_videos_from_index")
+        else:
+            logging.info(f"All videos deletion successful. fn=delete_all_videos_from_index")
+        return report
     except Exception as e:
         logging.error(f"All videos deletion failed. fn=delete_all_videos_from_index. error={e}")
+        raise e
+
+
+@dataclass
+class VideoRecord:
+    """
+    Lightweight listing entry of a video.
+    """
+    id: str
+    name: str
+    length: Optional[float] = None
 
 
-def show_collection(collection: object) -> List[object]:
+def iter_collection(collection: object, page_size: int = COLLECTION_PAGE_SIZE) -> Iterator[List[VideoRecord]]:
+    """
+    Yields the videos of the collection as pages of lightweight records.
+
+    The VideoDB API returns the whole collection in one response, so the pages are cut locally: each SDK
+    video object is released as soon as its record is built, and callers can render a page before the
+    next one is built.
+
+    Args:
+        collection (object): The video collection object.
+        page_size (int): Number of records per page.
+
+    Yields:
+        List[VideoRecord]: The next page of records.
+    """
+    with track("videodb.get_videos") as info:
+        videos = resilient_call("videodb.get_videos", collection.get_videos)
+        info["payload_size"] = len(videos)
+    # Consume from the end of the reversed list so every converted video is dropped right away
+    videos.reverse()
+    while videos:
+        page = []
+        while videos and len(page) < page_size:
+            video = videos.pop()
+            length = getattr(video, "length", None)
+            page.append(VideoRecord(video.id, video.name, float(length) if length not in (None, "") else None))
+        yield page
+
+
+@timed("db.show_collection", payload_size=len)
+def show_collection(collection: object) -> List[VideoRecord]:
     """
-    Retrieves and returns a list of videos in the collection.
+    Retrieves and returns the records of all videos in the collection.
 
     Args:
         collection (object): The video collection object.
 
     Returns:
-        List[object]: A list of videos in the collection.
+        List[VideoRecord]: The ID, name and length of every video in the collection.
     """
     try:
-        videos_list = []
-        for video in collection.get_videos():
-            videos_list.append(video)
+        records = [record for page in iter_collection(collection) for record in page]
         logging.info(f"Collection list retrieval successful. fn=show_collection")
-        return videos_list
+        return records
     except Exception as e:
         logging.error(f"Collection list retrieval failed. fn=show_collection. error={e}")
         raise e
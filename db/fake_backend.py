@@ -0,0 +1,240 @@
+"""
+In-memory stand-in for the VideoDB SDK. It mirrors the subset of the Connection / Collection / Video /
+SearchResult / Shot surface used by this app, so the whole app can be run and benchmarked offline.
+Select it with VIDEOLENS_BACKEND=fake.
+"""
+import base64
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+
+FAKE_LATENCY_MS = float(os.getenv("VIDEOLENS_FAKE_LATENCY_MS", "0"))
+
+_VOCABULARY = (
+    "video data model search python network learning training deploy cloud index transcript question answer "
+    "summary topic speaker example result performance latency memory cache query vector database stream clip "
+    "feature design system user interface scale batch pipeline error metric benchmark tradeoff"
+).split()
+_WORD = re.compile(r"[a-z0-9']+")
+# Served for fake thumbnail URLs so thumbnails go through the same download-and-store path as real ones
+_FAKE_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg==")
+
+
+class FakeBackendError(Exception):
+    """
+    Raised by the fake backend for missing objects and injected failures. Carries an HTTP-like status code.
+    """
+
+    def __init__(self, message: str, status_code: int = 500):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class FakeShot:
+    def __init__(self, video: "FakeVideo", start: float, end: float, text: str, search_score: float):
+        self.video_id = video.id
+        self.video_title = video.name
+        self.video_length = video.length
+        self.start = start
+        self.end = end
+        self.text = text
+        self.search_score = search_score
+        self.stream_url = f"https://fake.videodb.local/stream/{video.id}/{start:.0f}-{end:.0f}"
+
+    def generate_stream(self) -> str:
+        return self.stream_url
+
+    def play(self) -> str:
+        return self.stream_url
+
+
+class FakeSearchResult:
+    def __init__(self, connection: "FakeConnection", shots: List[FakeShot]):
+        self._connection = connection
+        self.shots = shots
+        self.stream_url = None
+
+    def get_shots(self) -> List[FakeShot]:
+        return self.shots
+
+    def compile(self) -> str:
+        self._connection._call()
+        self.stream_url = "https://fake.videodb.local/compiled/" + ",".join(f"{shot.video_id}:{shot.start:.0f}" for shot in self.shots)
+        return self.stream_url
+
+    def play(self) -> str:
+        return self.compile()
+
+
+class FakeVideo:
+    def __init__(self, connection: "FakeConnection", collection: "FakeCollection", url: str):
+        self._connection = connection
+        self._collection = collection
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        self.id = f"m-{digest[:12]}"
+        self.name = f"Fake video {digest[:6]}"
+        self.collection_id = collection.id
+        self.url = url
+        self.indexed = False
+        self.stream_url = None
+        self.thumbnail_url = None
+        generator = random.Random(digest)
+        self._words = [generator.choice(_VOCABULARY) for _ in range(connection.words_per_video)]
+        self.length = float(len(self._words)) / 2.5
+
+    def index_spoken_words(self) -> None:
+        self._connection._call(weight=self._connection.index_weight)
+        self.indexed = True
+
+    def get_transcript(self, start: Optional[float] = None, end: Optional[float] = None, **kwargs) -> List[Dict[str, object]]:
+        self._connection._call()
+        return [{"start": position / 2.5, "end": (position + 1) / 2.5, "text": word} for position, word in enumerate(self._words)]
+
+    def get_transcript_text(self, start: Optional[float] = None, end: Optional[float] = None) -> str:
+        self._connection._call()
+        return " ".join(self._words)
+
+    def search(self, query: str, **kwargs) -> FakeSearchResult:
+        self._connection._call()
+        if not self.indexed:
+            raise FakeBackendError(f"Video {self.id} has no spoken word index", status_code=400)
+        return FakeSearchResult(self._connection, self._search(query))
+
+    def _search(self, query: str, passage_words: int = 30) -> List[FakeShot]:
+        terms = set(_WORD.findall(query.lower()))
+        shots = []
+        for offset in range(0, len(self._words), passage_words):
+            words = self._words[offset:offset + passage_words]
+            score = sum(word in terms for word in words) / len(words)
+            if score > 0:
+                shots.append(FakeShot(self, offset / 2.5, (offset + len(words)) / 2.5, " ".join(words), score))
+        return sorted(shots, key=lambda shot: -shot.search_score)[:5]
+
+    def generate_stream(self, timeline: Optional[List[Tuple[float, float]]] = None) -> str:
+        self._connection._call()
+        segments = ",".join(f"{start:.0f}-{end:.0f}" for start, end in timeline or [])
+        self.stream_url = f"https://fake.videodb.local/stream/{self.id}/{segments}"
+        return self.stream_url
+
+    def play(self) -> str:
+        return self.stream_url or self.generate_stream()
+
+    def add_subtitle(self, *args, **kwargs) -> str:
+        self._connection._call(weight=self._connection.index_weight)
+        return f"https://fake.videodb.local/stream/{self.id}/subtitled"
+
+    def generate_thumbnail(self, time: Optional[float] = None) -> str:
+        self._connection._call()
+        self.thumbnail_url = f"https://fake.videodb.local/thumbnail/{self.id}.png"
+        return self.thumbnail_url
+
+    def delete(self) -> None:
+        self._connection._call()
+        self._collection._videos.pop(self.id, None)
+
+
+class FakeCollection:
+    def __init__(self, connection: "FakeConnection", collection_id: str, name: str, description: str = ""):
+        self._connection = connection
+        self.id = collection_id
+        self.name = name
+        self.description = description
+        self._videos: Dict[str, FakeVideo] = {}
+
+    def upload(self, url: str, **kwargs) -> FakeVideo:
+        self._connection._call(weight=self._connection.upload_weight)
+        video = FakeVideo(self._connection, self, url)
+        self._videos[video.id] = video
+        return video
+
+    def get_videos(self) -> List[FakeVideo]:
+        self._connection._call()
+        return list(self._videos.values())
+
+    def get_video(self, video_id: str) -> FakeVideo:
+        self._connection._call()
+        if video_id not in self._videos:
+            raise FakeBackendError(f"Video {video_id} not found", status_code=404)
+        return self._videos[video_id]
+
+    def delete_video(self, video_id: str) -> None:
+        self.get_video(video_id).delete()
+
+    def search(self, query: str, **kwargs) -> FakeSearchResult:
+        self._connection._call()
+        shots = [shot for video in self._videos.values() if video.indexed for shot in video._search(query)]
+        return FakeSearchResult(self._connection, sorted(shots, key=lambda shot: -shot.search_score))
+
+
+class FakeConnection:
+    """
+    Fake VideoDB connection with configurable latency and failure injection.
+
+    Every SDK-style call sleeps for `latency` seconds (scaled by a per-operation weight, plus jitter) and
+    fails with a FakeBackendError with probability `error_rate`. `calls` counts backend round trips.
+    """
+
+    def __init__(self, latency: float = FAKE_LATENCY_MS / 1000, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503, upload_weight: float = 1.0, index_weight: float = 1.0,
+                 words_per_video: int = 1500, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.upload_weight = upload_weight
+        self.index_weight = index_weight
+        self.words_per_video = words_per_video
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._collections: Dict[str, FakeCollection] = {}
+
+    def _call(self, weight: float = 1.0) -> None:
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self.latency * weight + self._random.uniform(-self.jitter, self.jitter))
+            failed = self._random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        if failed:
+            raise FakeBackendError("Injected failure", status_code=self.error_status)
+
+    def create_collection(self, name: str, description: str = "", **kwargs) -> FakeCollection:
+        self._call()
+        # Random IDs, so IDs remembered on disk from an earlier process never match a new collection
+        collection = FakeCollection(self, f"c-{uuid.uuid4().hex[:12]}", name, description)
+        self._collections[collection.id] = collection
+        return collection
+
+    def get_collection(self, collection_id: str = "default") -> FakeCollection:
+        self._call()
+        if collection_id not in self._collections:
+            if collection_id != "default":
+                raise FakeBackendError(f"Collection {collection_id} not found", status_code=404)
+            self._collections["default"] = FakeCollection(self, "default", "default")
+        return self._collections[collection_id]
+
+    def get_collections(self) -> List[FakeCollection]:
+        self._call()
+        return list(self._collections.values())
+
+
+def fake_download(url: str) -> Optional[bytes]:
+    """
+    Offline replacement for downloading a rendered artifact: fake thumbnail URLs resolve to a 1x1 PNG.
+    """
+    return _FAKE_PNG if url.startswith("https://fake.videodb.local/thumbnail/") else None
+
+
+def fake_play_stream(url: str) -> str:
+    """
+    Offline replacement for videodb.play_stream: returns the URL without opening a browser.
+    """
+    return url
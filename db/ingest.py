@@ -0,0 +1,138 @@
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from utils.resilience import resilient_call
+
+
+DEFAULT_INGEST_WORKERS = int(os.getenv("VIDEOLENS_INGEST_WORKERS", "4"))
+
+
+@dataclass
+class IngestOutcome:
+    """
+    Result of uploading and indexing a single URL.
+    """
+    url: str
+    video_id: Optional[str] = None
+    video_name: Optional[str] = None
+    error: Optional[str] = None
+    upload_seconds: float = 0.0
+    index_seconds: float = 0.0
+    # True when the URL was already uploaded and indexed earlier and nothing was sent to the backend
+    reused: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class IngestReport:
+    """
+    Aggregated result of an ingest run.
+    """
+    outcomes: List[IngestOutcome] = field(default_factory=list)
+    wall_seconds: float = 0.0
+
+    @property
+    def succeeded(self) -> List[IngestOutcome]:
+        return [outcome for outcome in self.outcomes if outcome.ok]
+
+    @property
+    def failed(self) -> List[IngestOutcome]:
+        return [outcome for outcome in self.outcomes if not outcome.ok]
+
+    def video_dict(self) -> Dict[str, str]:
+        return {outcome.video_name: outcome.video_id for outcome in self.succeeded}
+
+
+def _upload_and_index(collection: object, url: str, on_indexed: Optional[Callable[[object], None]] = None,
+                      on_uploaded: Optional[Callable[[str, object], None]] = None, video_id: Optional[str] = None) -> IngestOutcome:
+    """
+    Uploads a single URL and indexes its spoken words as soon as the upload finishes.
+
+    Args:
+        collection (object): The video collection object.
+        url (str): The YouTube URL to upload.
+        on_indexed (Optional[Callable[[object], None]]): Called with the video on the worker thread once it is indexed.
+        on_uploaded (Optional[Callable[[str, object], None]]): Called with (url, video) on the worker thread once it is uploaded.
+        video_id (Optional[str]): ID of an earlier upload of this URL. The upload is skipped and only indexing runs.
+
+    Returns:
+        IngestOutcome: The outcome for this URL. Errors are captured, never raised.
+    """
+    outcome = IngestOutcome(url=url)
+    try:
+        started = time.perf_counter()
+        if video_id is not None:
+            video = resilient_call("videodb.get_video", collection.get_video, video_id)
+        else:
+            # An upload is not idempotent, so it is never retried; a repeated upload would duplicate the video
+            video = resilient_call("videodb.upload", collection.upload, url=url, idempotent=False)
+            if on_uploaded is not None:
+                try:
+                    on_uploaded(url, video)
+                except Exception as error:
+                    logging.warning(f"Post-upload hook failed for {url}. fn=_upload_and_index, error={error}")
+        outcome.upload_seconds = time.perf_counter() - started
+        outcome.video_id, outcome.video_name = video.id, video.name
+
+        started = time.perf_counter()
+        resilient_call("videodb.index", video.index_spoken_words)
+        outcome.index_seconds = time.perf_counter() - started
+        if on_indexed is not None:
+            try:
+                on_indexed(video)
+            except Exception as error:
+                logging.warning(f"Post-index hook failed for {url}. fn=_upload_and_index, error={error}")
+        logging.info(f"Video: {video.name} ({url}) uploaded and indexed successfully. fn=_upload_and_index")
+    except Exception as error:
+        outcome.error = str(error)
+        logging.error(f"Error uploading and indexing video at URL {url}. fn=_upload_and_index, error={error}")
+    return outcome
+
+
+def ingest_videos(collection: object, youtube_urls: List[str], max_workers: int = DEFAULT_INGEST_WORKERS,
+                  on_progress: Optional[Callable[[IngestOutcome, int, int], None]] = None,
+                  on_indexed: Optional[Callable[[object], None]] = None,
+                  on_uploaded: Optional[Callable[[str, object], None]] = None,
+                  uploaded: Optional[Dict[str, str]] = None) -> IngestReport:
+    """
+    Uploads and indexes videos with bounded concurrency. Each video is indexed right after its own upload.
+
+    Args:
+        collection (object): The video collection object.
+        youtube_urls (List[str]): List of YouTube URLs to upload.
+        max_workers (int): Maximum number of videos processed at the same time.
+        on_progress (Optional[Callable[[IngestOutcome, int, int], None]]): Called with (outcome, done, total)
+            each time a video finishes. It runs on the calling thread, so it may safely touch the Streamlit UI.
+        on_indexed (Optional[Callable[[object], None]]): Called with each video right after it is indexed, on the worker
+            thread. Its failures are logged and do not fail the video.
+        on_uploaded (Optional[Callable[[str, object], None]]): Called with (url, video) right after each upload, on the worker thread.
+        uploaded (Optional[Dict[str, str]]): URLs of `youtube_urls` that were uploaded before, mapped to their video IDs.
+            These are only indexed.
+
+    Returns:
+        IngestReport: Per-URL outcomes in input order and the total wall-clock time.
+    """
+    report = IngestReport()
+    started = time.perf_counter()
+    outcomes: Dict[int, IngestOutcome] = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="ingest") as executor:
+        uploaded = uploaded or {}
+        futures = {executor.submit(_upload_and_index, collection, url, on_indexed, on_uploaded, uploaded.get(url)): position
+                   for position, url in enumerate(youtube_urls)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            outcome = future.result()
+            outcomes[futures[future]] = outcome
+            if on_progress is not None:
+                on_progress(outcome, done, len(youtube_urls))
+
+    report.outcomes = [outcomes[position] for position in sorted(outcomes)]
+    report.wall_seconds = time.perf_counter() - started
+    logging.info(f"Ingested {len(report.succeeded)}/{len(youtube_urls)} videos in {report.wall_seconds:.2f}s. fn=ingest_videos")
+    return report
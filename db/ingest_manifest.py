@@ -0,0 +1,131 @@
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+from urllib.parse import parse_qs, urlencode, urlsplit, urlunsplit
+
+from db.transcript_cache import CACHE_DIR
+
+
+_YOUTUBE_HOSTS = {"youtube.com", "www.youtube.com", "m.youtube.com", "music.youtube.com", "youtube-nocookie.com",
+                  "www.youtube-nocookie.com"}
+_YOUTUBE_PATH_PREFIXES = ("/shorts/", "/embed/", "/live/", "/v/")
+# Query parameters that do not change which video a URL points to
+_IGNORED_PARAMETERS = {"si", "feature", "pp", "ab_channel", "utm_source", "utm_medium", "utm_campaign", "t", "start"}
+
+
+def canonical_url(url: str) -> str:
+    """
+    Maps the different spellings of a video URL to one key. YouTube links (watch, youtu.be, shorts, embed,
+    mobile) become https://www.youtube.com/watch?v=<id>; other URLs lose their fragment and tracking parameters.
+    """
+    url = url.strip()
+    parts = urlsplit(url if "://" in url else f"https://{url}")
+    host = parts.netloc.lower()
+    video_id = None
+    if host in ("youtu.be", "www.youtu.be"):
+        video_id = parts.path.strip("/").split("/")[0]
+    elif host in _YOUTUBE_HOSTS:
+        if parts.path == "/watch":
+            video_id = parse_qs(parts.query).get("v", [None])[0]
+        else:
+            for prefix in _YOUTUBE_PATH_PREFIXES:
+                if parts.path.startswith(prefix):
+                    video_id = parts.path[len(prefix):].split("/")[0]
+    if video_id:
+        return f"https://www.youtube.com/watch?v={video_id}"
+    query = urlencode(sorted((key, value) for key, values in parse_qs(parts.query).items()
+                             if key not in _IGNORED_PARAMETERS for value in values))
+    return urlunsplit(("https", host, parts.path.rstrip("/") or "/", query, ""))
+
+
+@dataclass
+class ManifestEntry:
+    """
+    What is known about one URL of a collection: the video it was uploaded as and whether it is indexed.
+    """
+    url: str
+    video_id: str
+    video_name: str
+    indexed: bool
+
+
+class IngestManifest:
+    """
+    Local record of which canonical URLs have been uploaded into which collection and whether they are indexed.
+
+    Saving a library again only uploads URLs missing from the manifest and only indexes videos whose
+    indexing never finished. Collections are remembered by name per backend, so an existing library
+    is reopened instead of created again.
+    """
+
+    def __init__(self, path: str = os.path.join(CACHE_DIR, "ingest_manifest.db")):
+        """
+        Args:
+            path (str): Location of the SQLite file. Its directory is created if missing.
+        """
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS collections ("
+            " backend TEXT NOT NULL, name TEXT NOT NULL, collection_id TEXT NOT NULL, created_at REAL NOT NULL,"
+            " PRIMARY KEY (backend, name))"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS videos ("
+            " collection_id TEXT NOT NULL, url TEXT NOT NULL, video_id TEXT NOT NULL, video_name TEXT NOT NULL,"
+            " indexed INTEGER NOT NULL DEFAULT 0, updated_at REAL NOT NULL, PRIMARY KEY (collection_id, url))"
+        )
+
+    def collection_id(self, backend: str, name: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT collection_id FROM collections WHERE backend = ? AND name = ?", (backend, name)).fetchone()
+        return row[0] if row else None
+
+    def set_collection(self, backend: str, name: str, collection_id: str) -> None:
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO collections (backend, name, collection_id, created_at) VALUES (?, ?, ?, ?)",
+                             (backend, name, collection_id, time.time()))
+
+    def entries(self, collection_id: str) -> Dict[str, ManifestEntry]:
+        """
+        Returns the recorded videos of the collection keyed by canonical URL.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url, video_id, video_name, indexed FROM videos WHERE collection_id = ?", (collection_id,)).fetchall()
+        return {url: ManifestEntry(url, video_id, video_name, bool(indexed)) for url, video_id, video_name, indexed in rows}
+
+    def record(self, collection_id: str, url: str, video_id: str, video_name: str, indexed: bool) -> None:
+        """
+        Records the upload (and, once finished, the indexing) of `url`. The URL is canonicalised here.
+        """
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO videos (collection_id, url, video_id, video_name, indexed, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)", (collection_id, canonical_url(url), video_id, video_name, int(indexed), time.time()))
+
+    def mark_indexed(self, collection_id: str, video_id: str) -> None:
+        with self._lock:
+            self._db.execute("UPDATE videos SET indexed = 1, updated_at = ? WHERE collection_id = ? AND video_id = ?",
+                             (time.time(), collection_id, video_id))
+
+    def remove_videos(self, collection_id: str, video_ids: Iterable[str]) -> None:
+        with self._lock:
+            self._db.executemany("DELETE FROM videos WHERE collection_id = ? AND video_id = ?",
+                                 [(collection_id, video_id) for video_id in video_ids])
+
+    def forget_collection(self, collection_id: str) -> None:
+        """
+        Drops the collection and its videos, e.g. when the backend no longer knows the collection.
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM videos WHERE collection_id = ?", (collection_id,))
+            self._db.execute("DELETE FROM collections WHERE collection_id = ?", (collection_id,))
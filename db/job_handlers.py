@@ -0,0 +1,93 @@
+import hashlib
+import json
+from typing import Any, Callable, Dict, List
+
+from db import database_operations
+from db.bulk_delete import DeleteOutcome
+from db.ingest import IngestOutcome
+from llm.summarizer import summarizer
+from utils.jobs import JobQueue
+
+
+SAVE_LIBRARY = "save_library"
+ADD_SUBTITLES = "add_subtitles"
+THUMBNAIL = "thumbnail"
+DELETE_ALL = "delete_all"
+SUMMARIZE = "summarize"
+
+
+def library_key(collection_name: str, youtube_urls: List[str]) -> str:
+    """
+    Deduplication key of a save-library job: the same name and URL set map to the same in-flight job.
+    """
+    payload = json.dumps([collection_name, sorted(youtube_urls)])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _save_library(params: Dict[str, Any], report_progress: Callable[[float, str], None]) -> Dict[str, Any]:
+    urls = params["youtube_urls"]
+
+    def on_progress(outcome: IngestOutcome, done: int, total: int) -> None:
+        status = f"indexed {outcome.video_name}" if outcome.ok else f"failed {outcome.url}: {outcome.error}"
+        report_progress(done / total, f"Processed {done} of {total} videos ({status})")
+
+    report, collection = database_operations.ingest_collection(params["collection_name"], urls, on_progress=on_progress)
+    if not report.succeeded:
+        raise RuntimeError("No videos could be uploaded and indexed.")
+    return {
+        "collection_id": collection.id,
+        "collection_name": params["collection_name"],
+        "reused": sum(outcome.reused for outcome in report.outcomes),
+        "video_dict": report.video_dict(),
+        "failed": {outcome.url: outcome.error for outcome in report.failed},
+    }
+
+
+def _collection(params: Dict[str, Any]) -> object:
+    # Lazy, so jobs whose result is already in the artifact store never look the collection up
+    return database_operations.repository.collection_handle(params["collection_id"])
+
+
+def _add_subtitles(params: Dict[str, Any], report_progress: Callable[[float, str], None]) -> Dict[str, Any]:
+    report_progress(0.1, "Rendering subtitles")
+    stream_url = database_operations.add_subtitles(_collection(params), params["video_id"], play=False)
+    return {"stream_url": stream_url}
+
+
+def _thumbnail(params: Dict[str, Any], report_progress: Callable[[float, str], None]) -> Dict[str, Any]:
+    report_progress(0.1, "Generating thumbnail")
+    image = database_operations.thumbnail(_collection(params), params["video_id"])
+    if image is None:
+        raise RuntimeError("Thumbnail generation failed.")
+    return {"thumbnail": image}
+
+
+def _delete_all(params: Dict[str, Any], report_progress: Callable[[float, str], None]) -> Dict[str, Any]:
+    report_progress(0.0, "Listing videos")
+
+    def on_progress(outcome: DeleteOutcome, done: int, total: int) -> None:
+        status = f"deleted {outcome.video_name or outcome.video_id}" if outcome.ok else f"failed {outcome.video_id}: {outcome.error}"
+        report_progress(done / total, f"Processed {done} of {total} videos ({status})")
+
+    report = database_operations.delete_all_videos_from_index(_collection(params), on_progress=on_progress)
+    return report.to_dict()
+
+
+def _summarize(params: Dict[str, Any], report_progress: Callable[[float, str], None]) -> Dict[str, Any]:
+    report_progress(0.0, "Fetching transcript")
+    segments = database_operations.get_transcript_segments(_collection(params), params["video_id"])
+    result = summarizer.summarize(segments, on_progress=lambda done, total, message: report_progress(done / total, f"{message} ({done}/{total})"))
+    return {"summary": result.text, "chunks": result.chunks, "levels": result.levels, "llm_calls": result.llm_calls,
+            "cached_calls": result.cached_calls, "seconds": round(result.seconds, 2)}
+
+
+def register_handlers(queue: JobQueue) -> JobQueue:
+    """
+    Registers the app's long-running operations on the job queue.
+    """
+    queue.register(SAVE_LIBRARY, _save_library)
+    queue.register(ADD_SUBTITLES, _add_subtitles)
+    queue.register(THUMBNAIL, _thumbnail)
+    queue.register(DELETE_ALL, _delete_all)
+    queue.register(SUMMARIZE, _summarize)
+    return queue
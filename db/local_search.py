@@ -0,0 +1,309 @@
+import json
+import logging
+import math
+import os
+import re
+import threading
+import zlib
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from db.transcript_cache import CACHE_DIR
+
+
+INDEX_DIR = os.path.join(CACHE_DIR, "search_index")
+PASSAGE_WORDS = int(os.getenv("VIDEOLENS_PASSAGE_WORDS", "60"))
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercases the text and splits it into word tokens.
+    """
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class HashingEmbedder:
+    """
+    Dependency-free text embedder: unigrams and bigrams are hashed into a fixed number of signed buckets
+    and the result is L2-normalised. Stable across processes, so persisted matrices stay valid.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def _bucket(self, feature: str):
+        digest = zlib.crc32(feature.encode("utf-8"))
+        return digest % self.dim, 1.0 if digest & 0x80000000 else -1.0
+
+    def embed(self, texts: Iterable[str]) -> np.ndarray:
+        """
+        Embeds a batch of texts into a (len(texts), dim) float32 matrix of unit vectors.
+        """
+        texts = list(texts)
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+                column, sign = self._bucket(feature)
+                matrix[row, column] += sign
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+@dataclass
+class LocalHit:
+    """
+    A transcript passage returned by the local index. Mirrors the fields of a VideoDB Shot used by the app.
+    """
+    video_id: str
+    video_title: str
+    start: float
+    end: float
+    text: str
+    search_score: float
+
+
+def window_segments(segments: List[Dict[str, object]], max_words: int = PASSAGE_WORDS) -> List[Dict[str, object]]:
+    """
+    Groups word- or sentence-level transcript segments into passages of at most `max_words` words.
+
+    Args:
+        segments (List[Dict[str, object]]): Segments with "start", "end" and "text" keys.
+        max_words (int): Word budget of a passage.
+
+    Returns:
+        List[Dict[str, object]]: Passages with "start", "end" and "text" keys.
+    """
+    passages, words, start, end = [], [], None, None
+    for segment in segments:
+        text = (segment.get("text") or "").strip()
+        if not text or text == "-":
+            continue
+        if start is None:
+            start = segment.get("start")
+        words.extend(text.split())
+        end = segment.get("end")
+        if len(words) >= max_words:
+            passages.append({"start": start, "end": end, "text": " ".join(words)})
+            words, start = [], None
+    if words:
+        passages.append({"start": start, "end": end, "text": " ".join(words)})
+    return passages
+
+
+class LocalSearchIndex:
+    """
+    In-process retrieval over transcript passages of one collection: a BM25 inverted index plus a
+    NumPy embedding matrix searched with cosine similarity. Videos are added incrementally; a batch of
+    additions can defer writing the index to disk until `flush()`.
+    """
+
+    def __init__(self, path: Optional[str] = None, embedder: Optional[HashingEmbedder] = None,
+                 k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            path (Optional[str]): Directory the index is persisted to. None keeps it in memory only.
+            embedder (Optional[HashingEmbedder]): Embedder for passages and queries.
+            k1 (float): BM25 term frequency saturation.
+            b (float): BM25 length normalisation.
+        """
+        self.path = path
+        self.embedder = embedder or HashingEmbedder()
+        self.k1, self.b = k1, b
+        self._lock = threading.RLock()
+        self._passages: List[LocalHit] = []
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._lengths: List[int] = []
+        self._video_rows: Dict[str, List[int]] = defaultdict(list)
+        self._matrix = np.zeros((0, self.embedder.dim), dtype=np.float32)
+        self._dirty = False
+        if path and os.path.exists(os.path.join(path, "passages.json")):
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._passages)
+
+    def has_video(self, video_id: str) -> bool:
+        return video_id in self._video_rows
+
+    def add_video(self, video_id: str, video_title: str, segments: List[Dict[str, object]], save: bool = True) -> int:
+        """
+        Indexes the transcript of one video, replacing any earlier version of it.
+
+        Args:
+            video_id (str): The ID of the video.
+            video_title (str): The title shown with its passages.
+            segments (List[Dict[str, object]]): Transcript segments with "start", "end" and "text" keys.
+            save (bool): Write the index to disk now. Pass False when adding many videos and call `flush()` after.
+
+        Returns:
+            int: Number of passages added.
+        """
+        passages = [LocalHit(video_id, video_title, float(p["start"] or 0), float(p["end"] or 0), p["text"], 0.0)
+                    for p in window_segments(segments)]
+        with self._lock:
+            if self.has_video(video_id):
+                self._remove_videos({video_id})
+            self._append(passages, self.embedder.embed(p.text for p in passages))
+            # A video without speech has no passages but is indexed all the same, so it is not fetched again
+            self._video_rows.setdefault(video_id, [])
+            self._dirty = True
+            if save:
+                self._save()
+        logging.info(f"Indexed {len(passages)} passages locally. fn=LocalSearchIndex.add_video, video_id={video_id}")
+        return len(passages)
+
+    def remove_videos(self, video_ids: Iterable[str]) -> None:
+        with self._lock:
+            self._remove_videos(set(video_ids))
+            self._save()
+
+    def flush(self) -> None:
+        """
+        Writes the index to disk if videos were added without saving.
+        """
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def search(self, query: str, video_id: Optional[str] = None, top_k: int = 5, mode: str = "hybrid") -> List[LocalHit]:
+        """
+        Ranks passages for a query.
+
+        Args:
+            query (str): The search query.
+            video_id (Optional[str]): Restrict results to one video.
+            top_k (int): Number of hits to return.
+            mode (str): "bm25", "vector" or "hybrid" (mean of max-normalised BM25 and cosine scores).
+
+        Returns:
+            List[LocalHit]: Hits in descending score order.
+        """
+        return self.search_many([query], video_id=video_id, top_k=top_k, mode=mode)[0]
+
+    def search_many(self, queries: List[str], video_id: Optional[str] = None, top_k: int = 5,
+                    mode: str = "hybrid") -> List[List[LocalHit]]:
+        """
+        Ranks passages for a batch of queries; cosine scores are computed with a single matrix product.
+        """
+        with self._lock:
+            rows = np.asarray(self._video_rows.get(video_id, []) if video_id else range(len(self._passages)), dtype=np.int64)
+            if rows.size == 0:
+                return [[] for _ in queries]
+            scores = np.zeros((len(queries), rows.size), dtype=np.float32)
+            if mode in ("vector", "hybrid"):
+                cosine = self.embedder.embed(queries) @ self._matrix[rows].T
+                scores += _max_normalise(cosine) if mode == "hybrid" else cosine
+            if mode in ("bm25", "hybrid"):
+                bm25 = np.stack([self._bm25(query, rows) for query in queries])
+                scores += _max_normalise(bm25) if mode == "hybrid" else bm25
+            if mode == "hybrid":
+                scores /= 2
+
+            results = []
+            k = min(top_k, rows.size)
+            for query_scores in scores:
+                best = np.argpartition(-query_scores, k - 1)[:k]
+                best = best[np.argsort(-query_scores[best])]
+                results.append([_with_score(self._passages[rows[i]], float(query_scores[i]))
+                                for i in best if query_scores[i] > 0])
+            return results
+
+    def _bm25(self, query: str, rows: np.ndarray) -> np.ndarray:
+        total = len(self._passages)
+        average_length = sum(self._lengths) / total if total else 0.0
+        position = {row: i for i, row in enumerate(rows.tolist())}
+        scores = np.zeros(rows.size, dtype=np.float32)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for row, frequency in postings.items():
+                if row in position:
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[row] / average_length)
+                    scores[position[row]] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return scores
+
+    def _append(self, passages: List[LocalHit], embeddings: np.ndarray) -> None:
+        offset = len(self._passages)
+        for row, passage in enumerate(passages, start=offset):
+            terms = Counter(tokenize(passage.text))
+            for term, frequency in terms.items():
+                self._postings[term][row] = frequency
+            self._lengths.append(sum(terms.values()))
+            self._video_rows[passage.video_id].append(row)
+        self._passages.extend(passages)
+        self._matrix = np.vstack([self._matrix, embeddings.astype(np.float32)])
+
+    def _remove_videos(self, video_ids: set) -> None:
+        keep = [row for row, passage in enumerate(self._passages) if passage.video_id not in video_ids]
+        passages, matrix = [self._passages[row] for row in keep], self._matrix[keep]
+        empty = [video_id for video_id in self._empty_videos() if video_id not in video_ids]
+        self._passages, self._lengths = [], []
+        self._postings, self._video_rows = defaultdict(dict), defaultdict(list)
+        self._matrix = np.zeros((0, self.embedder.dim), dtype=np.float32)
+        self._append(passages, matrix)
+        for video_id in empty:
+            self._video_rows[video_id] = []
+
+    def _empty_videos(self) -> List[str]:
+        return sorted(video_id for video_id, rows in self._video_rows.items() if not rows)
+
+    def _save(self) -> None:
+        self._dirty = False
+        if not self.path:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        stored = {"dim": self.embedder.dim, "empty_videos": self._empty_videos(),
+                  "passages": [[p.video_id, p.video_title, p.start, p.end, p.text] for p in self._passages]}
+        _atomic_write(os.path.join(self.path, "passages.json"), lambda f: f.write(json.dumps(stored).encode("utf-8")))
+        _atomic_write(os.path.join(self.path, "embeddings.npy"), lambda f: np.save(f, self._matrix))
+
+    def _load(self) -> None:
+        with open(os.path.join(self.path, "passages.json"), encoding="utf-8") as f:
+            stored = json.load(f)
+        if stored["dim"] != self.embedder.dim:
+            logging.warning(f"Discarding local index with dim={stored['dim']}. fn=LocalSearchIndex._load, path={self.path}")
+            return
+        passages = [LocalHit(video_id, title, start, end, text, 0.0) for video_id, title, start, end, text in stored["passages"]]
+        self._append(passages, np.load(os.path.join(self.path, "embeddings.npy")))
+        for video_id in stored.get("empty_videos", []):
+            self._video_rows.setdefault(video_id, [])
+
+
+def _max_normalise(scores: np.ndarray) -> np.ndarray:
+    peak = scores.max(axis=1, keepdims=True)
+    peak[peak <= 0] = 1.0
+    return np.clip(scores, 0, None) / peak
+
+
+def _with_score(passage: LocalHit, score: float) -> LocalHit:
+    return LocalHit(passage.video_id, passage.video_title, passage.start, passage.end, passage.text, score)
+
+
+def _atomic_write(path: str, write) -> None:
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        write(f)
+    os.replace(temporary, path)
+
+
+_indexes: Dict[str, LocalSearchIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_local_index(collection_id: str) -> LocalSearchIndex:
+    """
+    Returns the process-wide local index of a collection, loading it from disk on first use.
+    """
+    with _indexes_lock:
+        if collection_id not in _indexes:
+            _indexes[collection_id] = LocalSearchIndex(os.path.join(INDEX_DIR, collection_id))
+        return _indexes[collection_id]
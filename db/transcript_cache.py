@@ -0,0 +1,108 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Iterable, Optional
+
+
+CACHE_DIR = os.getenv("VIDEOLENS_CACHE_DIR", "cache")
+DEFAULT_TTL_SECONDS = float(os.getenv("VIDEOLENS_TRANSCRIPT_TTL", str(7 * 24 * 3600)))
+DEFAULT_MAX_BYTES = int(float(os.getenv("VIDEOLENS_TRANSCRIPT_CACHE_MB", "256")) * 1024 * 1024)
+
+TRANSCRIPT = "transcript"
+SEGMENTS = "segments"
+METADATA = "metadata"
+
+
+class TranscriptCache:
+    """
+    On-disk cache of transcripts, timestamped transcript segments and video metadata, keyed by video ID.
+
+    Entries expire after a TTL and the least recently used ones are evicted once the cache grows past
+    its size budget. The cache is a single SQLite file, so it is shared by every Streamlit session and
+    worker process on the machine.
+    """
+
+    def __init__(self, path: str = os.path.join(CACHE_DIR, "transcripts.db"), ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            path (str): Location of the SQLite file. Its directory is created if missing.
+            ttl_seconds (float): Age after which an entry is treated as missing.
+            max_bytes (int): Total payload size above which least recently used entries are evicted.
+        """
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " video_id TEXT NOT NULL, kind TEXT NOT NULL, payload TEXT NOT NULL, size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL, accessed_at REAL NOT NULL, PRIMARY KEY (video_id, kind))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+
+    def get(self, video_id: str, kind: str) -> Optional[Any]:
+        """
+        Returns the cached value for (video_id, kind), or None if it is missing or expired.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT payload, created_at FROM entries WHERE video_id = ? AND kind = ?", (video_id, kind)
+            ).fetchone()
+            if row is None:
+                return None
+            payload, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._db.execute("DELETE FROM entries WHERE video_id = ? AND kind = ?", (video_id, kind))
+                return None
+            self._db.execute(
+                "UPDATE entries SET accessed_at = ? WHERE video_id = ? AND kind = ?", (now, video_id, kind)
+            )
+        return json.loads(payload)
+
+    def put(self, video_id: str, kind: str, value: Any) -> None:
+        """
+        Stores a JSON-serialisable value for (video_id, kind) and evicts old entries if over budget.
+        """
+        payload = json.dumps(value, separators=(",", ":"))
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (video_id, kind, payload, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)", (video_id, kind, payload, len(payload), now, now)
+            )
+            self._evict(now)
+
+    def invalidate(self, video_ids: Iterable[str]) -> None:
+        """
+        Drops every cached entry of the given videos.
+        """
+        with self._lock:
+            self._db.executemany("DELETE FROM entries WHERE video_id = ?", [(video_id,) for video_id in video_ids])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+
+    def _evict(self, now: float) -> None:
+        self._db.execute("DELETE FROM entries WHERE created_at < ?", (now - self.ttl_seconds,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for video_id, kind, size in self._db.execute(
+                "SELECT video_id, kind, size FROM entries ORDER BY accessed_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM entries WHERE video_id = ? AND kind = ?", (video_id, kind))
+            total -= size
+            evicted += 1
+        logging.info(f"Evicted {evicted} transcript cache entries. fn=TranscriptCache._evict")
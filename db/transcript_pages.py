@@ -0,0 +1,215 @@
+import os
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from db.local_search import tokenize
+from utils.single_flight import single_flight
+
+
+TRANSCRIPT_PAGE_SEGMENTS = int(os.getenv("VIDEOLENS_TRANSCRIPT_PAGE_SEGMENTS", "50"))
+# VideoDB returns one segment per word; words are joined into lines of at most this many words or seconds,
+# or up to the end of a sentence, before the transcript is paged and indexed
+TRANSCRIPT_LINE_WORDS = int(os.getenv("VIDEOLENS_TRANSCRIPT_LINE_WORDS", "30"))
+TRANSCRIPT_LINE_SECONDS = float(os.getenv("VIDEOLENS_TRANSCRIPT_LINE_SECONDS", "15"))
+# Paged transcripts kept in memory per process; each holds arrays and one string, not per-segment dicts
+TRANSCRIPT_PAGES_CACHE = int(os.getenv("VIDEOLENS_TRANSCRIPT_PAGES_CACHE", "16"))
+
+_TIMESTAMP = re.compile(r"^\s*(?:(\d+):)?(?:(\d+):)?(\d+(?:\.\d+)?)\s*$")
+_SENTENCE_END = re.compile(r"[.!?][\"')\]]*$")
+
+
+def format_timestamp(seconds: float) -> str:
+    seconds = int(seconds or 0)
+    return f"{seconds // 3600:d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def parse_timestamp(value: str) -> Optional[float]:
+    """
+    Parses "83", "1:23" or "0:01:23" into seconds. Returns None if the value is not a timestamp.
+    """
+    match = _TIMESTAMP.match(value or "")
+    if not match:
+        return None
+    parts = [float(part) for part in match.groups() if part is not None]
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + part
+    return seconds
+
+
+def group_segments(segments: Iterable[Dict[str, object]], max_words: int = TRANSCRIPT_LINE_WORDS,
+                   max_seconds: float = TRANSCRIPT_LINE_SECONDS) -> List[Dict[str, object]]:
+    """
+    Joins consecutive transcript segments into lines that end at a sentence end, or once they reach
+    `max_words` words or `max_seconds` seconds. Word-level transcripts become readable lines, and phrases
+    can be searched within a line; segments that already are sentences pass through unchanged.
+    """
+    lines: List[Dict[str, object]] = []
+    words: List[str] = []
+    start = end = 0.0
+    for segment in segments:
+        text = str(segment.get("text") or "").strip()
+        if not text:
+            continue
+        if not words:
+            start = float(segment.get("start") or 0.0)
+        end = float(segment.get("end") or segment.get("start") or start)
+        words.append(text)
+        if (_SENTENCE_END.search(text) or sum(len(part.split()) for part in words) >= max_words
+                or end - start >= max_seconds):
+            lines.append({"start": start, "end": end, "text": " ".join(words)})
+            words = []
+    if words:
+        lines.append({"start": start, "end": end, "text": " ".join(words)})
+    return lines
+
+
+@dataclass
+class TranscriptLine:
+    position: int
+    start: float
+    end: float
+    text: str
+
+    @property
+    def label(self) -> str:
+        return format_timestamp(self.start)
+
+
+class PagedTranscript:
+    """
+    Timestamped transcript of one video, stored as NumPy arrays of start and end times plus one string with
+    an array of offsets into it, instead of one dict per segment. Segments are first grouped into lines
+    with `group_segments`, so a page holds lines rather than single words.
+
+    Segments are served a page at a time. A word-to-segments inverted index is built once, so keyword
+    search does not scan the text, and a timestamp is mapped to its page with a binary search over the
+    start times.
+    """
+
+    def __init__(self, segments: Iterable[Dict[str, object]]):
+        """
+        Args:
+            segments (Iterable[Dict[str, object]]): Segments with "start", "end" and "text" keys, in time order.
+        """
+        starts, ends, texts = [], [], []
+        for segment in group_segments(segments):
+            text = str(segment.get("text") or "").strip()
+            if not text:
+                continue
+            start = float(segment.get("start") or 0.0)
+            starts.append(start)
+            ends.append(float(segment.get("end") or start))
+            texts.append(text)
+        order = np.argsort(np.asarray(starts, dtype=np.float64), kind="stable")
+        self.starts = np.asarray(starts, dtype=np.float64)[order]
+        self.ends = np.asarray(ends, dtype=np.float64)[order]
+        texts = [texts[position] for position in order]
+        self._text = "".join(texts)
+        self._offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum([len(text) for text in texts], out=self._offsets[1:])
+
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for position, text in enumerate(texts):
+            for term in set(tokenize(text)):
+                postings[term].append(position)
+        self._postings = {term: np.asarray(positions, dtype=np.int32) for term, positions in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def duration(self) -> float:
+        return float(self.ends.max()) if len(self) else 0.0
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Approximate memory held by the transcript, including the inverted index.
+        """
+        return (self.starts.nbytes + self.ends.nbytes + self._offsets.nbytes + len(self._text.encode("utf-8"))
+                + sum(positions.nbytes for positions in self._postings.values()))
+
+    def line(self, position: int) -> TranscriptLine:
+        text = self._text[self._offsets[position]:self._offsets[position + 1]]
+        return TranscriptLine(position, float(self.starts[position]), float(self.ends[position]), text)
+
+    def page_count(self, page_size: int = TRANSCRIPT_PAGE_SEGMENTS) -> int:
+        return max(1, -(-len(self) // page_size))
+
+    def page(self, number: int, page_size: int = TRANSCRIPT_PAGE_SEGMENTS) -> List[TranscriptLine]:
+        """
+        Returns the segments of a page, numbered from 1. Out-of-range numbers are clamped.
+        """
+        number = min(max(1, number), self.page_count(page_size))
+        first = (number - 1) * page_size
+        return [self.line(position) for position in range(first, min(first + page_size, len(self)))]
+
+    def position_at(self, seconds: float) -> int:
+        """
+        Returns the segment playing at `seconds`: the last one that starts at or before it.
+        """
+        return max(0, int(np.searchsorted(self.starts, seconds, side="right")) - 1)
+
+    def page_at(self, seconds: float, page_size: int = TRANSCRIPT_PAGE_SEGMENTS) -> int:
+        return self.position_at(seconds) // page_size + 1
+
+    def search(self, query: str, limit: int = 20) -> List[TranscriptLine]:
+        """
+        Returns the first `limit` segments, in time order, that contain every word of the query.
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        matches: Optional[np.ndarray] = None
+        # Intersect the shortest posting lists first
+        for term in sorted(terms, key=lambda term: len(self._postings.get(term, ()))):
+            positions = self._postings.get(term)
+            if positions is None:
+                return []
+            matches = positions if matches is None else np.intersect1d(matches, positions, assume_unique=True)
+            if not len(matches):
+                return []
+        return [self.line(int(position)) for position in matches[:limit]]
+
+
+class PagedTranscriptCache:
+    """
+    Process-wide LRU of paged transcripts keyed by video ID, shared by every session. Concurrent misses for
+    the same video build its index once.
+    """
+
+    def __init__(self, capacity: int = TRANSCRIPT_PAGES_CACHE):
+        self.capacity = capacity
+        self._items: "OrderedDict[str, PagedTranscript]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, video_id: str, load: Callable[[], List[Dict[str, object]]]) -> PagedTranscript:
+        """
+        Returns the paged transcript of the video, building it from `load()` segments on a miss.
+        """
+        with self._lock:
+            transcript = self._items.get(video_id)
+            if transcript is not None:
+                self._items.move_to_end(video_id)
+                return transcript
+        return single_flight.call("transcript_pages.build", video_id, self._build, video_id, load)
+
+    def _build(self, video_id: str, load: Callable[[], List[Dict[str, object]]]) -> PagedTranscript:
+        transcript = PagedTranscript(load())
+        with self._lock:
+            self._items[video_id] = transcript
+            self._items.move_to_end(video_id)
+            while len(self._items) > self.capacity:
+                self._items.popitem(last=False)
+        return transcript
+
+    def invalidate(self, video_ids: Iterable[str]) -> None:
+        with self._lock:
+            for video_id in video_ids:
+                self._items.pop(video_id, None)
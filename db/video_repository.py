@@ -0,0 +1,168 @@
+import logging
+import os
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from utils.metrics import metrics, track
+from utils.resilience import resilient_call
+from utils.single_flight import single_flight
+
+
+VIDEODB_BACKEND_NAME = "videodb"
+FAKE_BACKEND_NAME = "fake"
+DEFAULT_BACKEND = os.getenv("VIDEOLENS_BACKEND", VIDEODB_BACKEND_NAME)
+HTTP_POOL_SIZE = int(os.getenv("VIDEOLENS_HTTP_POOL_SIZE", "32"))
+
+
+def _connect_videodb() -> Tuple[object, Callable[[str], object]]:
+    """
+    Opens a VideoDB connection and widens its HTTP connection pool so concurrent calls reuse sockets.
+
+    The SDK's own urllib3 retries are turned off: resilient_call already retries transient failures, and
+    two retry layers would multiply the attempts behind every call.
+    """
+    from dotenv import load_dotenv
+    from requests.adapters import HTTPAdapter
+    from videodb import connect, play_stream
+
+    load_dotenv(override=True)
+    videodb_api_key = os.getenv("VIDEODB_KEY")
+    if not videodb_api_key:
+        logging.error("VIDEODB_KEY is not set in the environment variables.")
+        raise RuntimeError("API key configuration failed.")
+
+    connection = connect(api_key=videodb_api_key)
+    session = getattr(connection, "session", None)
+    if session is not None:
+        for prefix in ("https://", "http://"):
+            session.mount(prefix, HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=0))
+    logging.info("API key configured successfully.")
+    return connection, play_stream
+
+
+def _connect_fake() -> Tuple[object, Callable[[str], object]]:
+    from db.fake_backend import FakeConnection, fake_play_stream
+
+    logging.info("Using the in-memory fake VideoDB backend.")
+    return FakeConnection(), fake_play_stream
+
+
+_BACKENDS = {VIDEODB_BACKEND_NAME: _connect_videodb, FAKE_BACKEND_NAME: _connect_fake}
+
+
+class CollectionHandle:
+    """
+    Stands in for a collection whose ID is already known, e.g. one reopened from the state store.
+
+    The ID is available immediately; the backend `get_collection` call is made only when something
+    other than the ID is first needed.
+    """
+
+    def __init__(self, repository: "VideoRepository", collection_id: str):
+        self.id = collection_id
+        self._repository = repository
+        self._collection: Optional[object] = None
+
+    def __getattr__(self, name: str) -> object:
+        # Only called for attributes the handle does not have itself
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if self._collection is None:
+            self._collection = self._repository.get_collection(self.id)
+        return getattr(self._collection, name)
+
+
+class VideoRepository:
+    """
+    Single entry point to the video backend.
+
+    The connection is opened lazily on first use and shared by every caller in the process, so its pooled
+    HTTP session is reused. `Video` handles are cached per collection, which turns the `get_video` round
+    trip that used to precede every operation into a dictionary lookup after the first access.
+    """
+
+    def __init__(self, backend: str = DEFAULT_BACKEND, connection: Optional[object] = None):
+        """
+        Args:
+            backend (str): "videodb" for the real service or "fake" for the in-memory backend.
+            connection (Optional[object]): Pre-built connection, mainly for benchmarks. Skips lazy connection.
+        """
+        if backend not in _BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'. Expected one of {sorted(_BACKENDS)}.")
+        self.backend = backend
+        self._connection = connection
+        self._play_stream: Optional[Callable[[str], object]] = None
+        if connection is not None:
+            from db.fake_backend import fake_play_stream
+            self._play_stream = fake_play_stream if backend == FAKE_BACKEND_NAME else None
+        self._videos: Dict[Tuple[str, str], object] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> object:
+        if self._connection is None:
+            with self._lock:
+                if self._connection is None:
+                    self._connection, self._play_stream = _BACKENDS[self.backend]()
+        return self._connection
+
+    def play_stream(self, url: str) -> object:
+        """
+        Opens a stream URL in the browser (a no-op for the fake backend).
+        """
+        if self._play_stream is None:
+            self.connection
+            if self._play_stream is None:
+                from videodb import play_stream
+                self._play_stream = play_stream
+        return self._play_stream(url)
+
+    def download(self, url: str) -> Optional[bytes]:
+        """
+        Fetches the bytes behind an artifact URL the backend rendered, or None if it cannot be downloaded.
+        The fake backend resolves its own URLs without touching the network.
+        """
+        if self.backend == FAKE_BACKEND_NAME:
+            from db.fake_backend import fake_download
+
+            return fake_download(url)
+        from db.artifact_store import download
+
+        return download(url)
+
+    def create_collection(self, name: str) -> object:
+        return self.connection.create_collection(name=name, description=name)
+
+    def get_collection(self, collection_id: str) -> object:
+        return self.connection.get_collection(collection_id)
+
+    def collection_handle(self, collection_id: str) -> CollectionHandle:
+        return CollectionHandle(self, collection_id)
+
+    def get_video(self, collection: object, video_id: str) -> object:
+        """
+        Returns the video handle, fetching it from the backend only on the first access.
+        """
+        key = (collection.id, video_id)
+        video = self._videos.get(key)
+        metrics.record_cache("video_handle_cache", video is not None)
+        if video is None:
+            with track("videodb.get_video"):
+                # Sessions opening the same video at the same time share one lookup
+                video = single_flight.call("videodb.get_video", key, resilient_call, "videodb.get_video", collection.get_video, video_id)
+            self._videos[key] = video
+        return video
+
+    def remember(self, collection: object, video: object) -> None:
+        """
+        Caches a handle obtained elsewhere (upload, listing) so later lookups are free.
+        """
+        self._videos[(collection.id, video.id)] = video
+
+    def forget(self, collection: object, video_id: Optional[str] = None) -> None:
+        """
+        Drops one cached handle, or every handle of the collection when `video_id` is None.
+        """
+        with self._lock:
+            for key in [key for key in self._videos if key[0] == collection.id and video_id in (None, key[1])]:
+                del self._videos[key]
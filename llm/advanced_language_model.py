@@ -1,26 +1,49 @@
+import hashlib
 import os
-import google.generativeai as genai
-from typing import Any
+import threading
+from typing import Any, Iterator, Optional
 import logging
-from dotenv import load_dotenv
-
-
-# Load environment variables
-try:
-    load_dotenv(override=True)
-    gemini_api_key = os.getenv("GEMINI_PRO_KEY")
-    if gemini_api_key:
-        # Configure API for Google's generative AI
-        genai.configure(api_key=gemini_api_key)
-        logging.info("API key configured successfully.")
-    else:
-        logging.error("GEMINI_PRO_KEY is not set in the environment variables.")
-        # Raise an exception to halt execution
-        raise RuntimeError("API key configuration failed.")
-    
-except Exception as e:
-    logging.error(f"Error loading environment variables or configuring API key. error={e}")
-    raise  # Re-raise the exception to halt execution
+import time
+from utils.metrics import timed, track
+from utils.resilience import resilient_call
+from utils.single_flight import single_flight
+
+
+_genai = None
+_genai_lock = threading.Lock()
+_model = None
+
+
+def _get_genai() -> Any:
+    """
+    Imports and configures the Gemini SDK on first use, so importing this module stays cheap.
+
+    Returns:
+        Any: The configured `google.generativeai` module.
+    """
+    global _genai
+    if _genai is None:
+        with _genai_lock:
+            if _genai is None:
+                # Load environment variables
+                try:
+                    import google.generativeai as genai
+                    from dotenv import load_dotenv
+
+                    load_dotenv(override=True)
+                    gemini_api_key = os.getenv("GEMINI_PRO_KEY")
+                    if gemini_api_key:
+                        # Configure API for Google's generative AI
+                        genai.configure(api_key=gemini_api_key)
+                        logging.info("API key configured successfully.")
+                    else:
+                        logging.error("GEMINI_PRO_KEY is not set in the environment variables.")
+                        raise RuntimeError("API key configuration failed.")
+                except Exception as e:
+                    logging.error(f"Error loading environment variables or configuring API key. error={e}")
+                    raise
+                _genai = genai
+    return _genai
 
 
 safety_settings = [
@@ -47,29 +70,104 @@ safety_settings = [
 ]
 
 
-def generate_answer_from_context(query: str, context: str) -> Any:
+def _get_model() -> Any:
+    """
+    Returns the gemini-pro model handle, created once per process and shared by every call.
+    """
+    global _model
+    if _model is None:
+        genai = _get_genai()
+        with _genai_lock:
+            if _model is None:
+                _model = genai.GenerativeModel('gemini-pro', safety_settings=safety_settings)
+    return _model
+
+
+def _prompt_key(prompt: str) -> str:
+    return hashlib.sha1(prompt.encode("utf-8")).hexdigest()
+
+
+def _build_prompt(query: str, context: str, history: str = "") -> str:
+    instruction = (
+        "Provide a detailed and accurate response based on the context given. "
+        "If the context is insufficient for a comprehensive answer, request more details. "
+        "Ensure your response is grounded in the provided information."
+    )
+    if history:
+        # The conversation only resolves references in the query; the answer must still come from the context
+        return (f"Instructions: {instruction} Use the conversation so far only to understand what the query refers to."
+                f"\n\nConversation so far:\n{history}\n\nContext: {context}\n\nQuery: {query}")
+    return f"Instructions: {instruction} \n\nContext: {context}\n\nQuery: {query}"
+
+
+def generate_text(prompt: str) -> str:
+    """
+    Sends a complete prompt to the language model and returns the response text.
+
+    Args:
+        prompt (str): The prompt, including any instructions and context.
+
+    Returns:
+        str: The generated text.
+    """
+    model = _get_model()
+    with track("gemini.generate") as call:
+        # Sessions asking the same question at the same time share one request
+        response = single_flight.call("gemini.generate", _prompt_key(prompt), resilient_call, "gemini.generate", model.generate_content, prompt)
+        call["payload_size"] = len(prompt)
+    return response.text
+
+
+@timed("llm.generate_answer_from_context", payload_size=len)
+def generate_answer_from_context(query: str, context: str, history: str = "") -> Any:
     """
     Generates a response based on a user's query and the provided context using a language model.
 
     Args:
         query (str): The user's query.
         context (str): The context information to base the response on.
+        history (str): The conversation so far, as rendered by ConversationMemory. Empty for a standalone question.
 
     Returns:
         Any: The generated response from the language model.
     """
     try:
-        model = genai.GenerativeModel('gemini-pro', safety_settings=safety_settings)
-        instruction = (
-            "Provide a detailed and accurate response based on the context given. "
-            "If the context is insufficient for a comprehensive answer, request more details. "
-            "Ensure your response is grounded in the provided information."
-        )
-        prompt = f"Instructions: {instruction} \n\nContext: {context}\n\nQuery: {query}"
-        response = model.generate_content(prompt)
+        response = generate_text(_build_prompt(query, context, history))
         logging.info("LLM responded successfully. fn=generate_answer_from_context")
-        return response.text
+        return response
     except Exception as e:
         logging.error(f"Error occured while generating response from LLM. fn=generate_answer_from_context,error={e}")
         raise e
 
+
+@timed("llm.generate_answer_stream")
+def generate_answer_stream(query: str, context: str, model: Optional[Any] = None, history: str = "") -> Iterator[str]:
+    """
+    Streams a response based on a user's query and the provided context, yielding text chunks as the language model produces them.
+
+    Args:
+        query (str): The user's query.
+        context (str): The context information to base the response on.
+        model (Optional[Any]): Model exposing `generate_content(prompt, stream=True)`. Defaults to gemini-pro.
+        history (str): The conversation so far, as rendered by ConversationMemory. Empty for a standalone question.
+
+    Yields:
+        str: Partial response text, in order.
+    """
+    try:
+        model = model or _get_model()
+        prompt = _build_prompt(query, context, history)
+        started = time.perf_counter()
+        first_token_seconds = None
+        # Retries cover opening the stream; a failure after chunks were yielded is raised to the caller.
+        # Concurrent identical prompts read the chunks of one shared stream.
+        stream = single_flight.stream("gemini.generate_stream", (id(model), _prompt_key(prompt)), resilient_call,
+                                      "gemini.generate_stream", model.generate_content, prompt, stream=True)
+        for chunk in stream:
+            if first_token_seconds is None:
+                first_token_seconds = time.perf_counter() - started
+            yield chunk.text
+        logging.info(f"LLM streamed response successfully, first chunk after {first_token_seconds or 0:.2f}s, total {time.perf_counter() - started:.2f}s. fn=generate_answer_stream")
+    except Exception as e:
+        logging.error(f"Error occured while streaming response from LLM. fn=generate_answer_stream,error={e}")
+        raise e
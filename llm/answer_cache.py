@@ -0,0 +1,126 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from utils.metrics import metrics
+
+
+ANSWER_CACHE_SIZE = int(os.getenv("VIDEOLENS_ANSWER_CACHE_SIZE", "2048"))
+ANSWER_CACHE_TTL = float(os.getenv("VIDEOLENS_ANSWER_CACHE_TTL", str(24 * 3600)))
+
+_NON_WORD = re.compile(r"[^a-z0-9\s]")
+# Words that do not change what a question asks about; the remaining words, in order, key the cache
+_STOP_WORDS = frozenset(
+    "a an the is are was were be been do does did of in on at to for from by with about and or what which who whom "
+    "whose when where why how can could would should will please tell me explain describe say said this that video".split())
+
+
+def normalize_query(query: str) -> str:
+    """
+    Lowercases the query, drops punctuation and collapses whitespace.
+    """
+    return " ".join(_NON_WORD.sub(" ", query.lower()).split())
+
+
+def key_terms(normalized: str) -> str:
+    """
+    Returns the words of a normalized query that decide what it asks about, in their original order, so
+    "What does the video say about caching?" and "caching" share a key. A query made only of stop words
+    is returned unchanged.
+    """
+    return " ".join(word for word in normalized.split() if word not in _STOP_WORDS) or normalized
+
+
+def context_hash(context: str) -> str:
+    return hashlib.sha1(context.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedAnswer:
+    answer: str
+    details: Dict[str, Any]
+    context_hash: str
+    created_at: float = field(default_factory=time.time)
+
+
+class AnswerCache:
+    """
+    Process-wide LRU/TTL cache of LLM answers keyed by (video_id, key terms of the question, context hash).
+
+    Questions are lowercased, stripped of punctuation and of stop words, so rewordings that only differ in
+    filler words share an answer; questions that differ in any other word do not. A lookup without a context
+    matches on the question alone, so a hit skips both the search and the LLM call.
+    """
+
+    def __init__(self, max_entries: int = ANSWER_CACHE_SIZE, ttl_seconds: float = ANSWER_CACHE_TTL):
+        """
+        Args:
+            max_entries (int): Number of answers kept before the least recently used one is evicted.
+            ttl_seconds (float): Age after which an answer is treated as missing.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], CachedAnswer]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, video_id: str, query: str, context: Optional[str] = None) -> Optional[CachedAnswer]:
+        """
+        Looks up an answer.
+
+        Args:
+            video_id (str): The ID of the video the question is about.
+            query (str): The user's question.
+            context (Optional[str]): Retrieved context. When given, the cached answer must have been generated from the same context.
+
+        Returns:
+            Optional[CachedAnswer]: The cached answer, or None on a miss.
+        """
+        key = (video_id, key_terms(normalize_query(query)))
+        expected_hash = context_hash(context) if context is not None else None
+        with self._lock:
+            entry = self._live_entry(key, time.time())
+            if entry is not None and expected_hash in (None, entry.context_hash):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                metrics.record_cache("answer_cache", True)
+                return entry
+            self.misses += 1
+            metrics.record_cache("answer_cache", False)
+            return None
+
+    def put(self, video_id: str, query: str, context: str, answer: str, details: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Stores an answer generated for `query` from `context`.
+        """
+        key = (video_id, key_terms(normalize_query(query)))
+        with self._lock:
+            self._entries[key] = CachedAnswer(answer, details or {}, context_hash(context))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, video_id: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == video_id]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _live_entry(self, key: Tuple[str, str], now: float) -> Optional[CachedAnswer]:
+        entry = self._entries.get(key)
+        if entry is not None and now - entry.created_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        return entry
+
+
+answer_cache = AnswerCache()
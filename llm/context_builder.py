@@ -0,0 +1,98 @@
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("VIDEOLENS_CONTEXT_TOKENS", "1500"))
+CONTEXT_MAX_SHOTS = int(os.getenv("VIDEOLENS_CONTEXT_SHOTS", "8"))
+# Shots closer than this many seconds are merged into one segment
+MERGE_GAP_SECONDS = float(os.getenv("VIDEOLENS_CONTEXT_MERGE_GAP", "2.0"))
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (about four characters per token for English text), good enough for budgeting prompts.
+    """
+    return max(1, (len(text) + 3) // 4)
+
+
+@dataclass
+class ContextSegment:
+    start: float
+    end: float
+    score: float
+    sentences: List[str] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.sentences)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"start": self.start, "end": self.end, "score": self.score, "tokens": estimate_tokens(self.text), "text": self.text}
+
+
+def _merge_shots(shots: List[Any], merge_gap: float) -> List[ContextSegment]:
+    segments: List[ContextSegment] = []
+    for shot in sorted(shots, key=lambda shot: (shot.start or 0.0)):
+        start, end, score = float(shot.start or 0.0), float(shot.end or 0.0), float(shot.search_score or 0.0)
+        sentences = [sentence for sentence in _SENTENCE_SPLIT.split((shot.text or "").strip()) if sentence]
+        if segments and start <= segments[-1].end + merge_gap:
+            last = segments[-1]
+            last.end, last.score = max(last.end, end), max(last.score, score)
+            last.sentences.extend(sentences)
+        else:
+            segments.append(ContextSegment(start, end, score, sentences))
+    return segments
+
+
+def _dedupe(segments: List[ContextSegment]) -> List[ContextSegment]:
+    seen = set()
+    for segment in sorted(segments, key=lambda segment: -segment.score):
+        unique = []
+        for sentence in segment.sentences:
+            key = " ".join(sentence.lower().split())
+            if key not in seen:
+                seen.add(key)
+                unique.append(sentence)
+        segment.sentences = unique
+    return [segment for segment in segments if segment.sentences]
+
+
+def build_context(shots: List[Any], token_budget: int = CONTEXT_TOKEN_BUDGET, max_shots: int = CONTEXT_MAX_SHOTS,
+                  merge_gap: float = MERGE_GAP_SECONDS) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Turns search hits into a prompt context of bounded size.
+
+    The best `max_shots` hits are merged where their time ranges overlap or touch, repeated sentences are
+    dropped, and the resulting segments are packed greedily by score until the token budget is spent.
+    Selected segments are returned in timeline order.
+
+    Args:
+        shots (List[Any]): Search hits exposing start, end, text and search_score.
+        token_budget (int): Maximum estimated tokens of the returned context.
+        max_shots (int): Number of top-scoring hits considered.
+        merge_gap (float): Hits separated by at most this many seconds are merged.
+
+    Returns:
+        Tuple[str, List[Dict[str, Any]]]: The context text and the chosen segments with their timestamps, scores and token estimates.
+    """
+    top_shots = sorted(shots, key=lambda shot: -(shot.search_score or 0.0))[:max_shots]
+    segments = _dedupe(_merge_shots(top_shots, merge_gap))
+
+    chosen, remaining = [], token_budget
+    for segment in sorted(segments, key=lambda segment: -segment.score):
+        tokens = estimate_tokens(segment.text)
+        if tokens <= remaining:
+            chosen.append(segment)
+            remaining -= tokens
+    if not chosen and segments:
+        # Even the best segment is over budget; keep a truncated prefix of it rather than sending no context
+        best = max(segments, key=lambda segment: segment.score)
+        best.sentences = [best.text[:token_budget * 4]]
+        chosen.append(best)
+    chosen.sort(key=lambda segment: segment.start)
+    context = "\n".join(f"[{segment.start:.0f}s-{segment.end:.0f}s] {segment.text}" for segment in chosen)
+    return context, [segment.as_dict() for segment in chosen]
@@ -0,0 +1,227 @@
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Hashable, List, Optional
+
+from llm.context_builder import estimate_tokens
+from utils.metrics import metrics
+
+
+# Most recent question/answer pairs sent to the model word for word
+MEMORY_RECENT_TURNS = int(os.getenv("VIDEOLENS_MEMORY_TURNS", "3"))
+# Token budget of the rolling summary and the recent turns together
+MEMORY_TOKEN_BUDGET = int(os.getenv("VIDEOLENS_MEMORY_TOKENS", "800"))
+# Conversations whose rolling summary is kept in memory
+MEMORY_CONVERSATIONS = int(os.getenv("VIDEOLENS_MEMORY_CONVERSATIONS", "1024"))
+
+# Questions of at most this many words that contain a reference word are treated as follow-ups
+FOLLOW_UP_MAX_WORDS = 6
+
+# Openings that only make sense after an earlier turn ("what about...", "why?", a leading pronoun)
+_LEADING_REFERENCE = re.compile(
+    r"^\W*(what about|how about|and|but|so|then|also|why|how come|he|she|they|it|its|his|her|their|them|"
+    r"that|those|these|there)\b", re.IGNORECASE)
+# Words that point back at earlier turns when they appear in a short question
+_REFERENCE = re.compile(r"\b(he|she|him|her|his|hers|they|them|their|it|its|that|those|there|then|again|else|more)\b",
+                        re.IGNORECASE)
+
+
+def is_follow_up(question: str) -> bool:
+    """
+    Tells whether a question probably refers back to the conversation: it opens with a reference, or it
+    is short and contains one. Everything else is searched as it is, without a rewrite.
+    """
+    if _LEADING_REFERENCE.match(question):
+        return True
+    return len(question.split()) <= FOLLOW_UP_MAX_WORDS and bool(_REFERENCE.search(question))
+
+
+_SUMMARY_INSTRUCTION = (
+    "Update the summary of a conversation about a video with the new messages below. Keep the questions asked, "
+    "the facts and timestamps given in the answers, and who or what pronouns refer to. Answer with the updated "
+    "summary only, in at most {words} words."
+)
+_REWRITE_INSTRUCTION = (
+    "Rewrite the last question of this conversation about a video as a standalone search query that can be "
+    "understood without the conversation. Replace pronouns and references with what they refer to. "
+    "Answer with the rewritten question only."
+)
+
+
+@dataclass
+class MemoryContext:
+    """
+    What the model gets to see of a conversation: a summary of older turns and the most recent turns verbatim.
+    """
+    summary: str = ""
+    recent: List[Dict[str, str]] = field(default_factory=list)
+
+    @property
+    def empty(self) -> bool:
+        return not self.summary and not self.recent
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.render()) if not self.empty else 0
+
+    def render(self) -> str:
+        lines = []
+        if self.summary:
+            lines.append(f"Summary of the earlier conversation: {self.summary}")
+        for message in self.recent:
+            lines.append(f"{'User' if message['role'] == 'user' else 'Assistant'}: {message['message']}")
+        return "\n".join(lines)
+
+
+@dataclass
+class _Conversation:
+    summary: str = ""
+    # Last message folded into the summary. Stored histories are trimmed from the front, so positions shift
+    # and the message itself is what marks how far the summary goes.
+    tail: Optional[Dict[str, str]] = None
+    pending: Optional[Future] = None
+
+    def folded_until(self, history: List[Dict[str, str]], end: int) -> int:
+        """
+        Returns the position in `history` of the first message not folded into the summary yet.
+        """
+        if self.tail is None:
+            return 0
+        for position in range(min(end, len(history)) - 1, -1, -1):
+            if history[position] == self.tail:
+                return position + 1
+        # The tail was trimmed from the stored history, so everything still there is newer than the summary
+        return 0
+
+
+def _truncate(text: str, tokens: int) -> str:
+    return text if estimate_tokens(text) <= tokens else text[:max(0, tokens * 4 - 3)] + "..."
+
+
+class ConversationMemory:
+    """
+    Bounded memory of chat conversations for the language model.
+
+    The last `recent_turns` question/answer pairs are kept verbatim. Older messages are folded into a
+    rolling summary by a background thread, a batch at a time, so answering never waits for it; until a
+    fold finishes the previous summary is used. Summary and recent turns together stay within
+    `token_budget`, so the prompt does not grow with the length of the conversation.
+    """
+
+    def __init__(self, generate: Optional[Callable[[str], str]] = None, recent_turns: int = MEMORY_RECENT_TURNS,
+                 token_budget: int = MEMORY_TOKEN_BUDGET, max_conversations: int = MEMORY_CONVERSATIONS):
+        """
+        Args:
+            generate (Optional[Callable[[str], str]]): Turns a prompt into text. Defaults to Gemini.
+            recent_turns (int): Question/answer pairs kept verbatim.
+            token_budget (int): Maximum estimated tokens of the summary and the recent turns together.
+            max_conversations (int): Conversations remembered before the least recently used one is dropped.
+        """
+        self._generate = generate
+        self.recent_turns = max(1, recent_turns)
+        self.token_budget = token_budget
+        self.max_conversations = max_conversations
+        self._conversations: "OrderedDict[Hashable, _Conversation]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory")
+
+    def _call_model(self, prompt: str) -> str:
+        if self._generate is None:
+            from llm.advanced_language_model import generate_text
+
+            self._generate = generate_text
+        return self._generate(prompt).strip()
+
+    def _conversation(self, key: Hashable) -> _Conversation:
+        conversation = self._conversations.get(key)
+        if conversation is None:
+            conversation = self._conversations[key] = _Conversation()
+            while len(self._conversations) > self.max_conversations:
+                self._conversations.popitem(last=False)
+        self._conversations.move_to_end(key)
+        return conversation
+
+    def context(self, key: Hashable, history: List[Dict[str, str]]) -> MemoryContext:
+        """
+        Returns the memory of a conversation for the next prompt, and schedules folding of messages that
+        dropped out of the recent window into the summary.
+
+        Args:
+            key (Hashable): Identifies the conversation, e.g. (collection_id, video_id).
+            history (List[Dict[str, str]]): The earlier messages as {"role", "message"} dicts, oldest first,
+                without the question being asked now.
+
+        Returns:
+            MemoryContext: The summary and recent turns, within the token budget.
+        """
+        window = 2 * self.recent_turns
+        with self._lock:
+            conversation = self._conversation(key)
+            if not history:
+                # The history was cleared; start the summary over
+                conversation.summary, conversation.tail = "", None
+            older = max(0, len(history) - window)
+            folded = conversation.folded_until(history, older)
+            if older > folded and conversation.pending is None:
+                conversation.pending = self._executor.submit(self._fold, key, conversation, history[folded:older])
+            summary = conversation.summary
+            recent = history[max(folded, older):]
+
+        summary = _truncate(summary, self.token_budget // 2)
+        # Count what render() adds around the texts too, so the rendered memory stays within the budget
+        remaining = self.token_budget - (MemoryContext(summary).tokens + 1 if summary else 0)
+        chosen: List[Dict[str, str]] = []
+        for message in reversed(recent):
+            text = _truncate(message["message"], max(1, self.token_budget // 4))
+            tokens = estimate_tokens(f"Assistant: {text}") + 1
+            if tokens > remaining:
+                break
+            chosen.append({"role": message["role"], "message": text})
+            remaining -= tokens
+        return MemoryContext(summary, list(reversed(chosen)))
+
+    def _fold(self, key: Hashable, conversation: _Conversation, messages: List[Dict[str, str]]) -> None:
+        try:
+            transcript = "\n".join(f"{'User' if message['role'] == 'user' else 'Assistant'}: {message['message']}"
+                                   for message in messages)
+            words = max(30, self.token_budget // 2 * 3 // 4)
+            prompt = (f"{_SUMMARY_INSTRUCTION.format(words=words)}\n\nCurrent summary: {conversation.summary or '(none)'}"
+                      f"\n\nNew messages:\n{transcript}")
+            summary = self._call_model(prompt)
+            with self._lock:
+                conversation.summary, conversation.tail = summary, messages[-1]
+            metrics.increment("llm.conversation_memory", "summaries")
+            logging.info(f"Folded {len(messages)} messages into the conversation summary. fn=ConversationMemory._fold, conversation={key}")
+        except Exception as e:
+            logging.error(f"Conversation summary update failed. fn=ConversationMemory._fold, conversation={key}, error={e}")
+        finally:
+            with self._lock:
+                conversation.pending = None
+
+    def rewrite_question(self, question: str, memory: MemoryContext) -> str:
+        """
+        Turns a follow-up question into a standalone one using the conversation, so the video search gets
+        the full subject. Questions with no earlier conversation or no reference to it are returned as they are,
+        without a model call; so is the original question if the rewrite fails.
+        """
+        if memory.empty or not is_follow_up(question):
+            return question
+        try:
+            rewritten = self._call_model(f"{_REWRITE_INSTRUCTION}\n\n{memory.render()}\nUser: {question}").strip().strip('"')
+            metrics.increment("llm.conversation_memory", "rewrites")
+            logging.info(f"Rewrote follow-up question. fn=ConversationMemory.rewrite_question, question={question}, rewritten={rewritten}")
+            return rewritten or question
+        except Exception as e:
+            logging.error(f"Question rewrite failed, using the original question. fn=ConversationMemory.rewrite_question, error={e}")
+            return question
+
+    def forget(self, key: Hashable) -> None:
+        with self._lock:
+            self._conversations.pop(key, None)
+
+
+conversation_memory = ConversationMemory()
@@ -0,0 +1,202 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from db.transcript_cache import CACHE_DIR, TranscriptCache
+from db.transcript_pages import format_timestamp
+from llm.context_builder import estimate_tokens
+from utils.metrics import metrics, timed
+
+
+SUMMARY_CHUNK_TOKENS = int(os.getenv("VIDEOLENS_SUMMARY_CHUNK_TOKENS", "2000"))
+# Number of summaries combined by one reduce call; the tree has log_fan_in(chunks) levels
+SUMMARY_FAN_IN = int(os.getenv("VIDEOLENS_SUMMARY_FAN_IN", "4"))
+SUMMARY_WORKERS = int(os.getenv("VIDEOLENS_SUMMARY_WORKERS", "4"))
+# A chunk may end at a segment whose text hashes to 0 modulo this value once it holds half the chunk budget
+_BOUNDARY_DIVISOR = 16
+
+CHUNK_SUMMARY = "chunk_summary"
+
+_MAP_INSTRUCTION = (
+    "Summarize this part of a video transcript in a few bullet points. Keep names, numbers and conclusions, "
+    "and do not add information that is not in the transcript."
+)
+_REDUCE_INSTRUCTION = (
+    "These are summaries of consecutive parts of one video, in order. Combine them into one coherent summary "
+    "that keeps the most important points and the order in which they come up. Keep the timestamps of key points."
+)
+
+
+@dataclass
+class TranscriptChunk:
+    start: float
+    end: float
+    text: str
+
+    @property
+    def label(self) -> str:
+        return f"[{format_timestamp(self.start)} - {format_timestamp(self.end)}]"
+
+
+@dataclass
+class SummaryResult:
+    """
+    A hierarchical summary and what it cost.
+    """
+    text: str
+    chunks: int
+    levels: int
+    llm_calls: int = 0
+    cached_calls: int = 0
+    seconds: float = 0.0
+    chunk_summaries: List[Dict[str, object]] = field(default_factory=list)
+
+
+def chunk_segments(segments: List[Dict[str, object]], chunk_tokens: int = SUMMARY_CHUNK_TOKENS) -> List[TranscriptChunk]:
+    """
+    Splits timestamped transcript segments into chunks of at most `chunk_tokens` estimated tokens.
+
+    Chunk boundaries are content-defined: past half the budget a chunk ends after a segment whose text
+    hashes to a fixed residue. The boundaries therefore depend only on nearby text, so two transcripts that
+    share a long stretch (an overlapping time range, a re-uploaded video) produce the same chunks for it and
+    reuse each other's cached chunk summaries.
+    """
+    chunks: List[TranscriptChunk] = []
+    texts: List[str] = []
+    tokens = 0
+    start = end = 0.0
+    for segment in segments:
+        text = str(segment.get("text") or "").strip()
+        if not text:
+            continue
+        segment_tokens = estimate_tokens(text)
+        if texts and tokens + segment_tokens > chunk_tokens:
+            chunks.append(TranscriptChunk(start, end, " ".join(texts)))
+            texts, tokens = [], 0
+        if not texts:
+            start = float(segment.get("start") or 0.0)
+        texts.append(text)
+        tokens += segment_tokens
+        end = float(segment.get("end") or start)
+        if tokens >= chunk_tokens // 2 and zlib.crc32(text.encode("utf-8")) % _BOUNDARY_DIVISOR == 0:
+            chunks.append(TranscriptChunk(start, end, " ".join(texts)))
+            texts, tokens = [], 0
+    if texts:
+        chunks.append(TranscriptChunk(start, end, " ".join(texts)))
+    return chunks
+
+
+class Summarizer:
+    """
+    Map-reduce summarizer for long transcripts.
+
+    Chunks are summarized in parallel, then groups of `fan_in` summaries are combined level by level until
+    one summary is left, so latency grows with the depth of the tree rather than with the transcript length.
+    Every map and reduce result is cached on disk by the hash of its prompt.
+    """
+
+    def __init__(self, generate: Optional[Callable[[str], str]] = None, cache: Optional[TranscriptCache] = None,
+                 chunk_tokens: int = SUMMARY_CHUNK_TOKENS, fan_in: int = SUMMARY_FAN_IN, max_workers: int = SUMMARY_WORKERS):
+        """
+        Args:
+            generate (Optional[Callable[[str], str]]): Turns a prompt into text. Defaults to Gemini.
+            cache (Optional[TranscriptCache]): Store of chunk and reduce summaries. Defaults to <cache dir>/summaries.db.
+            chunk_tokens (int): Token budget of a transcript chunk.
+            fan_in (int): Summaries combined per reduce call. At least 2.
+            max_workers (int): LLM calls in flight at the same time.
+        """
+        self._generate = generate
+        self.cache = cache or TranscriptCache(os.path.join(CACHE_DIR, "summaries.db"))
+        self.chunk_tokens = chunk_tokens
+        self.fan_in = max(2, fan_in)
+        self.max_workers = max(1, max_workers)
+
+    def _generate_cached(self, prompt: str) -> Tuple[str, bool]:
+        key = hashlib.sha1(prompt.encode("utf-8")).hexdigest()
+        cached = self.cache.get(key, CHUNK_SUMMARY)
+        metrics.record_cache("summary_cache", cached is not None)
+        if cached is not None:
+            return cached, True
+        if self._generate is None:
+            from llm.advanced_language_model import generate_text
+
+            self._generate = generate_text
+        text = self._generate(prompt)
+        self.cache.put(key, CHUNK_SUMMARY, text)
+        return text, False
+
+    def total_calls(self, chunks: int) -> int:
+        """
+        Number of map and reduce calls a transcript of `chunks` chunks needs.
+        """
+        total, level = chunks, chunks
+        while level > 1:
+            level = -(-level // self.fan_in)
+            total += level
+        return total
+
+    @timed("llm.summarize")
+    def summarize(self, segments: List[Dict[str, object]],
+                  on_progress: Optional[Callable[[int, int, str], None]] = None) -> SummaryResult:
+        """
+        Summarizes a timestamped transcript.
+
+        Args:
+            segments (List[Dict[str, object]]): Segments with "start", "end" and "text" keys.
+            on_progress (Optional[Callable[[int, int, str], None]]): Called with (done, total, message) after every
+                map or reduce call, from worker threads.
+
+        Returns:
+            SummaryResult: The summary, the size of the tree and how many calls were served from the cache.
+        """
+        started = time.perf_counter()
+        chunks = chunk_segments(segments, self.chunk_tokens)
+        result = SummaryResult(text="", chunks=len(chunks), levels=0)
+        if not chunks:
+            return result
+        total = self.total_calls(len(chunks))
+        done = [0]
+        lock = threading.Lock()
+
+        def step(prompt: str, message: str) -> str:
+            text, cached = self._generate_cached(prompt)
+            with lock:
+                if cached:
+                    result.cached_calls += 1
+                else:
+                    result.llm_calls += 1
+                done[0] += 1
+                finished = done[0]
+            if on_progress is not None:
+                on_progress(finished, total, message)
+            return text
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="summarize") as executor:
+            partials = list(executor.map(
+                lambda chunk: step(f"{_MAP_INSTRUCTION}\n\nTranscript {chunk.label}:\n{chunk.text}", "Summarizing chunks"),
+                chunks))
+            result.chunk_summaries = [{"start": chunk.start, "end": chunk.end, "summary": summary}
+                                      for chunk, summary in zip(chunks, partials)]
+            # Reduce prompts carry the time range of every part, so the final summary can point into the video
+            summaries = [f"{chunk.label} {summary}" for chunk, summary in zip(chunks, partials)]
+            result.levels = 1
+            while len(summaries) > 1:
+                groups = [summaries[position:position + self.fan_in] for position in range(0, len(summaries), self.fan_in)]
+                summaries = list(executor.map(
+                    lambda group: step(f"{_REDUCE_INSTRUCTION}\n\n" + "\n\n".join(group), f"Combining summaries (level {result.levels})"),
+                    groups))
+                result.levels += 1
+        result.text = summaries[0] if result.levels > 1 else partials[0]
+        result.seconds = time.perf_counter() - started
+        logging.info(f"Summarized {result.chunks} chunks in {result.levels} levels, {result.llm_calls} LLM calls, "
+                     f"{result.cached_calls} cached, {result.seconds:.2f}s. fn=Summarizer.summarize")
+        return result
+
+
+summarizer = Summarizer()
@@ -1,8 +1,20 @@
 import streamlit as st
-from db.database_operations import add_videos_to_index, chat_with_video, stream_video, watch_shorts, transcribe_video, add_subtitles, thumbnail, delete_video_from_index, delete_all_videos_from_index, show_collection
-from llm.advanced_language_model import generate_answer_from_context
+from db import database_operations
+from db.video_repository import VideoRepository
+from db.database_operations import DEFAULT_SEARCH_BACKEND, SEARCH_BACKENDS, chat_with_video, search_collection, play_shot, stream_video, compile_clip, get_paged_transcript, delete_video_from_index, iter_collection, cached_subtitles, cached_thumbnail
+from llm.advanced_language_model import generate_answer_stream
+from llm.answer_cache import answer_cache
+from llm.conversation_memory import conversation_memory, is_follow_up
 from utils.helpers import setup_logging
+from utils.metrics import metrics
+from utils.jobs import ACTIVE_STATES, DONE, JobQueue
+from db.job_handlers import ADD_SUBTITLES, DELETE_ALL, SAVE_LIBRARY, SUMMARIZE, THUMBNAIL, library_key, register_handlers
+from db.transcript_cache import CACHE_DIR
+from db.transcript_pages import TRANSCRIPT_PAGE_SEGMENTS, format_timestamp, parse_timestamp
+from utils.state_store import LibraryState, StateStore
 import logging
+import os
+import uuid
 
 st.set_page_config(
     page_title="Video Insight Bot🤖", layout="wide", initial_sidebar_state="auto"
@@ -11,6 +23,47 @@ st.set_page_config(
 
 setup_logging('logs/videolens_logs.log')
 
+
+@st.cache_resource(show_spinner=False)
+def video_repository() -> VideoRepository:
+    # One repository per server process; it connects to VideoDB only when a service first needs it
+    return VideoRepository()
+
+
+database_operations.repository = video_repository()
+
+
+@st.cache_resource(show_spinner=False)
+def metrics_snapshot_writer():
+    # Started once per process; disabled unless VIDEOLENS_METRICS_SNAPSHOT names a file
+    snapshot_path = os.getenv("VIDEOLENS_METRICS_SNAPSHOT")
+    if snapshot_path:
+        return metrics.start_snapshot_writer(snapshot_path, float(os.getenv("VIDEOLENS_METRICS_INTERVAL", "30")))
+    return None
+
+
+metrics_snapshot_writer()
+
+
+@st.cache_resource(show_spinner=False)
+def background_jobs() -> JobQueue:
+    # Shared by every session of this process; the SQLite queue outlives reruns and restarts
+    return register_handlers(JobQueue(os.path.join(CACHE_DIR, "jobs.db"))).start()
+
+
+job_queue = background_jobs()
+
+
+@st.cache_resource(show_spinner=False)
+def state_store() -> StateStore:
+    # Libraries and chat histories are shared by every session and tab instead of living in st.session_state
+    return StateStore(os.path.join(CACHE_DIR, "state.db"))
+
+
+store = state_store()
+
+ALL_VIDEOS = "All videos in the collection"
+
 # Load the CSS file
 def load_css(css_file):
     try:
@@ -54,8 +107,41 @@ if 'collection' not in st.session_state:
     st.session_state.collection = None
 if 'collection_variables' not in st.session_state:
     st.session_state.collection_variables = False
-if 'chat_histories' not in st.session_state:
-    st.session_state.chat_histories = {}  # Stores chat histories for each video
+if 'library_name' not in st.session_state:
+    st.session_state.library_name = ""
+if 'jobs' not in st.session_state:
+    st.session_state.jobs = {}  # Background job IDs of this session, keyed by UI slot
+if 'session_token' not in st.session_state:
+    st.session_state.session_token = uuid.uuid4().hex  # Owner of the chat questions this session answers
+
+def open_library(library: LibraryState):
+    # The collection handle is lazy, so reopening a library does not call VideoDB
+    st.session_state.video_dict = dict(library.video_dict)
+    st.session_state.video_urls = list(library.urls)
+    st.session_state.collection = database_operations.repository.collection_handle(library.collection_id)
+    st.session_state.library_name = library.name
+    st.session_state.urls_stored = True
+    st.session_state.collection_variables = True
+    st.query_params["library"] = library.name
+
+
+def save_library_state():
+    store.save_library(LibraryState(st.session_state.library_name, database_operations.repository.backend,
+                                    st.session_state.collection.id, st.session_state.video_dict, st.session_state.video_urls))
+
+
+def open_saved_library():
+    library = store.load_library(database_operations.repository.backend, st.session_state.saved_library)
+    if library is not None:
+        open_library(library)
+
+
+# A reload or a shared link reopens the library named in the URL
+if not st.session_state.urls_stored and "library" in st.query_params:
+    saved = store.load_library(database_operations.repository.backend, st.query_params["library"])
+    if saved is not None:
+        open_library(saved)
+
 
 def add_video_url():
     if st.session_state.video_url != "":
@@ -71,23 +157,101 @@ def add_video_url():
 
 def save_library():
     if st.session_state.collection_name != "":
-        # Assuming add_videos_to_index is defined elsewhere
-        st.session_state.video_dict, st.session_state.collection = add_videos_to_index(
-            st.session_state.collection_name, st.session_state.video_urls)
-        if st.session_state.video_dict is not None:
-            st.session_state.urls_stored = True
-            st.session_state.collection_variables = True
-        else:
-            col1, _, _ = st.columns([2.1, 3, 2], gap="large")
-            with col1:
-                st.error("Error uploading videos and indexing. Please try again.")
-            st.session_state.urls_stored = False
+        # Upload and indexing run as a background job, so reruns and reloads do not restart or block it
+        st.session_state.jobs["save_library"] = job_queue.submit(
+            SAVE_LIBRARY, library_key(st.session_state.collection_name, st.session_state.video_urls),
+            {"collection_name": st.session_state.collection_name, "youtube_urls": st.session_state.video_urls})
     else:
         col1, _, _ = st.columns([2.1, 1, 2], gap="large")
         with col1:
             st.warning("Please provide the collection name and then click the 'Save the library to Database' button to continue.")
 
+
+def add_more_videos():
+    new_urls = [url.strip() for url in st.session_state.more_video_urls.splitlines() if url.strip()]
+    if new_urls:
+        # The whole library is resubmitted; the ingest manifest makes videos that are already indexed free
+        st.session_state.video_urls = st.session_state.video_urls + new_urls
+        st.session_state.jobs["save_library"] = job_queue.submit(
+            SAVE_LIBRARY, library_key(st.session_state.library_name, st.session_state.video_urls),
+            {"collection_name": st.session_state.library_name, "youtube_urls": st.session_state.video_urls})
+        st.session_state.more_video_urls = ""
+
+
+def go_to_transcript_page(page: int):
+    st.session_state.transcript_page = page
+
+
+def jump_to_timestamp(transcript):
+    seconds = parse_timestamp(st.session_state.transcript_jump)
+    if seconds is not None:
+        st.session_state.transcript_page = transcript.page_at(seconds)
+
+
+@st.fragment(run_every=1.0)
+def job_progress(slot: str, label: str):
+    # Polls a running job without rerunning the whole page; a full rerun picks up the result once it finishes
+    job = job_queue.get(st.session_state.jobs[slot])
+    if job is None or job["status"] not in ACTIVE_STATES:
+        st.rerun()
+    st.progress(job["progress"], text=f"{label} {job['message']}")
+
+
+@st.fragment(run_every=1.0)
+def answer_progress(collection_id: str, video_id: str):
+    # Another tab or session is answering the question; rerun once its answer is stored or its claim lapses
+    if not store.answering_elsewhere(collection_id, video_id, st.session_state.session_token):
+        st.rerun()
+    st.caption("Another session is answering this question...")
+
+
+def job_for(slot: str, label: str):
+    """
+    Returns the finished job stored under `slot`, rendering its progress instead while it is still running.
+    """
+    job_id = st.session_state.jobs.get(slot)
+    job = job_queue.get(job_id) if job_id else None
+    if job is None:
+        return None
+    if job["status"] in ACTIVE_STATES:
+        job_progress(slot, label)
+        return None
+    return job
+
+
+def submit_video_job(operation: str, video_id: str):
+    slot = f"{operation}:{video_id}"
+    if slot not in st.session_state.jobs:
+        st.session_state.jobs[slot] = job_queue.submit(
+            operation, video_id, {"collection_id": st.session_state.collection.id, "video_id": video_id})
+    return slot
+
+
+save_job = job_for("save_library", "Uploading and indexing videos...")
+if save_job is not None:
+    del st.session_state.jobs["save_library"]
+    if save_job["status"] == DONE:
+        result = save_job["result"]
+        library = LibraryState(result["collection_name"], database_operations.repository.backend, result["collection_id"],
+                               result["video_dict"], st.session_state.video_urls)
+        store.save_library(library)
+        open_library(library)
+        if result["reused"]:
+            st.info(f"{result['reused']} videos were already in the library and were not uploaded again.")
+        for url, error in result["failed"].items():
+            st.warning(f"Failed to upload and index {url}. Error: {error}")
+    else:
+        col1, _, _ = st.columns([2.1, 3, 2], gap="large")
+        with col1:
+            st.error("Error uploading videos and indexing. Please try again.")
+        st.session_state.urls_stored = False
+
 if not st.session_state.urls_stored:
+    saved_libraries = store.list_libraries(database_operations.repository.backend)
+    if saved_libraries:
+        with st.sidebar.expander("Open an existing library"):
+            st.selectbox("Library", saved_libraries, key="saved_library")
+            st.button("Open library", on_click=open_saved_library)
     st.sidebar.write("Enter video collection name")
     st.sidebar.text_input("", placeholder="One collection name", label_visibility="collapsed", key="collection_name")
     st.subheader("Provide the YouTube Video URL")
@@ -101,6 +265,11 @@ if not st.session_state.urls_stored:
     if st.button("Save the library to Database", on_click=save_library):
         pass
 
+if st.session_state.urls_stored and st.session_state.library_name:
+    with st.sidebar.expander("Add videos to the library"):
+        st.text_area("YouTube URLs, one per line", key="more_video_urls")
+        st.button("Add to library", on_click=add_more_videos)
+
 # st.divider()
 st.sidebar.subheader("Select a Service:")
 selected_service = st.sidebar.radio(
@@ -108,6 +277,11 @@ selected_service = st.sidebar.radio(
     ["***LLM Summary***", "***Stream Full Video***", "***Search and Watch Clip***", "***Get Transcript***", "***Add Subtitles***", "***Generate Thumbnail***","***Delete Video***", "***Delete All***"],
     captions=["Summarized Response", "Stream Video", "Watch Related Short Clips", "Video Transcript", "Watch with Subtitles", "Create Video Thumbnail","Delete the Video", "Delete All Videos"], label_visibility="collapsed")
 
+st.sidebar.subheader("Search backend:")
+search_backends = list(SEARCH_BACKENDS)
+search_backend = st.sidebar.radio("", search_backends, index=search_backends.index(DEFAULT_SEARCH_BACKEND),
+    captions=["VideoDB search", "Local transcript index"], label_visibility="collapsed", key="search_backend")
+
 
 
 if selected_service == "***LLM Summary***" and st.session_state.urls_stored:
@@ -117,30 +291,75 @@ if selected_service == "***LLM Summary***" and st.session_state.urls_stored:
     st.subheader("Select URL to chat with")
     video_name = st.selectbox(" ", st.session_state.video_dict.keys(), placeholder="Choose the video to stream",index=None, disabled=False, label_visibility="collapsed", key="chatbot")
     if video_name:
-        if video_name not in st.session_state.chat_histories:
-            st.session_state.chat_histories[video_name] = [{"role": "bot", "message": "Hello! Feel free to search through the video content. What's your question?"}] # Initialize chat history for the video if not exist
-        
-        for entry in st.session_state.chat_histories[video_name]:
+        with st.expander("Summary of the whole video"):
+            summary_slot = f"{SUMMARIZE}:{st.session_state.video_dict[video_name]}"
+            if summary_slot not in st.session_state.jobs and st.button("Summarize the whole video"):
+                submit_video_job(SUMMARIZE, st.session_state.video_dict[video_name])
+            if summary_slot in st.session_state.jobs:
+                job = job_for(summary_slot, "Summarizing...")
+                if job is not None and job["status"] == DONE:
+                    st.markdown(job["result"]["summary"])
+                    st.caption(f"{job['result']['chunks']} transcript chunks, {job['result']['levels']} levels, "
+                               f"{job['result']['llm_calls']} LLM calls, {job['result']['cached_calls']} from cache")
+                elif job is not None:
+                    del st.session_state.jobs[summary_slot]
+                    st.error(f"Summarization failed: {job['error']}")
+
+        video_id = st.session_state.video_dict[video_name]
+        # Histories are shared with every session that opens this library and survive reloads
+        chat_history = [{"role": "bot", "message": "Hello! Feel free to search through the video content. What's your question?"},
+                        *store.history(st.session_state.collection.id, video_id)]
+
+        for entry in chat_history:
             with st.chat_message(entry["role"]):
                 st.write(entry["message"])
 
 
         query = st.chat_input("What would you like to know?")
         if query:
-            st.session_state.chat_histories[video_name].append({"role": "user", "message": query})
+            store.append_message(st.session_state.collection.id, video_id, "user", query)
+            chat_history.append({"role": "user", "message": query})
             with st.chat_message("user"):
                 st.write(query)
 
-        if st.session_state.chat_histories[video_name][-1]["role"] != "bot":
+        if chat_history[-1]["role"] != "bot" and not store.claim_answer(st.session_state.collection.id, video_id, st.session_state.session_token):
+            # The shared history means other tabs see the question too; only the run holding the claim answers it
+            answer_progress(st.session_state.collection.id, video_id)
+        elif chat_history[-1]["role"] != "bot":
+            # Also answers a question left unanswered by an interrupted run
+            query = chat_history[-1]["message"]
+            # Older turns reach the model as a rolling summary, so the prompt stays bounded however long the chat gets
+            memory = conversation_memory.context((st.session_state.collection.id, video_id), chat_history[1:-1])
             with st.chat_message("bot"):
-                with st.spinner("Analyzing..."):
-                    response_placeholder = st.empty()
-                    search_context, details = chat_with_video(st.session_state.collection, st.session_state.video_dict[video_name], query)
-                    response = ""
-                    response = generate_answer_from_context(query, search_context)
-                response_placeholder.write(response)
-
-                st.session_state.chat_histories[video_name].append({"role": "bot", "message": response})
+                response_placeholder = st.empty()
+                # A repeated question is answered from the cache before anything else, without a model call.
+                # Follow-ups depend on the conversation, so they never read or fill the cache.
+                follow_up = is_follow_up(query)
+                cached = None if follow_up else answer_cache.get(video_id, query)
+                if cached is not None:
+                    response, details = cached.answer, cached.details
+                    response_placeholder.write(response)
+                else:
+                    with st.spinner("Analyzing..."):
+                        # Follow-ups like "what about after that?" are searched as standalone questions
+                        search_query = conversation_memory.rewrite_question(query, memory)
+                        search_context, details = chat_with_video(st.session_state.collection, video_id, search_query, search_backend=search_backend)
+                    details = {**details, "standalone_question": search_query, "memory_tokens": memory.tokens}
+                    if not search_context:
+                        # Without context the LLM would only guess, so report the search problem instead
+                        response = f"I couldn't retrieve the relevant part of the video: {details.get('error', 'unknown error')}. Please try again."
+                        response_placeholder.warning(response)
+                    else:
+                        try:
+                            # Render tokens as they arrive so the user waits for the first chunk, not the whole answer
+                            response = response_placeholder.write_stream(generate_answer_stream(query, search_context, history=memory.render()))
+                            if not follow_up:
+                                answer_cache.put(video_id, query, search_context, response, details)
+                        except Exception as e:
+                            response = f"The language model is unavailable right now ({e}). Please try again shortly."
+                            response_placeholder.error(response)
+
+                store.append_message(st.session_state.collection.id, video_id, "bot", response)
 
             with st.expander("Context and Details"):
                 st.write(details)
@@ -160,15 +379,36 @@ if selected_service == "***Search and Watch Clip***" and st.session_state.urls_s
     st.header(selected_service)
     st.divider()
     st.subheader("Select URL to stream a clip from")
-    video_name = st.selectbox(" ", st.session_state.video_dict.keys(), placeholder="Choose the video whose shorts you want to watch from", index=None, disabled=False, label_visibility="collapsed", key="shorts")
+    video_name = st.selectbox(" ", [ALL_VIDEOS, *st.session_state.video_dict.keys()], placeholder="Choose the video whose shorts you want to watch from", index=None, disabled=False, label_visibility="collapsed", key="shorts")
     if video_name:
         st.subheader("Enter the topic to get shorts relevant to that")
         topic = st.text_input(" ", placeholder="ask here")
-        if topic:
+        if topic and video_name == ALL_VIDEOS:
+            with st.spinner("Searching all videos..."):
+                shots, search_details = search_collection(st.session_state.collection, topic, search_backend=search_backend)
+            if search_details.get("error"):
+                st.warning(f"The search was cut short: {search_details['error']}")
+            elif search_details["partial"]:
+                st.warning(f"Some videos did not answer in time and were left out: {len(search_details['timed_out']) + len(search_details['failed'])}")
+            if shots:
+                labels = [f"{shot.video_title} [{shot.start:.0f}s-{shot.end:.0f}s] score={float(shot.search_score or 0):.2f}" for shot in shots]
+                for label, shot in zip(labels, shots):
+                    st.markdown(f"**{label}**  \n{shot.text}")
+                chosen = st.selectbox("Play a clip", labels, index=None, placeholder="Choose a clip to stream", key="shorts_clip")
+                if chosen:
+                    with st.spinner("Streaming clip in new tab..."):
+                        play_shot(st.session_state.collection, shots[labels.index(chosen)])
+            else:
+                st.info("No shorts matching the specified topic were found. Please try a different topic.")
+        elif topic:
             with st.spinner("Streaming shots in new tab..."):
-                response = watch_shorts(st.session_state.collection, st.session_state.video_dict[video_name], topic)  
-                if response.shots != []:
-                    response.play()
+                # Matching shots are merged into one capped stream, reused when the topic is searched again
+                clip = compile_clip(st.session_state.collection, st.session_state.video_dict[video_name], topic, search_backend=search_backend)
+                if clip is not None:
+                    database_operations.repository.play_stream(clip.stream_url)
+                    if clip.timeline:
+                        st.caption(f"{len(clip.timeline)} segments, {clip.duration:.0f}s: "
+                                   + ", ".join(f"{start:.0f}s-{end:.0f}s" for start, end in clip.timeline))
                 else:
                     st.info("No shorts matching the specified topic were found. Please try a different topic.")
                     
@@ -179,10 +419,41 @@ if selected_service == "***Get Transcript***" and st.session_state.urls_stored:
     st.subheader("Select URL to get transcript from")
     video_name = st.selectbox(" ", st.session_state.video_dict.keys(), placeholder="Choose an option", index=None, disabled=False, label_visibility="collapsed", key="transcript")
     if video_name:
-        with st.spinner("Transcribing video..."):
-            transcription = transcribe_video(st.session_state.collection, st.session_state.video_dict[video_name])  
-            st.info(f"Transcript for {video_name} is:")
-            st.success(transcription)
+        try:
+            with st.spinner("Loading transcript..."):
+                transcript = get_paged_transcript(st.session_state.collection, st.session_state.video_dict[video_name])
+        except Exception as e:
+            transcript = None
+            st.error(f"The transcript could not be loaded right now ({e}). Please try again shortly.")
+        if transcript is not None and not len(transcript):
+            st.info("This video has no transcript.")
+        elif transcript is not None:
+            # Only the page number lives in the session; the transcript is shared by the process and one page is rendered
+            if st.session_state.get("transcript_video") != video_name:
+                st.session_state.transcript_video = video_name
+                st.session_state.transcript_page = 1
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                transcript_query = st.text_input("Search in the transcript", key="transcript_query")
+            with col2:
+                st.text_input("Jump to (h:mm:ss)", key="transcript_jump", on_change=jump_to_timestamp, args=(transcript,))
+            if transcript_query:
+                matches = transcript.search(transcript_query)
+                if not matches:
+                    st.info("No segment contains all of these words.")
+                for line in matches:
+                    col1, col2 = st.columns([1, 8])
+                    with col1:
+                        st.button(line.label, key=f"transcript_match_{line.position}", on_click=go_to_transcript_page,
+                                  args=(line.position // TRANSCRIPT_PAGE_SEGMENTS + 1,))
+                    with col2:
+                        st.write(line.text)
+                st.divider()
+            pages = transcript.page_count()
+            st.number_input("Page", min_value=1, max_value=pages, step=1, key="transcript_page")
+            st.caption(f"Transcript for {video_name}: page {st.session_state.transcript_page} of {pages}, "
+                       f"{len(transcript)} lines, {format_timestamp(transcript.duration)}")
+            st.markdown("  \n".join(f"`{line.label}` {line.text}" for line in transcript.page(st.session_state.transcript_page)))
 
 
 if selected_service == "***Add Subtitles***" and st.session_state.urls_stored:
@@ -190,9 +461,18 @@ if selected_service == "***Add Subtitles***" and st.session_state.urls_stored:
     st.divider()
     st.subheader("Select URL to add subtitles to")
     video_name = st.selectbox(" ", st.session_state.video_dict.keys(), placeholder="Choose an option", index=None, disabled=False, label_visibility="collapsed", key="subtitles")
-    if video_name:
-        with st.spinner("Adding subtitles to video and streaming video in new tab..."):
-            transcription = add_subtitles(st.session_state.collection, st.session_state.video_dict[video_name])  
+    # Streams rendered before, by any session, are shown right away instead of through a background job
+    stream_url = cached_subtitles(st.session_state.video_dict[video_name]) if video_name else None
+    if stream_url:
+        st.link_button("Watch with subtitles", stream_url)
+    elif video_name:
+        slot = submit_video_job(ADD_SUBTITLES, st.session_state.video_dict[video_name])
+        job = job_for(slot, "Adding subtitles to video...")
+        if job is not None and job["status"] == DONE:
+            st.link_button("Watch with subtitles", job["result"]["stream_url"])
+        elif job is not None:
+            del st.session_state.jobs[slot]
+            st.error(f"Adding subtitles failed: {job['error']}")
 
 
 if selected_service == "***Generate Thumbnail***" and st.session_state.urls_stored:
@@ -200,10 +480,17 @@ if selected_service == "***Generate Thumbnail***" and st.session_state.urls_stor
     st.divider()
     st.subheader("Select URL to which you want to generate thumbnail for")
     video_name = st.selectbox(" ",st.session_state.video_dict.keys(), placeholder="Choose an option", index=None, disabled=False, label_visibility="collapsed", key="thumbnail")
-    if video_name:
-        with st.spinner("Generating thumbnail..."):
-            thumbnail_image = thumbnail(st.session_state.collection, st.session_state.video_dict[video_name])  
-            st.image(thumbnail_image, width=300)
+    image = cached_thumbnail(st.session_state.video_dict[video_name]) if video_name else None
+    if image:
+        st.image(image, width=300)
+    elif video_name:
+        slot = submit_video_job(THUMBNAIL, st.session_state.video_dict[video_name])
+        job = job_for(slot, "Generating thumbnail...")
+        if job is not None and job["status"] == DONE:
+            st.image(job["result"]["thumbnail"], width=300)
+        elif job is not None:
+            del st.session_state.jobs[slot]
+            st.error(f"Thumbnail generation failed: {job['error']}")
 
 
 if selected_service == "***Delete Video***" and st.session_state.urls_stored:
@@ -213,41 +500,82 @@ if selected_service == "***Delete Video***" and st.session_state.urls_stored:
     video_name = st.selectbox(" ", st.session_state.video_dict.keys(), index=None, placeholder="Choose an option", disabled=False, label_visibility="collapsed", key="delete_video")
     if video_name:
         with st.spinner("Deleting video..."):
-            delete_video_from_index(st.session_state.collection, st.session_state.video_dict[video_name])  
+            video_id = st.session_state.video_dict[video_name]
+            delete_video_from_index(st.session_state.collection, video_id)  
+            answer_cache.invalidate(video_id)
             # st.session_state.video_urls.remove(video_link)
-            if video_name in st.session_state.video_dict[video_name]:
-                del st.session_state.video_dict[video_name]
+            del st.session_state.video_dict[video_name]
+            store.clear_history(st.session_state.collection.id, [video_id])
+            conversation_memory.forget((st.session_state.collection.id, video_id))
+            save_library_state()
             st.success("Video deleted successfully from the index.")
 
 
 if selected_service == "***Delete All***" and st.session_state.urls_stored:
     st.header(selected_service)
     st.divider()
-    if st.button("Click here to Delete All Videos"):
-        with st.spinner("Deleting all videos..."):
-            delete_all_videos_from_index(st.session_state.collection)  
-            st.session_state.video_urls = []
-            st.session_state.video_dict.clear()
-            st.session_state.urls_stored = False
-            st.session_state.chat_history = [
-            {"role": "bot", "message": "Hello! Feel free to search through the video content. What's your question?"}
-        ]
-            col1, col2, col3 = st.columns([1.5,1,3], gap="large")
-            with col1:
-                st.success("All videos deleted successfully from the index.")
+    if st.button("Click here to Delete All Videos") and "delete_all" not in st.session_state.jobs:
+        st.session_state.jobs["delete_all"] = job_queue.submit(
+            DELETE_ALL, st.session_state.collection.id, {"collection_id": st.session_state.collection.id})
+    job = job_for("delete_all", "Deleting all videos...")
+    if job is not None:
+        del st.session_state.jobs["delete_all"]
+        if job["status"] == DONE:
+            deleted = set(job["result"]["deleted"])
+            for video_id in deleted:
+                answer_cache.invalidate(video_id)
+            st.session_state.video_dict = {name: video_id for name, video_id in st.session_state.video_dict.items() if video_id not in deleted}
+            failed = job["result"]["failed"]
+            if failed:
+                st.warning(f"{len(failed)} videos could not be deleted.")
+                st.dataframe([{"video id": video_id, "error": error} for video_id, error in failed.items()], hide_index=True)
+            store.clear_history(st.session_state.collection.id, list(deleted))
+            for video_id in deleted:
+                conversation_memory.forget((st.session_state.collection.id, video_id))
+            if st.session_state.video_dict:
+                save_library_state()
+            else:
+                store.delete_library(database_operations.repository.backend, st.session_state.library_name)
+                st.query_params.pop("library", None)
+                st.session_state.video_urls = []
+                st.session_state.urls_stored = False
+            if not failed:
+                col1, col2, col3 = st.columns([1.5,1,3], gap="large")
+                with col1:
+                    st.success("All videos deleted successfully from the index.")
+        else:
+            st.error(f"Deleting all videos failed: {job['error']}")
 
 st.sidebar.divider()
 if st.sidebar.button("Check collection") and st.session_state.collection_variables:
-    video_list = show_collection(st.session_state.collection)
     st.divider()
-    if video_list:
-        st.subheader("Collection list:")
-        st.write(video_list)
-    else:
+    st.subheader("Collection list:")
+    table, count = st.empty(), st.empty()
+    records = []
+    # Pages are rendered as they arrive instead of after the whole collection is listed
+    for page in iter_collection(st.session_state.collection):
+        records.extend({"id": record.id, "name": record.name, "length (s)": record.length} for record in page)
+        table.dataframe(records, hide_index=True)
+        count.caption(f"{len(records)} videos")
+    if not records:
+        table.empty()
         col1, col2, col3 = st.columns([1.8,1,5], gap="large")
         with col1:
             st.info("No videos in the collection.")
 
+with st.sidebar.expander("Performance metrics"):
+    operations = metrics.snapshot()
+    if operations:
+        st.dataframe(
+            [{"operation": name, "calls": values.get("calls", 0), "errors": values.get("errors", 0),
+              "p50 ms": values.get("p50_ms"), "p95 ms": values.get("p95_ms"), "p99 ms": values.get("p99_ms"),
+              "cache hits": values.get("cache_hits"), "cache misses": values.get("cache_misses")}
+             for name, values in operations.items()],
+            hide_index=True, use_container_width=True)
+        st.download_button("Download Prometheus metrics", metrics.to_prometheus(), file_name="videolens_metrics.prom")
+    else:
+        st.caption("No calls recorded yet.")
+
 
 
 # try playing shots videos
@@ -1,26 +1,174 @@
+import atexit
+import json
 import logging
 import os
+import queue
+import re
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+from typing import Dict, List, Optional, Tuple
 
 
-def setup_logging(log_filename: str):
+# "async" hands records to a background writer thread; "sync" writes them on the calling thread
+LOG_MODE = os.getenv("VIDEOLENS_LOG_MODE", "async")
+# "json" writes one JSON object per line; "text" keeps the classic "time - level - message" lines
+LOG_FORMAT = os.getenv("VIDEOLENS_LOG_FORMAT", "json")
+LOG_MAX_BYTES = int(float(os.getenv("VIDEOLENS_LOG_MAX_MB", "10")) * 1024 * 1024)
+LOG_BACKUPS = int(os.getenv("VIDEOLENS_LOG_BACKUPS", "5"))
+# Rotate on time instead of size when set, e.g. "midnight" or "H" (see TimedRotatingFileHandler)
+LOG_ROTATE_WHEN = os.getenv("VIDEOLENS_LOG_ROTATE_WHEN", "")
+# Fraction of INFO records kept per call site; warnings and errors are always kept
+LOG_INFO_SAMPLE = float(os.getenv("VIDEOLENS_LOG_INFO_SAMPLE", "1.0"))
+LOG_QUEUE_SIZE = int(os.getenv("VIDEOLENS_LOG_QUEUE_SIZE", "10000"))
+
+_TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+# Log messages in this repo name their function as "fn=<name>"; it becomes a field of its own
+_FUNCTION = re.compile(r"fn=\s*(\w+(?:\.\w+)*)")
+
+_configured: Optional[Tuple[str, str]] = None
+_listener: Optional[QueueListener] = None
+_setup_lock = threading.Lock()
+
+
+class JsonLineFormatter(logging.Formatter):
+    """
+    Formats a record as one JSON object: time, level, logger, function, thread and message, plus the traceback if any.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        entry = {"time": self.formatTime(record), "level": record.levelname, "logger": record.name,
+                 "thread": record.threadName, "message": message}
+        function = _FUNCTION.search(message)
+        if function:
+            entry["fn"] = function.group(1)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class InfoSampler(logging.Filter):
+    """
+    Keeps one in every 1/`rate` INFO (and DEBUG) records of each call site, so a chatty line cannot flood the log
+    while rare lines still show up. Warnings and errors always pass.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._seen: Dict[Tuple[str, int], int] = {}
+        # Filters run on every logging thread; without the lock concurrent records of one site lose counts
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.every == 1:
+            return True
+        if not self.every:
+            return False
+        site = (record.pathname, record.lineno)
+        with self._lock:
+            count = self._seen.get(site, 0)
+            self._seen[site] = count + 1
+        return count % self.every == 0
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Queue handler for an in-process listener: records are queued as they are, without formatting them on the
+    calling thread, and are dropped (and counted) instead of blocking when the writer falls behind.
+    """
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+
+def _file_handler(log_filename: str) -> logging.Handler:
+    if LOG_ROTATE_WHEN:
+        handler = TimedRotatingFileHandler(log_filename, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUPS, encoding="utf-8")
+    else:
+        handler = RotatingFileHandler(log_filename, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
+    handler.setFormatter(JsonLineFormatter() if LOG_FORMAT == "json" else logging.Formatter(_TEXT_FORMAT))
+    return handler
+
+
+def stop_logging() -> None:
+    """
+    Flushes queued records and stops the background writer, if one is running.
+    """
+    global _listener, _configured
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+        _configured = None
+
+
+def setup_logging(log_filename: str, mode: str = LOG_MODE):
     """
     Set up logging configuration.
 
+    The log file is rotated by size (or by time, see VIDEOLENS_LOG_ROTATE_WHEN). In "async" mode the calling
+    thread only puts the record on a queue and a background listener thread formats and writes it. Calling
+    this again with the same file and mode (e.g. on every Streamlit rerun) keeps the running setup.
+
     Args:
         log_filename (str): The name of the log file where logs will be stored.
+        mode (str): "async" for the background writer, "sync" to write on the calling thread.
+    """
+    global _listener, _configured
+    if _configured == (log_filename, mode):
+        return
+    stop_logging()
+    with _setup_lock:
+        # Remove all handlers associated with the root logger object
+        for handler in logging.root.handlers[:]:
+            logging.root.removeHandler(handler)
+            handler.close()
+
+        # Create the "logs" directory if it doesn't exist
+        log_directory = os.path.dirname(log_filename)
+        if log_directory and not os.path.exists(log_directory):
+            os.makedirs(log_directory)
+
+        file_handler = _file_handler(log_filename)
+        if mode == "async":
+            handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+            _listener = QueueListener(handler.queue, file_handler)
+            _listener.start()
+        else:
+            handler = file_handler
+        # Sampling runs before queueing, so dropped records cost the calling thread next to nothing
+        handler.addFilter(InfoSampler(LOG_INFO_SAMPLE))
+        logging.root.addHandler(handler)
+        logging.root.setLevel(logging.INFO)
+        _configured = (log_filename, mode)
+
+
+atexit.register(stop_logging)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Returns the pct-th percentile (0-100) of values using linear interpolation, or 0.0 for no values.
+
+    Args:
+        values (List[float]): The samples.
+        pct (float): The percentile to compute.
     """
-    # Remove all handlers associated with the root logger object
-    for handler in logging.root.handlers[:]:
-        logging.root.removeHandler(handler)
-
-    # Create the "logs" directory if it doesn't exist
-    log_directory = os.path.dirname(log_filename)
-    if log_directory and not os.path.exists(log_directory):
-        os.makedirs(log_directory)
-
-    # Set up logging
-    logging.basicConfig(
-        filename=log_filename,
-        level=logging.INFO,  # Set the logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
-        format='%(asctime)s - %(levelname)s - %(message)s',  # Log format
-    )
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
@@ -0,0 +1,225 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+JOB_WORKERS = int(os.getenv("VIDEOLENS_JOB_WORKERS", "4"))
+# Finished and failed jobs older than this are deleted; their results are only needed while the UI polls them
+JOB_RETENTION_SECONDS = float(os.getenv("VIDEOLENS_JOB_RETENTION", str(7 * 24 * 3600)))
+# How often an idle worker deletes expired jobs
+JOB_SWEEP_INTERVAL = 3600.0
+
+# A handler receives the job parameters and a progress callback taking (fraction, message)
+JobHandler = Callable[[Dict[str, Any], Callable[[float, str], None]], Any]
+
+
+class JobQueue:
+    """
+    Background job runner backed by a SQLite queue.
+
+    Jobs survive Streamlit reruns and page reloads: the UI submits a job, keeps its ID and polls it. A job
+    submitted for an (operation, key) pair that is already queued or running returns the existing job
+    instead of starting the work again; a unique index on in-flight jobs enforces this across processes
+    sharing the file. Jobs left running by a process that died are re-queued on start, and finished jobs
+    are deleted once they are older than the retention period.
+    """
+
+    def __init__(self, path: str, max_workers: int = JOB_WORKERS, poll_interval: float = 0.5,
+                 retention_seconds: float = JOB_RETENTION_SECONDS):
+        """
+        Args:
+            path (str): Location of the SQLite file. Its directory is created if missing.
+            max_workers (int): Number of worker threads.
+            poll_interval (float): Seconds an idle worker waits before checking the queue again.
+            retention_seconds (float): Age after which finished and failed jobs are deleted.
+        """
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self._next_sweep = 0.0
+        self._handlers: Dict[str, JobHandler] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._threads = []
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, operation TEXT NOT NULL, job_key TEXT NOT NULL, params TEXT NOT NULL,"
+            " status TEXT NOT NULL, progress REAL NOT NULL DEFAULT 0, message TEXT NOT NULL DEFAULT '',"
+            " result TEXT, error TEXT, owner TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_active ON jobs (operation, job_key, status)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_updated ON jobs (status, updated_at)")
+        # Files from before the unique index may hold duplicate in-flight jobs; keep the oldest of each
+        self._db.execute(
+            "UPDATE jobs SET status = ?, error = 'Duplicate of an in-flight job.' WHERE status IN (?, ?) AND EXISTS ("
+            " SELECT 1 FROM jobs AS older WHERE older.operation = jobs.operation AND older.job_key = jobs.job_key"
+            " AND older.status IN (?, ?) AND (older.created_at, older.id) < (jobs.created_at, jobs.id))",
+            (FAILED, *ACTIVE_STATES, *ACTIVE_STATES))
+        self._db.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS jobs_in_flight ON jobs (operation, job_key)"
+            f" WHERE status IN ('{QUEUED}', '{RUNNING}')")
+
+    def register(self, operation: str, handler: JobHandler) -> None:
+        self._handlers[operation] = handler
+
+    def start(self) -> "JobQueue":
+        """
+        Re-queues jobs orphaned by dead processes and starts the worker threads.
+        """
+        with self._lock:
+            orphaned = [(job_id, owner) for job_id, owner in
+                        self._db.execute("SELECT id, owner FROM jobs WHERE status = ?", (RUNNING,)).fetchall()
+                        if not _owner_alive(owner)]
+            for job_id, _ in orphaned:
+                self._db.execute("UPDATE jobs SET status = ?, owner = NULL, updated_at = ? WHERE id = ?", (QUEUED, time.time(), job_id))
+        if orphaned:
+            logging.info(f"Re-queued {len(orphaned)} interrupted jobs. fn=JobQueue.start")
+        self._sweep()
+        for number in range(self.max_workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{number}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def submit(self, operation: str, key: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Queues a job, or returns the ID of the queued or running job with the same operation and key.
+
+        Args:
+            operation (str): Name of a registered handler.
+            key (str): Deduplication key, e.g. the video ID the job works on.
+            params (Optional[Dict[str, Any]]): JSON-serialisable handler parameters.
+
+        Returns:
+            str: The job ID.
+        """
+        if operation not in self._handlers:
+            raise ValueError(f"No handler registered for job operation '{operation}'.")
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            while True:
+                # The unique index on in-flight jobs turns a concurrent duplicate, from any process, into a no-op
+                now = time.time()
+                inserted = self._db.execute(
+                    "INSERT INTO jobs (id, operation, job_key, params, status, created_at, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT DO NOTHING",
+                    (job_id, operation, key, json.dumps(params or {}), QUEUED, now, now)).rowcount
+                if inserted:
+                    break
+                row = self._db.execute(
+                    "SELECT id FROM jobs WHERE operation = ? AND job_key = ? AND status IN (?, ?)",
+                    (operation, key, *ACTIVE_STATES)).fetchone()
+                if row is not None:
+                    logging.info(f"Reusing in-flight job. fn=JobQueue.submit, operation={operation}, key={key}, job_id={row[0]}")
+                    return row[0]
+                # The conflicting job finished in between; try the insert again
+        with self._wakeup:
+            self._wakeup.notify()
+        logging.info(f"Job submitted. fn=JobQueue.submit, operation={operation}, key={key}, job_id={job_id}")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the job's status, progress, message, result and error, or None if it does not exist.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, operation, job_key, status, progress, message, result, error, created_at, updated_at"
+                " FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        keys = ("id", "operation", "key", "status", "progress", "message", "result", "error", "created_at", "updated_at")
+        job = dict(zip(keys, row))
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def _claim(self) -> Optional[tuple]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, operation, params FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)).fetchone()
+            if row is None:
+                return None
+            claimed = self._db.execute(
+                "UPDATE jobs SET status = ?, owner = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (RUNNING, self._owner, time.time(), row[0], QUEUED)).rowcount
+            return row if claimed else None
+
+    def prune(self, older_than: Optional[float] = None) -> int:
+        """
+        Deletes finished and failed jobs last updated more than `older_than` seconds ago (default: the
+        retention period). Returns the number of jobs deleted.
+        """
+        cutoff = time.time() - (self.retention_seconds if older_than is None else older_than)
+        with self._lock:
+            deleted = self._db.execute("DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                                       (DONE, FAILED, cutoff)).rowcount
+        if deleted:
+            logging.info(f"Deleted {deleted} expired jobs. fn=JobQueue.prune")
+        return deleted
+
+    def _sweep(self) -> None:
+        with self._lock:
+            now = time.time()
+            if now < self._next_sweep:
+                return
+            self._next_sweep = now + JOB_SWEEP_INTERVAL
+        try:
+            self.prune()
+        except sqlite3.Error as e:
+            logging.error(f"Deleting expired jobs failed. fn=JobQueue._sweep, error={e}")
+
+    def _update(self, job_id: str, **fields: Any) -> None:
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET {assignments}, updated_at = ? WHERE id = ?",
+                             (*fields.values(), time.time(), job_id))
+
+    def _work(self) -> None:
+        while True:
+            job = self._claim()
+            if job is None:
+                self._sweep()
+                with self._wakeup:
+                    self._wakeup.wait(self.poll_interval)
+                continue
+            job_id, operation, params = job
+            started = time.perf_counter()
+
+            def report_progress(fraction: float, message: str = "") -> None:
+                self._update(job_id, progress=max(0.0, min(1.0, fraction)), message=message)
+
+            try:
+                handler = self._handlers[operation]
+                result = handler(json.loads(params), report_progress)
+                self._update(job_id, status=DONE, progress=1.0, result=json.dumps(result))
+                logging.info(f"Job finished in {time.perf_counter() - started:.2f}s. fn=JobQueue._work, operation={operation}, job_id={job_id}")
+            except Exception as e:
+                self._update(job_id, status=FAILED, error=str(e))
+                logging.error(f"Job failed. fn=JobQueue._work, operation={operation}, job_id={job_id}, error={e}")
+
+
+def _owner_alive(owner: Optional[str]) -> bool:
+    if not owner:
+        return False
+    try:
+        os.kill(int(owner.split("-", 1)[0]), 0)
+    except (OSError, ValueError):
+        return False
+    return True
@@ -0,0 +1,209 @@
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from utils.helpers import percentile
+
+
+RESERVOIR_SIZE = int(os.getenv("VIDEOLENS_METRICS_RESERVOIR", "2048"))
+# Upper bounds (seconds) of the Prometheus latency buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """
+    Latency histogram with cumulative Prometheus buckets and a bounded reservoir of recent samples for percentiles.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS, reservoir_size: int = RESERVOIR_SIZE):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=reservoir_size)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[position] += 1
+
+
+class MetricsRegistry:
+    """
+    In-process store of per-operation latency histograms, payload sizes and counters (calls, errors, cache hits).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency: Dict[str, Histogram] = {}
+        self._payload: Dict[str, Histogram] = {}
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def observe(self, operation: str, seconds: float, error: bool = False, payload_size: Optional[int] = None) -> None:
+        with self._lock:
+            self._latency.setdefault(operation, Histogram()).observe(seconds)
+            self._counters[operation]["calls"] += 1
+            if error:
+                self._counters[operation]["errors"] += 1
+            if payload_size is not None:
+                self._payload.setdefault(operation, Histogram(buckets=())).observe(payload_size)
+
+    def increment(self, operation: str, counter: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[operation][counter] += value
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        self.increment(cache, "cache_hits" if hit else "cache_misses")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._latency.clear()
+            self._payload.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns per-operation counters, latency percentiles in milliseconds and mean payload size.
+        """
+        with self._lock:
+            operations = set(self._latency) | set(self._counters)
+            result = {}
+            for operation in sorted(operations):
+                entry: Dict[str, Any] = dict(self._counters.get(operation, {}))
+                histogram = self._latency.get(operation)
+                if histogram is not None:
+                    samples = list(histogram.samples)
+                    entry.update({
+                        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+                        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+                        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+                        "mean_ms": round(histogram.total / histogram.count * 1000, 2),
+                    })
+                payload = self._payload.get(operation)
+                if payload is not None and payload.count:
+                    entry["mean_payload"] = round(payload.total / payload.count, 1)
+                result[operation] = entry
+            return result
+
+    def to_prometheus(self) -> str:
+        """
+        Renders all metrics in the Prometheus text exposition format.
+        """
+        lines = ["# TYPE videolens_operation_seconds histogram"]
+        with self._lock:
+            for operation, histogram in sorted(self._latency.items()):
+                label = f'operation="{operation}"'
+                for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                    lines.append(f'videolens_operation_seconds_bucket{{{label},le="{bound}"}} {count}')
+                lines.append(f'videolens_operation_seconds_bucket{{{label},le="+Inf"}} {histogram.count}')
+                lines.append(f"videolens_operation_seconds_sum{{{label}}} {histogram.total}")
+                lines.append(f"videolens_operation_seconds_count{{{label}}} {histogram.count}")
+            lines.append("# TYPE videolens_payload_size summary")
+            for operation, histogram in sorted(self._payload.items()):
+                lines.append(f'videolens_payload_size_sum{{operation="{operation}"}} {histogram.total}')
+                lines.append(f'videolens_payload_size_count{{operation="{operation}"}} {histogram.count}')
+            lines.append("# TYPE videolens_events_total counter")
+            for operation, counters in sorted(self._counters.items()):
+                for counter, value in sorted(counters.items()):
+                    lines.append(f'videolens_events_total{{operation="{operation}",event="{counter}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def start_snapshot_writer(self, path: str, interval_seconds: float = 30.0) -> threading.Thread:
+        """
+        Writes `snapshot()` as JSON to `path` every `interval_seconds` from a daemon thread.
+        """
+        def write_forever() -> None:
+            while True:
+                time.sleep(interval_seconds)
+                try:
+                    temporary = f"{path}.tmp"
+                    with open(temporary, "w") as f:
+                        json.dump({"timestamp": time.time(), "operations": self.snapshot()}, f)
+                    os.replace(temporary, path)
+                except Exception as e:
+                    logging.error(f"Writing metrics snapshot failed. fn=start_snapshot_writer, error={e}")
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        thread = threading.Thread(target=write_forever, name="metrics-snapshot", daemon=True)
+        thread.start()
+        return thread
+
+
+metrics = MetricsRegistry()
+
+
+@contextmanager
+def track(operation: str) -> Iterator[Dict[str, Any]]:
+    """
+    Times the enclosed block and records it under `operation`. Exceptions are counted as errors and re-raised.
+    Set `payload_size` on the yielded dict to record the size of what the block produced.
+    """
+    info: Dict[str, Any] = {"payload_size": None}
+    started = time.perf_counter()
+    try:
+        yield info
+    except BaseException:
+        metrics.observe(operation, time.perf_counter() - started, error=True)
+        raise
+    metrics.observe(operation, time.perf_counter() - started, payload_size=info["payload_size"])
+
+
+def timed(operation: str, payload_size: Optional[Callable[[Any], int]] = None) -> Callable:
+    """
+    Decorator recording wall time, errors and optionally payload size of every call under `operation`.
+
+    Generator functions are timed until they are exhausted; the time to their first item is recorded
+    as `<operation>.first_chunk`.
+
+    Args:
+        operation (str): Name the calls are recorded under.
+        payload_size (Optional[Callable[[Any], int]]): Maps the return value to a size, e.g. `len`.
+    """
+    def decorator(function: Callable) -> Callable:
+        if inspect.isgeneratorfunction(function):
+            @functools.wraps(function)
+            def generator_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                first = True
+                size = 0
+                try:
+                    for item in function(*args, **kwargs):
+                        if first:
+                            metrics.observe(f"{operation}.first_chunk", time.perf_counter() - started)
+                            first = False
+                        size += len(item) if isinstance(item, (str, bytes)) else 0
+                        yield item
+                except GeneratorExit:
+                    # The consumer stopped early; that is not a failure of the operation
+                    metrics.observe(operation, time.perf_counter() - started, payload_size=size)
+                    raise
+                except BaseException:
+                    metrics.observe(operation, time.perf_counter() - started, error=True)
+                    raise
+                metrics.observe(operation, time.perf_counter() - started, payload_size=size)
+            return generator_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with track(operation) as info:
+                result = function(*args, **kwargs)
+                if payload_size is not None:
+                    try:
+                        info["payload_size"] = payload_size(result)
+                    except Exception:
+                        pass
+                return result
+        return wrapper
+    return decorator
@@ -0,0 +1,65 @@
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: allows `rate` operations per second on average with bursts of up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        """
+        Args:
+            rate (float): Tokens added per second. 0 or less disables limiting.
+            capacity (float): Maximum burst size. Defaults to max(1, rate).
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """
+        Takes tokens if available without waiting.
+        """
+        if self.rate <= 0:
+            return True
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0, deadline: Optional[float] = None) -> Optional[float]:
+        """
+        Blocks until tokens are available.
+
+        Args:
+            tokens (float): Tokens to take.
+            deadline (float): time.monotonic() value to give up at. None waits as long as needed.
+
+        Returns:
+            Optional[float]: Seconds spent waiting, or None if the tokens would only be available after the deadline.
+        """
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            if deadline is not None and now + delay > deadline:
+                return None
+            time.sleep(delay)
+            waited += delay
@@ -0,0 +1,247 @@
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from utils.metrics import metrics
+from utils.rate_limit import TokenBucket
+
+
+RETRY_ATTEMPTS = int(os.getenv("VIDEOLENS_RETRY_ATTEMPTS", "3"))
+RETRY_BASE_DELAY = float(os.getenv("VIDEOLENS_RETRY_BASE_DELAY", "0.5"))
+RETRY_MAX_DELAY = float(os.getenv("VIDEOLENS_RETRY_MAX_DELAY", "8"))
+BREAKER_FAILURES = int(os.getenv("VIDEOLENS_BREAKER_FAILURES", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("VIDEOLENS_BREAKER_RESET", "30"))
+
+# Status codes worth retrying: timeouts, throttling and server-side failures
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised without calling the provider while its circuit breaker is open.
+    """
+
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(f"{provider} is temporarily unavailable, retrying in {retry_in:.0f}s.")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+def status_code(error: BaseException) -> Optional[int]:
+    """
+    Extracts the HTTP status of an SDK error: `status_code` (fake backend), `response.status_code` (requests)
+    or an integer `code` (Google API errors).
+    """
+    for candidate in (getattr(error, "status_code", None), getattr(getattr(error, "response", None), "status_code", None),
+                      getattr(error, "code", None)):
+        if isinstance(candidate, int):
+            return candidate
+    return None
+
+
+def _is_videodb_transient(error: BaseException) -> bool:
+    """
+    The VideoDB SDK wraps timeouts in RequestTimeoutError, and dropped connections and exhausted HTTP retries
+    in an InvalidRequestError without a response. Matched by name so the SDK stays an optional import.
+    """
+    kind = type(error)
+    if not kind.__module__.startswith("videodb"):
+        return False
+    return kind.__name__ == "RequestTimeoutError" or (kind.__name__ == "InvalidRequestError" and getattr(error, "response", None) is None)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    True for transient failures: throttling, 5xx responses, timeouts and dropped connections.
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    code = status_code(error)
+    if code is not None:
+        return code in RETRYABLE_STATUS
+    return isinstance(error, (ConnectionError, TimeoutError, OSError)) or _is_videodb_transient(error)
+
+
+class CircuitBreaker:
+    """
+    Fails fast after `failure_threshold` consecutive transient failures. After `reset_seconds` a single
+    trial call is let through; it closes the breaker on success and reopens it on failure.
+    """
+
+    def __init__(self, provider: str, failure_threshold: int = BREAKER_FAILURES, reset_seconds: float = BREAKER_RESET_SECONDS):
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """
+        Raises CircuitOpenError if the call must not reach the provider.
+        """
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            retry_in = self._opened_at + self.reset_seconds - time.monotonic()
+            if self.state == OPEN and retry_in <= 0:
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return
+        metrics.increment(self.provider, "breaker_rejections")
+        raise CircuitOpenError(self.provider, max(0.0, retry_in))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._trial_running = False
+            if self.state != CLOSED:
+                self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and 0 < self.failure_threshold <= self._failures):
+                self._opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        metrics.increment(self.provider, f"breaker_{state}")
+        log = logging.warning if state == OPEN else logging.info
+        log(f"Circuit breaker {state}. fn=CircuitBreaker, provider={self.provider}, failures={self._failures}")
+
+
+class Endpoint:
+    """
+    Guards calls to one provider operation (e.g. "videodb.search") with a concurrency limit, a token-bucket
+    rate limit, retries with full-jitter exponential backoff and the provider's circuit breaker.
+    """
+
+    def __init__(self, operation: str, breaker: CircuitBreaker, max_concurrency: int = 0, rate: float = 0.0,
+                 max_attempts: int = RETRY_ATTEMPTS, base_delay: float = RETRY_BASE_DELAY, max_delay: float = RETRY_MAX_DELAY):
+        """
+        Args:
+            operation (str): Name the retry events are recorded under.
+            breaker (CircuitBreaker): Breaker shared by all operations of the provider.
+            max_concurrency (int): Calls allowed in flight at the same time. 0 or less disables the limit.
+            rate (float): Calls per second. 0 or less disables rate limiting.
+            max_attempts (int): Attempts per call, including the first one.
+            base_delay (float): Backoff ceiling in seconds before the first retry; doubled on every further retry.
+            max_delay (float): Upper bound of the backoff ceiling.
+        """
+        self.operation = operation
+        self.breaker = breaker
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.bucket = TokenBucket(rate)
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency > 0 else None
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Full jitter: a uniform delay between 0 and the exponential ceiling for this attempt.
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, function: Callable[..., Any], *args, idempotent: bool = True, deadline: Optional[float] = None, **kwargs) -> Any:
+        """
+        Calls `function(*args, **kwargs)`, retrying transient failures if the call is idempotent.
+
+        With a `deadline` (a time.monotonic() value), no attempt starts, waits for a rate-limit token or a
+        concurrency slot, or backs off past it.
+
+        Raises:
+            CircuitOpenError: The provider's breaker is open.
+            TimeoutError: The deadline passed before an attempt could start.
+            Exception: The last error once retries are exhausted, or any non-transient error right away.
+        """
+        attempts = self.max_attempts if idempotent else 1
+        for attempt in range(attempts):
+            self.breaker.before_call()
+            waited = self.bucket.acquire(deadline=deadline)
+            if waited is None:
+                metrics.increment(self.operation, "deadline_exceeded")
+                raise TimeoutError(f"Deadline passed before {self.operation} could start.")
+            if waited:
+                metrics.increment(self.operation, "rate_limited")
+            if self._slots is not None:
+                timeout = None if deadline is None else deadline - time.monotonic()
+                if timeout is not None and (timeout <= 0 or not self._slots.acquire(timeout=timeout)):
+                    metrics.increment(self.operation, "deadline_exceeded")
+                    raise TimeoutError(f"Deadline passed before {self.operation} could start.")
+                if timeout is None:
+                    self._slots.acquire()
+            try:
+                try:
+                    result = function(*args, **kwargs)
+                finally:
+                    if self._slots is not None:
+                        self._slots.release()
+            except Exception as error:
+                if not is_retryable(error):
+                    # The provider answered; a client-side error says nothing about its health
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt + 1 >= attempts:
+                    metrics.increment(self.operation, "retries_exhausted")
+                    raise
+                delay = self.backoff(attempt)
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    metrics.increment(self.operation, "deadline_exceeded")
+                    raise
+                metrics.increment(self.operation, "retries")
+                logging.warning(f"Transient failure, retrying in {delay:.2f}s. fn=Endpoint.call, operation={self.operation}, "
+                                f"attempt={attempt + 1}, status={status_code(error)}, error={error}")
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_endpoints: Dict[str, Endpoint] = {}
+_registry_lock = threading.Lock()
+
+
+def _provider_setting(provider: str, name: str, default: str) -> float:
+    return float(os.getenv(f"VIDEOLENS_{provider.upper()}_{name}", default))
+
+
+def endpoint(operation: str) -> Endpoint:
+    """
+    Returns the process-wide endpoint for an operation named "<provider>.<call>". Concurrency and rate limits
+    are read from VIDEOLENS_<PROVIDER>_CONCURRENCY and VIDEOLENS_<PROVIDER>_RATE_LIMIT.
+    """
+    with _registry_lock:
+        if operation not in _endpoints:
+            provider = operation.split(".", 1)[0]
+            breaker = _breakers.setdefault(provider, CircuitBreaker(provider))
+            _endpoints[operation] = Endpoint(
+                operation, breaker,
+                max_concurrency=int(_provider_setting(provider, "CONCURRENCY", "8")),
+                rate=_provider_setting(provider, "RATE_LIMIT", "0"),
+            )
+        return _endpoints[operation]
+
+
+def resilient_call(operation: str, function: Callable[..., Any], *args, idempotent: bool = True,
+                   deadline: Optional[float] = None, **kwargs) -> Any:
+    """
+    Calls `function` through the endpoint of `operation`. See Endpoint.call.
+    """
+    return endpoint(operation).call(function, *args, idempotent=idempotent, deadline=deadline, **kwargs)
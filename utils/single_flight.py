@@ -0,0 +1,132 @@
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from utils.metrics import metrics
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _SharedStream:
+    """
+    Buffer of a streamed response that every caller reads from its own position, as chunks arrive.
+    """
+
+    def __init__(self):
+        self.chunks: List[Any] = []
+        self.finished = False
+        self.error: Optional[BaseException] = None
+        self.condition = threading.Condition()
+
+    def feed(self, source: Iterable[Any]) -> None:
+        try:
+            for chunk in source:
+                with self.condition:
+                    self.chunks.append(chunk)
+                    self.condition.notify_all()
+        except BaseException as error:
+            self.error = error
+        finally:
+            with self.condition:
+                self.finished = True
+                self.condition.notify_all()
+
+    def read(self) -> Iterator[Any]:
+        position = 0
+        while True:
+            with self.condition:
+                while position >= len(self.chunks) and not self.finished:
+                    self.condition.wait()
+                if position < len(self.chunks):
+                    chunk = self.chunks[position]
+                elif self.error is not None:
+                    raise self.error
+                else:
+                    return
+            position += 1
+            yield chunk
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: while a call for (operation, key) is in flight, later callers
+    wait for it and share its result or exception instead of sending the same request again.
+
+    Only calls that overlap in time are merged; once a call finishes the next one goes to the provider.
+    Caching finished results is left to the caches in front of it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Tuple[str, Hashable], _Call] = {}
+        self._streams: Dict[Tuple[str, Hashable], _SharedStream] = {}
+
+    def call(self, operation: str, key: Hashable, function: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Returns `function(*args, **kwargs)`, or the result of the identical call already in flight.
+
+        Args:
+            operation (str): Name of the operation, e.g. "videodb.search". Also the metrics name.
+            key (Hashable): The arguments that make two calls identical, e.g. (video_id, query).
+            function (Callable[..., Any]): The call to make if none is in flight.
+        """
+        flight_key = (operation, key)
+        with self._lock:
+            call = self._calls.get(flight_key)
+            leader = call is None
+            if leader:
+                call = self._calls[flight_key] = _Call()
+        if not leader:
+            metrics.increment(operation, "coalesced")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = function(*args, **kwargs)
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[flight_key]
+            call.done.set()
+
+    def stream(self, operation: str, key: Hashable, function: Callable[..., Iterable[Any]], *args, **kwargs) -> Iterator[Any]:
+        """
+        Like `call` for streamed responses. The first caller's stream is read by a background thread into a
+        shared buffer, and every concurrent caller yields its chunks as they arrive, from the beginning.
+        """
+        flight_key = (operation, key)
+        with self._lock:
+            shared = self._streams.get(flight_key)
+            leader = shared is None
+            if leader:
+                shared = self._streams[flight_key] = _SharedStream()
+        if leader:
+            def feed() -> None:
+                try:
+                    shared.feed(function(*args, **kwargs))
+                except BaseException as error:
+                    logging.error(f"Shared stream failed. fn=SingleFlight.stream, operation={operation}, error={error}")
+                    with shared.condition:
+                        shared.error, shared.finished = error, True
+                        shared.condition.notify_all()
+                finally:
+                    with self._lock:
+                        del self._streams[flight_key]
+
+            threading.Thread(target=feed, name=f"single-flight-{operation}", daemon=True).start()
+        else:
+            metrics.increment(operation, "coalesced")
+        return shared.read()
+
+
+# Shared by every module of the process, so identical calls from different sessions find each other
+single_flight = SingleFlight()
@@ -0,0 +1,252 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+CHAT_HISTORY_LIMIT = int(os.getenv("VIDEOLENS_CHAT_HISTORY_LIMIT", "50"))
+# Seconds after which a claim on an unanswered question is considered abandoned and another run may answer it
+CHAT_CLAIM_TIMEOUT = float(os.getenv("VIDEOLENS_CHAT_CLAIM_TIMEOUT", "120"))
+
+# Roles are stored as one letter to keep histories compact
+_ROLE_CODES = {"user": "u", "bot": "b"}
+_ROLE_NAMES = {code: role for role, code in _ROLE_CODES.items()}
+
+
+def _pack(value: object) -> bytes:
+    return zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+
+
+def _unpack(payload: bytes) -> object:
+    return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+
+@dataclass
+class LibraryState:
+    """
+    Everything needed to reopen a saved library without asking the backend.
+    """
+    name: str
+    backend: str
+    collection_id: str
+    video_dict: Dict[str, str] = field(default_factory=dict)
+    urls: List[str] = field(default_factory=list)
+    updated_at: float = 0.0
+
+
+class StateStore:
+    """
+    Library and chat state shared by every Streamlit session, tab and worker process.
+
+    State lives in a SQLite file with zlib-compressed JSON payloads, and reads are served from an in-memory
+    copy. The copy is dropped whenever another connection has written to the file, so sessions in other
+    processes see each other's changes. Chat histories keep only their most recent messages.
+
+    Every chat write is a read-modify-write inside one `BEGIN IMMEDIATE` transaction, so concurrent writers
+    cannot drop each other's messages. Unanswered questions are claimed by the run that answers them, so
+    other tabs and sessions showing the same chat wait for the answer instead of asking the model again.
+    """
+
+    def __init__(self, path: str, max_history: int = CHAT_HISTORY_LIMIT):
+        """
+        Args:
+            path (str): Location of the SQLite file. Its directory is created if missing.
+            max_history (int): Messages kept per conversation; older ones are dropped.
+        """
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self.max_history = max_history
+        self._lock = threading.Lock()
+        self._libraries: Dict[Tuple[str, str], Optional[LibraryState]] = {}
+        self._histories: Dict[Tuple[str, str], List[Dict[str, str]]] = {}
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS libraries ("
+            " backend TEXT NOT NULL, name TEXT NOT NULL, collection_id TEXT NOT NULL, payload BLOB NOT NULL,"
+            " updated_at REAL NOT NULL, PRIMARY KEY (backend, name))"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chats ("
+            " collection_id TEXT NOT NULL, video_id TEXT NOT NULL, payload BLOB NOT NULL, updated_at REAL NOT NULL,"
+            " total INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (collection_id, video_id))"
+        )
+        # Files written before messages were counted lack the column; histories are trimmed, so the count is kept apart
+        if "total" not in [row[1] for row in self._db.execute("PRAGMA table_info(chats)")]:
+            self._db.execute("ALTER TABLE chats ADD COLUMN total INTEGER NOT NULL DEFAULT 0")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chat_claims ("
+            " collection_id TEXT NOT NULL, video_id TEXT NOT NULL, sequence INTEGER NOT NULL, owner TEXT NOT NULL,"
+            " claimed_at REAL NOT NULL, PRIMARY KEY (collection_id, video_id))"
+        )
+        self._data_version = self._current_version()
+
+    def _current_version(self) -> int:
+        return self._db.execute("PRAGMA data_version").fetchone()[0]
+
+    def _refresh(self) -> None:
+        # data_version changes only when another connection commits, so our own writes keep the copy warm
+        version = self._current_version()
+        if version != self._data_version:
+            self._data_version = version
+            self._libraries.clear()
+            self._histories.clear()
+
+    def list_libraries(self, backend: str) -> List[str]:
+        """
+        Returns the names of the saved libraries of a backend, most recently saved first.
+        """
+        with self._lock:
+            rows = self._db.execute("SELECT name FROM libraries WHERE backend = ? ORDER BY updated_at DESC", (backend,)).fetchall()
+        return [row[0] for row in rows]
+
+    def load_library(self, backend: str, name: str) -> Optional[LibraryState]:
+        """
+        Returns the saved state of a library, or None if it was never saved. No backend call is made.
+        """
+        with self._lock:
+            self._refresh()
+            key = (backend, name)
+            if key not in self._libraries:
+                row = self._db.execute(
+                    "SELECT collection_id, payload, updated_at FROM libraries WHERE backend = ? AND name = ?", key).fetchone()
+                if row is None:
+                    self._libraries[key] = None
+                else:
+                    payload = _unpack(row[1])
+                    self._libraries[key] = LibraryState(name, backend, row[0], payload["videos"], payload["urls"], row[2])
+            return self._libraries[key]
+
+    def save_library(self, state: LibraryState) -> None:
+        state.updated_at = time.time()
+        with self._lock:
+            self._refresh()
+            self._db.execute(
+                "INSERT OR REPLACE INTO libraries (backend, name, collection_id, payload, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (state.backend, state.name, state.collection_id, _pack({"videos": state.video_dict, "urls": state.urls}), state.updated_at))
+            self._libraries[(state.backend, state.name)] = state
+
+    def delete_library(self, backend: str, name: str) -> None:
+        """
+        Forgets a library and the chat histories of its videos.
+        """
+        state = self.load_library(backend, name)
+        with self._lock:
+            self._refresh()
+            self._db.execute("DELETE FROM libraries WHERE backend = ? AND name = ?", (backend, name))
+            self._libraries.pop((backend, name), None)
+        if state is not None:
+            self.clear_history(state.collection_id)
+
+    def _cached_history(self, key: Tuple[str, str]) -> List[Dict[str, str]]:
+        if key not in self._histories:
+            row = self._db.execute("SELECT payload FROM chats WHERE collection_id = ? AND video_id = ?", key).fetchone()
+            self._histories[key] = [{"role": _ROLE_NAMES[code], "message": text} for code, text in _unpack(row[0])] if row else []
+        return self._histories[key]
+
+    def _transaction(self, work: Callable[[], object]) -> object:
+        # BEGIN IMMEDIATE takes the write lock up front, so a read-modify-write sees every earlier commit
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            result = work()
+            self._db.execute("COMMIT")
+            return result
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+
+    def _stored_history(self, key: Tuple[str, str]) -> Tuple[List[List[str]], int]:
+        row = self._db.execute("SELECT payload, total FROM chats WHERE collection_id = ? AND video_id = ?", key).fetchone()
+        return (_unpack(row[0]), row[1]) if row else ([], 0)
+
+    def history(self, collection_id: str, video_id: str) -> List[Dict[str, str]]:
+        """
+        Returns the chat history of a video as {"role", "message"} dicts, oldest first.
+        """
+        with self._lock:
+            self._refresh()
+            return list(self._cached_history((collection_id, video_id)))
+
+    def append_message(self, collection_id: str, video_id: str, role: str, message: str) -> None:
+        """
+        Appends a message to the chat history of a video, dropping the oldest ones beyond the limit.
+        Appending an answer releases the claim on the question.
+        """
+        key = (collection_id, video_id)
+
+        def append() -> List[List[str]]:
+            entries, total = self._stored_history(key)
+            entries = (entries + [[_ROLE_CODES[role], message]])[-self.max_history:]
+            self._db.execute(
+                "INSERT OR REPLACE INTO chats (collection_id, video_id, payload, updated_at, total) VALUES (?, ?, ?, ?, ?)",
+                (collection_id, video_id, _pack(entries), time.time(), total + 1))
+            if role == "bot":
+                self._db.execute("DELETE FROM chat_claims WHERE collection_id = ? AND video_id = ?", key)
+            return entries
+
+        with self._lock:
+            self._refresh()
+            entries = self._transaction(append)
+            self._histories[key] = [{"role": _ROLE_NAMES[code], "message": text} for code, text in entries]
+
+    def _question_state(self, key: Tuple[str, str], owner: str, timeout: float) -> Tuple[bool, bool, int]:
+        """
+        Returns whether the last message of the chat is an unanswered question, whether another owner holds a
+        live claim on it, and its position among all messages ever appended.
+        """
+        entries, total = self._stored_history(key)
+        if not entries or entries[-1][0] != _ROLE_CODES["user"]:
+            return False, False, total
+        claim = self._db.execute(
+            "SELECT sequence, owner, claimed_at FROM chat_claims WHERE collection_id = ? AND video_id = ?", key).fetchone()
+        taken = claim is not None and claim[0] == total and claim[1] != owner and time.time() - claim[2] < timeout
+        return True, taken, total
+
+    def claim_answer(self, collection_id: str, video_id: str, owner: str, timeout: float = CHAT_CLAIM_TIMEOUT) -> bool:
+        """
+        Claims the last, unanswered question of a chat for `owner`.
+
+        Returns False if the question is already answered, or another owner claimed it less than `timeout`
+        seconds ago and may still be answering. The same owner can claim again, e.g. after its run was
+        interrupted by a rerun.
+        """
+        key = (collection_id, video_id)
+
+        def claim() -> bool:
+            unanswered, taken, sequence = self._question_state(key, owner, timeout)
+            free = unanswered and not taken
+            if free:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO chat_claims (collection_id, video_id, sequence, owner, claimed_at) VALUES (?, ?, ?, ?, ?)",
+                    (collection_id, video_id, sequence, owner, time.time()))
+            return free
+
+        with self._lock:
+            return self._transaction(claim)
+
+    def answering_elsewhere(self, collection_id: str, video_id: str, owner: str, timeout: float = CHAT_CLAIM_TIMEOUT) -> bool:
+        """
+        Tells whether the last question of a chat is unanswered and claimed by another owner who may still be answering.
+        """
+        with self._lock:
+            return self._question_state((collection_id, video_id), owner, timeout)[1]
+
+    def clear_history(self, collection_id: str, video_ids: Optional[List[str]] = None) -> None:
+        """
+        Drops the chat histories of the given videos, or of the whole collection when `video_ids` is None.
+        """
+        with self._lock:
+            self._refresh()
+            for table in ("chats", "chat_claims"):
+                if video_ids is None:
+                    self._db.execute(f"DELETE FROM {table} WHERE collection_id = ?", (collection_id,))
+                else:
+                    self._db.executemany(f"DELETE FROM {table} WHERE collection_id = ? AND video_id = ?",
+                                         [(collection_id, video_id) for video_id in video_ids])
+            for key in [key for key in self._histories if key[0] == collection_id and (video_ids is None or key[1] in video_ids)]:
+                del self._histories[key]